@@ -434,8 +434,18 @@ class MinistryAdmin(admin.ModelAdmin):
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ("title", "associated_ministry", "is_recurring", "get_event_time")
-    list_filter = ("is_recurring", "associated_ministry__associated_parish")
+    list_display = (
+        "title",
+        "associated_ministry",
+        "is_recurring",
+        "get_event_time",
+        "quarantined",
+    )
+    list_filter = (
+        "is_recurring",
+        "quarantined",
+        "associated_ministry__associated_parish",
+    )
     search_fields = ("title", "description", "location")
 
     fieldsets = (
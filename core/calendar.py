@@ -0,0 +1,919 @@
+"""
+Calendar engine.
+
+Expands ad-hoc and recurring Events into occurrences for a date window.
+CalendarWindow loads everything it needs in a fixed number of queries no
+matter how many events or exceptions fall inside the window, using
+``.values()`` projections rather than model instances, and yields compact
+Occurrence records; per-series metadata is kept once in ``window.series``.
+"""
+
+import heapq
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from itertools import groupby, islice, takewhile
+from time import perf_counter
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, models
+from django.utils import timezone
+
+from . import sql_expansion
+from .models import Event, EventException, EventOccurrence, Ministry, OccurrenceHorizon
+from .occurrence_index import current_index
+from .recurrence import ALL_WEEKDAYS, parse_rule, window_weekday_mask
+from .rrule_cache import rule_cache
+from .simple_rules import parse_simple_rule, simple_rule_dates
+
+logger = logging.getLogger(__name__)
+
+SERIES_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "location",
+    "is_recurring",
+    "associated_ministry__name",
+    "associated_ministry__associated_parish__name",
+)
+
+EXCEPTION_FIELDS = (
+    "event_id",
+    "original_occurrence_date",
+    "status",
+    "new_start_datetime",
+    "new_end_datetime",
+)
+
+# Attributes of a serialized calendar API event, selectable with ``fields``
+EVENT_FIELDS = (
+    "id",
+    "title",
+    "start",
+    "end",
+    "description",
+    "location",
+    "ministry",
+    "parish",
+)
+
+RECURRENCE_FIELDS = (
+    "series_start_date",
+    "series_end_date",
+    "start_time_of_day",
+    "end_time_of_day",
+    "recurrence_rule",
+)
+
+
+class Occurrence(NamedTuple):
+    """
+    A single occurrence of an event within a calendar window.
+
+    ``date`` is the original occurrence date. Regular occurrences of recurring
+    events carry naive wall-clock ``start``/``end`` times; ad-hoc and
+    rescheduled occurrences carry aware datetimes.
+    """
+
+    event_id: int
+    date: date
+    start: datetime
+    end: datetime
+    rescheduled: bool = False
+
+
+def occurrence_dates(event_id, rule_text, dtstart, start, end):
+    """
+    Lazily yield the dates within [start, end] produced by an event's rule.
+
+    Simple rules are expanded arithmetically from the window start; others
+    are parsed before this returns, so invalid rules raise here rather than
+    part-way through iteration, and are truncated at the expansion budget.
+    """
+    dates = simple_rule_dates(rule_text, dtstart, start, end)
+    if dates is not None:
+        return dates
+
+    rule = rule_cache.get(event_id, rule_text, dtstart)
+    end_dt = datetime.combine(end, datetime.max.time())
+    occurrences = rule.xafter(datetime.combine(start, datetime.min.time()), inc=True)
+    dates = (dt.date() for dt in takewhile(lambda dt: dt <= end_dt, occurrences))
+    budget = expansion_budget(dtstart.date(), start, end)
+    return _within_budget(event_id, dates, budget)
+
+
+def distinct_dates(dates):
+    """
+    Collapse repeats of a date in ordered ``dates``: a series occurs at most
+    once a day, though its rule can repeat within one (BYHOUR=9,18).
+    """
+    return (occurrence_date for occurrence_date, _ in groupby(dates))
+
+
+def expansion_budget(series_start, start, end):
+    """
+    The most occurrences one series may produce within [start, end]:
+    CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES for each month of the part of the
+    window after the series starts.
+    """
+    days = (end - max(start, series_start)).days
+    return settings.CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES * (max(days, 0) // 31 + 1)
+
+
+def _within_budget(event_id, dates, budget):
+    # Truncated only: requests never write, so quarantining is left to save()
+    # and materialization (core.occurrences)
+    for count, occurrence_date in enumerate(dates):
+        if count == budget:
+            logger.warning(
+                "Recurring event %s exceeded its budget of %s occurrences; "
+                "truncating it",
+                event_id,
+                budget,
+            )
+            return
+        yield occurrence_date
+
+
+class QueryCounter:
+    """A database execute wrapper counting the queries run through it."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def explain_series(row, start, end, exceptions=()):
+    """
+    Expand one recurring series row over [start, end] and return what it
+    cost: occurrences generated, how many of them ``exceptions`` (a set or
+    dict keyed by ``(event id, date)``) applies to, parse and expansion time
+    in milliseconds and queries issued. The rule is parsed afresh, bypassing
+    the rule cache, and the expansion budget is reported as ``over_budget``
+    rather than enforced, so explaining a series never quarantines it.
+    """
+    stats = {
+        "event_id": row["id"],
+        "title": row["title"],
+        "rule": row["recurrence_rule"],
+        "expander": None,
+        "occurrences": 0,
+        "exceptions_applied": 0,
+        "parse_ms": 0.0,
+        "expansion_ms": 0.0,
+        "queries": 0,
+        "over_budget": False,
+    }
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        try:
+            dtstart = datetime.combine(
+                row["series_start_date"], row["start_time_of_day"]
+            )
+            last = min(end, row["series_end_date"] or end)
+            started = perf_counter()
+            simple = parse_simple_rule(row["recurrence_rule"])
+            rule = None if simple else parse_rule(row["recurrence_rule"], dtstart)
+            parsed = perf_counter()
+
+            if rule is None:
+                dates = simple_rule_dates(row["recurrence_rule"], dtstart, start, last)
+            else:
+                end_dt = datetime.combine(last, datetime.max.time())
+                occurrences = rule.xafter(
+                    datetime.combine(start, datetime.min.time()), inc=True
+                )
+                dates = (
+                    dt.date() for dt in takewhile(lambda dt: dt <= end_dt, occurrences)
+                )
+            for occurrence_date in dates:
+                stats["occurrences"] += 1
+                if (row["id"], occurrence_date) in exceptions:
+                    stats["exceptions_applied"] += 1
+            expanded = perf_counter()
+        except (ValueError, TypeError, AttributeError, OverflowError) as e:
+            stats["error"] = f"{type(e).__name__}: {e}"
+            return stats
+
+    stats["expander"] = "simple" if rule is None else "rrule"
+    stats["parse_ms"] = round((parsed - started) * 1000, 3)
+    stats["expansion_ms"] = round((expanded - parsed) * 1000, 3)
+    stats["queries"] = counter.count
+    budget = expansion_budget(row["series_start_date"], start, end)
+    stats["over_budget"] = stats["occurrences"] > budget
+    return stats
+
+
+def _local_date(dt):
+    return timezone.localdate(dt) if timezone.is_aware(dt) else dt.date()
+
+
+def _local_time(dt):
+    return timezone.localtime(dt).time() if timezone.is_aware(dt) else dt.time()
+
+
+def _epoch(dt):
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return int(dt.timestamp())
+
+
+class CalendarWindow:
+    """
+    Occurrences of all events within the inclusive date window [start, end].
+
+    Occurrences come from the shared occurrence index (core.occurrence_index)
+    when it is enabled, current and covers the window, then from the
+    materialized EventOccurrence table when the OccurrenceHorizon covers the
+    window (two queries), and are otherwise
+    expanded from one query each for ad-hoc events, recurring series and
+    their exceptions (four queries). Ad-hoc events are included when their
+    [start, end) period overlaps the window, so multi-day events that began
+    before it are not missed; every query is an index range scan.
+
+    ``parish_ids`` and ``category_ids`` restrict the window to events of
+    ministries at those parishes / in those categories. The filters are
+    applied in SQL, before any recurrence rule is expanded, as are the
+    normalized rule columns that rule out finished series and series that
+    never fall on the window's weekdays. ``fields`` limits serialized events
+    to a subset of EVENT_FIELDS.
+    """
+
+    def __init__(self, start, end, parish_ids=None, category_ids=None, fields=None):
+        self.start = start
+        self.end = end
+        self.parish_ids = parish_ids
+        self.category_ids = category_ids
+        self.fields = tuple(fields or EVENT_FIELDS)
+        # The window as an aware [window_start, window_end) period
+        self.window_start = timezone.make_aware(datetime.combine(start, time.min))
+        self.window_end = timezone.make_aware(
+            datetime.combine(end + timedelta(days=1), time.min)
+        )
+        # Event id -> title, description, location, ministry, parish
+        self.series = {}
+
+    def occurrences(self):
+        """Yield an Occurrence for every non-cancelled occurrence in the window."""
+        index = current_index()
+        if index is not None and self.end <= index.horizon:
+            yield from self._indexed_occurrences(index)
+        elif self._materialized():
+            yield from self._materialized_occurrences()
+        else:
+            yield from self._expanded_occurrences()
+
+    def events(self):
+        """Return the window's occurrences as calendar API event dicts."""
+        return [self.serialize(occurrence) for occurrence in self.occurrences()]
+
+    def compact(self):
+        """
+        Return the window in the compact format.
+
+        Series, ministry and parish metadata appear once, and each occurrence
+        is a row ``[series index, start epoch, end epoch, day, rescheduled]``
+        where ``day`` is the original occurrence date as an offset in days
+        from ``start``.
+        """
+        series_index = {}
+        series = []
+        ministries = {}
+        parishes = {}
+        occurrences = []
+
+        for occurrence in self.occurrences():
+            index = series_index.get(occurrence.event_id)
+            if index is None:
+                meta = self.series[occurrence.event_id]
+                index = series_index[occurrence.event_id] = len(series)
+                entry = {"id": occurrence.event_id, "recurring": meta["is_recurring"]}
+                for field in ("title", "description", "location"):
+                    if field in self.fields:
+                        entry[field] = meta[field]
+                if "ministry" in self.fields:
+                    entry["ministry"] = ministries.setdefault(
+                        meta["ministry"], len(ministries)
+                    )
+                if "parish" in self.fields:
+                    entry["parish"] = parishes.setdefault(meta["parish"], len(parishes))
+                series.append(entry)
+            occurrences.append(
+                [
+                    index,
+                    _epoch(occurrence.start),
+                    _epoch(occurrence.end),
+                    (occurrence.date - self.start).days,
+                    int(occurrence.rescheduled),
+                ]
+            )
+
+        return {
+            "format": "compact",
+            "start": self.start.isoformat(),
+            "series": series,
+            "ministries": list(ministries),
+            "parishes": list(parishes),
+            "occurrences": occurrences,
+        }
+
+    def day_counts(self):
+        """
+        Return the number of occurrences on each day of the window, as a list
+        indexed by days from ``start``; an occurrence spanning several days
+        counts on each of them. Only start and end times are loaded from the
+        materialized table, and no per-occurrence dicts are built.
+        """
+        counts = [0] * ((self.end - self.start).days + 1)
+        index = current_index()
+        if index is not None and self.end <= index.horizon:
+            periods = map(index.period, self._indexed_rows(index))
+        elif self._materialized():
+            periods = self._materialized_rows().order_by().values_list("start", "end")
+        else:
+            periods = (
+                (occurrence.start, occurrence.end)
+                for occurrence in self._expanded_occurrences()
+            )
+
+        for start_dt, end_dt in periods:
+            first, last = _local_date(start_dt), _local_date(end_dt)
+            # An occurrence ending at midnight does not reach the next day
+            if last > first and _local_time(end_dt) == time.min:
+                last -= timedelta(days=1)
+            first, last = max(first, self.start), min(last, self.end)
+            for offset in range(
+                (first - self.start).days, (last - self.start).days + 1
+            ):
+                counts[offset] += 1
+        return counts
+
+    def explain(self):
+        """
+        Return ``{"series": [...], "totals": {...}}``: what expanding each
+        recurring series in the window costs (see explain_series), costliest
+        first, whether or not the window would be served from materialized
+        occurrences. Totals include the queries that load the series and
+        their exceptions.
+        """
+        counter = QueryCounter()
+        started = perf_counter()
+        with connection.execute_wrapper(counter):
+            rows = [row for row in self._recurring_events() if row["recurrence_rule"]]
+            exceptions = {
+                (exception["event_id"], exception["original_occurrence_date"])
+                for exception in self._exceptions()
+            }
+        series = [explain_series(row, self.start, self.end, exceptions) for row in rows]
+        series.sort(key=lambda stats: -(stats["parse_ms"] + stats["expansion_ms"]))
+
+        totals = {"series": len(series)}
+        for field in ("occurrences", "exceptions_applied", "parse_ms", "expansion_ms"):
+            totals[field] = sum(stats[field] for stats in series)
+        totals["parse_ms"] = round(totals["parse_ms"], 3)
+        totals["expansion_ms"] = round(totals["expansion_ms"], 3)
+        totals["queries"] = counter.count + sum(stats["queries"] for stats in series)
+        totals["total_ms"] = round((perf_counter() - started) * 1000, 3)
+        return {"series": series, "totals": totals}
+
+    def json_chunks(self, batch_size=200):
+        """
+        Yield the ``{"events": [...]}`` document incrementally, so memory use
+        does not grow with the number of occurrences in the window.
+        """
+        yield '{"events": ['
+        separator = ""
+        batch = []
+        for occurrence in self.occurrences():
+            batch.append(json.dumps(self.serialize(occurrence)))
+            if len(batch) >= batch_size:
+                yield separator + ", ".join(batch)
+                separator = ", "
+                batch = []
+        if batch:
+            yield separator + ", ".join(batch)
+        yield "]}"
+
+    def serialize(self, occurrence):
+        series = self.series[occurrence.event_id]
+        if series["is_recurring"]:
+            event_id = f"recurring_{occurrence.event_id}_{occurrence.date}"
+        else:
+            event_id = f"adhoc_{occurrence.event_id}"
+
+        title = series["title"]
+        if occurrence.rescheduled:
+            title = f"{title} (Rescheduled)"
+
+        event = {
+            "id": event_id,
+            "title": title,
+            "start": occurrence.start.isoformat(),
+            "end": occurrence.end.isoformat(),
+            "description": series["description"],
+            "location": series["location"],
+            "ministry": series["ministry"],
+            "parish": series["parish"],
+        }
+        if len(self.fields) == len(EVENT_FIELDS):
+            return event
+        return {field: event[field] for field in self.fields}
+
+    def _filter(self, queryset, ministry_path, parish_path):
+        if self.parish_ids:
+            queryset = queryset.filter(**{f"{parish_path}__in": self.parish_ids})
+        if self.category_ids:
+            # A subquery keeps ministries in several categories from duplicating rows
+            ministries = Ministry.objects.filter(categories__in=self.category_ids)
+            queryset = queryset.filter(
+                **{f"{ministry_path}__in": ministries.values("pk")}
+            )
+        return queryset
+
+    def _filter_events(self, queryset, prefix=""):
+        return self._filter(
+            queryset,
+            f"{prefix}associated_ministry",
+            f"{prefix}associated_ministry__associated_parish",
+        )
+
+    def _add_series(self, row, prefix=""):
+        self.series[row[f"{prefix}id"]] = {
+            "title": row[f"{prefix}title"],
+            "description": row[f"{prefix}description"],
+            "location": row[f"{prefix}location"],
+            "is_recurring": row[f"{prefix}is_recurring"],
+            "ministry": row[f"{prefix}associated_ministry__name"],
+            "parish": row[f"{prefix}associated_ministry__associated_parish__name"],
+        }
+
+    def _materialized_rows(self):
+        # Recurring rows start and end on their date, so only ad-hoc events
+        # can begin before the window and still overlap it
+        occurrences = EventOccurrence.objects.filter(
+            models.Q(date__range=[self.start, self.end])
+            | models.Q(
+                status="scheduled", date__lt=self.start, end__gt=self.window_start
+            )
+        )
+        return (
+            self._filter(occurrences, "ministry", "parish")
+            .exclude(status="cancelled")
+            .order_by("start")
+            .values(
+                "date",
+                "start",
+                "end",
+                "status",
+                *(f"event__{field}" for field in SERIES_FIELDS),
+            )
+        )
+
+    def _adhoc_events(self):
+        events = Event.objects.filter(is_recurring=False)
+        if connection.vendor == "postgresql":
+            # Matches the partial GiST index created in migration 0005
+            from django.contrib.postgres.fields import DateTimeRangeField
+
+            events = events.alias(
+                period=models.Func(
+                    models.F("start_datetime"),
+                    models.F("end_datetime"),
+                    function="tstzrange",
+                    output_field=DateTimeRangeField(),
+                )
+            ).filter(
+                start_datetime__lte=models.F("end_datetime"),
+                period__overlap=(self.window_start, self.window_end),
+            )
+        else:
+            events = events.filter(
+                start_datetime__lt=self.window_end, end_datetime__gt=self.window_start
+            )
+        return self._filter_events(events).values(
+            *SERIES_FIELDS, "start_datetime", "end_datetime"
+        )
+
+    def _recurring_events(self):
+        events = (
+            Event.objects.filter(
+                is_recurring=True, quarantined=False, series_start_date__lte=self.end
+            ).filter(
+                models.Q(series_end_date__isnull=True)
+                | models.Q(series_end_date__gte=self.start)
+            )
+            # Series whose COUNT or UNTIL ran out before the window
+            .filter(
+                models.Q(last_occurrence_date__isnull=True)
+                | models.Q(last_occurrence_date__gte=self.start)
+            )
+        )
+        weekdays = window_weekday_mask(self.start, self.end)
+        if weekdays != ALL_WEEKDAYS:
+            # Series that only occur on weekdays outside a short window
+            events = events.alias(
+                window_weekdays=models.F("rule_byday").bitand(weekdays)
+            ).filter(models.Q(rule_byday=0) | models.Q(window_weekdays__gt=0))
+        return self._filter_events(events).values(*SERIES_FIELDS, *RECURRENCE_FIELDS)
+
+    def _exceptions(self):
+        exceptions = EventException.objects.filter(
+            event__is_recurring=True,
+            original_occurrence_date__range=[self.start, self.end],
+        )
+        return self._filter_events(exceptions, prefix="event__").values(
+            *EXCEPTION_FIELDS
+        )
+
+    def _materialized(self):
+        """Whether the materialized occurrences cover the window."""
+        horizon = OccurrenceHorizon.current()
+        return horizon is not None and self.end <= horizon
+
+    def _indexed_rows(self, index):
+        rows = index.rows(
+            self.start, self.end, _epoch(self.window_start), _epoch(self.window_end)
+        )
+        if self.parish_ids:
+            parish_ids = set(self.parish_ids)
+            rows = (row for row in rows if index.parish[row] in parish_ids)
+        if self.category_ids:
+            ministries = Ministry.objects.filter(categories__in=self.category_ids)
+            ministry_ids = set(ministries.values_list("pk", flat=True))
+            rows = (row for row in rows if index.ministry[row] in ministry_ids)
+        return rows
+
+    def _indexed_occurrences(self, index):
+        rows = list(self._indexed_rows(index))
+        event_ids = {index.event[row] for row in rows}
+        if event_ids:
+            events = Event.objects.filter(pk__in=event_ids).values(*SERIES_FIELDS)
+            for row in events:
+                self._add_series(row)
+
+        for row in rows:
+            event_id = index.event[row]
+            start_dt, end_dt = index.period(row)
+            rescheduled = bool(index.rescheduled[row])
+            if self.series[event_id]["is_recurring"] and not rescheduled:
+                # Recurring times are wall-clock times of day
+                start_dt = timezone.localtime(start_dt).replace(tzinfo=None)
+                end_dt = timezone.localtime(end_dt).replace(tzinfo=None)
+
+            yield Occurrence(
+                event_id,
+                date.fromordinal(index.date[row]),
+                start_dt,
+                end_dt,
+                rescheduled,
+            )
+
+    def _materialized_occurrences(self):
+        for row in self._materialized_rows().iterator(chunk_size=2000):
+            if row["event__id"] not in self.series:
+                self._add_series(row, prefix="event__")
+
+            start_dt, end_dt = row["start"], row["end"]
+            rescheduled = row["status"] == "rescheduled"
+            if row["event__is_recurring"] and not rescheduled:
+                # Recurring times are wall-clock times of day
+                start_dt = timezone.localtime(start_dt).replace(tzinfo=None)
+                end_dt = timezone.localtime(end_dt).replace(tzinfo=None)
+
+            yield Occurrence(
+                row["event__id"], row["date"], start_dt, end_dt, rescheduled
+            )
+
+    def _expanded_occurrences(self):
+        for row in self._adhoc_events().iterator(chunk_size=2000):
+            self._add_series(row)
+            yield Occurrence(
+                row["id"],
+                timezone.localdate(row["start_datetime"]),
+                row["start_datetime"],
+                row["end_datetime"],
+            )
+
+        recurring_events = list(self._recurring_events())
+        if settings.CALENDAR_EXPANSION_BACKEND == "sql" and sql_expansion.supported():
+            recurring_events = yield from self._sql_expanded_occurrences(
+                recurring_events
+            )
+            if not recurring_events:
+                return
+
+        # All exceptions for the window in one query, keyed by (event, date)
+        exceptions = {}
+        for exception in self._exceptions():
+            key = (exception["event_id"], exception["original_occurrence_date"])
+            exceptions[key] = exception
+
+        for row in recurring_events:
+            if not row["recurrence_rule"]:
+                continue
+            try:
+                occurrences = self._expand_series(row, exceptions)
+            except (ValueError, TypeError, AttributeError, OverflowError) as e:
+                # Skip this event if we can't parse its recurrence rule or process data
+                logger.warning(
+                    "Failed to process recurring event %s: %s - %s",
+                    row["id"],
+                    type(e).__name__,
+                    str(e),
+                )
+                continue
+            except Exception as e:
+                # Log unexpected errors for monitoring
+                logger.error(
+                    "Unexpected error processing recurring event %s: %s - %s",
+                    row["id"],
+                    type(e).__name__,
+                    str(e),
+                    exc_info=True,
+                )
+                continue
+
+            self._add_series(row)
+            yield from occurrences
+
+    def _sql_expanded_occurrences(self, recurring_events):
+        """
+        Yield the occurrences of the series the database can expand itself
+        (see core.sql_expansion), already sorted and with their exceptions
+        applied, and return the series left for Python.
+        """
+        remaining = []
+        specs = []
+        series_times = {}
+        for row in recurring_events:
+            rule = sql_expansion.sql_rule(row["recurrence_rule"])
+            times = (row["start_time_of_day"], row["end_time_of_day"])
+            if rule is None or None in times:
+                remaining.append(row)
+                continue
+            self._add_series(row)
+            spec = sql_expansion.series_spec(row, rule, self.start, self.end)
+            if spec is not None:
+                specs.append(spec)
+                series_times[row["id"]] = times
+
+        for event_id, day, status, new_start, new_end in sql_expansion.expand(specs):
+            if status == "rescheduled" and new_start and new_end:
+                yield Occurrence(event_id, day, new_start, new_end, True)
+                continue
+            start_time, end_time = series_times[event_id]
+            yield Occurrence(
+                event_id,
+                day,
+                datetime.combine(day, start_time),
+                datetime.combine(day, end_time),
+            )
+        return remaining
+
+    def _expand_series(self, row, exceptions):
+        """
+        Return a lazy iterator over one series' occurrences in the window.
+
+        The series is validated and its rule parsed up front, so unusable
+        series raise here rather than part-way through iteration.
+        """
+        start_time, end_time = row["start_time_of_day"], row["end_time_of_day"]
+        if start_time is None or end_time is None:
+            raise TypeError("Recurring event has no start or end time of day")
+
+        dtstart = datetime.combine(row["series_start_date"], start_time)
+        end = min(self.end, row["series_end_date"] or self.end)
+        dates = occurrence_dates(
+            row["id"], row["recurrence_rule"], dtstart, self.start, end
+        )
+        return self._apply_exceptions(
+            row["id"], distinct_dates(dates), start_time, end_time, exceptions
+        )
+
+    def _apply_exceptions(self, event_id, dates, start_time, end_time, exceptions):
+        for occurrence_date in dates:
+            exception = exceptions.get((event_id, occurrence_date))
+            if exception:
+                new_start = exception["new_start_datetime"]
+                new_end = exception["new_end_datetime"]
+                if exception["status"] == "cancelled":
+                    continue
+                if exception["status"] == "rescheduled" and new_start and new_end:
+                    yield Occurrence(
+                        event_id, occurrence_date, new_start, new_end, True
+                    )
+                    continue
+
+            yield Occurrence(
+                event_id,
+                occurrence_date,
+                datetime.combine(occurrence_date, start_time),
+                datetime.combine(occurrence_date, end_time),
+            )
+
+
+class UpcomingWindow(CalendarWindow):
+    """
+    The next ``limit`` occurrences from ``now``, soonest first.
+
+    Rather than expanding a guessed window and sorting it, the ad-hoc events
+    (in start order, straight from the database) and a lazy iterator per
+    recurring series are merged with a heap, which stops expanding as soon
+    as ``limit`` occurrences have been produced; each series yields only as
+    many dates as the merge consumes. Cancelled occurrences are skipped, and
+    rescheduled ones join the merge at their new time. Occurrences that have
+    started but not yet ended are included. ``ministry_ids`` further
+    restricts the events to those ministries.
+    """
+
+    # How far ahead occurrences are looked for
+    HORIZON_DAYS = 2 * 366
+
+    def __init__(
+        self,
+        limit,
+        now=None,
+        parish_ids=None,
+        category_ids=None,
+        ministry_ids=None,
+        fields=None,
+    ):
+        self.now = now or timezone.now()
+        self.limit = limit
+        self.ministry_ids = ministry_ids
+        today = timezone.localdate(self.now)
+        super().__init__(
+            today,
+            today + timedelta(days=self.HORIZON_DAYS),
+            parish_ids=parish_ids,
+            category_ids=category_ids,
+            fields=fields,
+        )
+
+    def occurrences(self):
+        streams = [self._adhoc_stream()]
+        recurring_events = list(self._recurring_events())
+        exceptions = {}
+        for exception in self._exceptions():
+            key = (exception["event_id"], exception["original_occurrence_date"])
+            exceptions[key] = exception
+
+        series_ids = set()
+        for row in recurring_events:
+            if not row["recurrence_rule"]:
+                continue
+            try:
+                occurrences = self._expand_series(row, exceptions)
+            except (ValueError, TypeError, AttributeError, OverflowError) as e:
+                logger.warning(
+                    "Failed to process recurring event %s: %s - %s",
+                    row["id"],
+                    type(e).__name__,
+                    str(e),
+                )
+                continue
+            self._add_series(row)
+            series_ids.add(row["id"])
+            streams.append(
+                occurrence
+                for occurrence in occurrences
+                # Rescheduled occurrences are merged at their new time below
+                if not occurrence.rescheduled and self._not_ended(occurrence)
+            )
+
+        streams.append(
+            sorted(
+                (
+                    Occurrence(
+                        exception["event_id"],
+                        exception["original_occurrence_date"],
+                        exception["new_start_datetime"],
+                        exception["new_end_datetime"],
+                        True,
+                    )
+                    for exception in exceptions.values()
+                    if exception["event_id"] in series_ids
+                    and exception["status"] == "rescheduled"
+                    and exception["new_start_datetime"]
+                    and exception["new_end_datetime"]
+                    and exception["new_end_datetime"] > self.now
+                ),
+                key=self._start_instant,
+            )
+        )
+
+        merged = heapq.merge(*streams, key=self._start_instant)
+        return islice(merged, self.limit)
+
+    def _filter(self, queryset, ministry_path, parish_path):
+        queryset = super()._filter(queryset, ministry_path, parish_path)
+        if self.ministry_ids:
+            queryset = queryset.filter(**{f"{ministry_path}__in": self.ministry_ids})
+        return queryset
+
+    def _adhoc_events(self):
+        # In start order; no more than ``limit`` of them can be needed
+        events = Event.objects.filter(
+            is_recurring=False,
+            start_datetime__lt=self.window_end,
+            end_datetime__gt=self.now,
+        ).order_by("start_datetime", "pk")
+        return self._filter_events(events).values(
+            *SERIES_FIELDS, "start_datetime", "end_datetime"
+        )[: self.limit]
+
+    def _exceptions(self):
+        # Rescheduled occurrences may have been moved from a past date
+        exceptions = EventException.objects.filter(
+            models.Q(original_occurrence_date__range=[self.start, self.end])
+            | models.Q(status="rescheduled", new_end_datetime__gt=self.now),
+            event__is_recurring=True,
+        )
+        return self._filter_events(exceptions, prefix="event__").values(
+            *EXCEPTION_FIELDS
+        )
+
+    def _adhoc_stream(self):
+        for row in self._adhoc_events():
+            self._add_series(row)
+            yield Occurrence(
+                row["id"],
+                timezone.localdate(row["start_datetime"]),
+                row["start_datetime"],
+                row["end_datetime"],
+            )
+
+    def _not_ended(self, occurrence):
+        end = occurrence.end
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        return end > self.now
+
+    @staticmethod
+    def _start_instant(occurrence):
+        start = occurrence.start
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        return start
+
+
+def find_occurrence(occurrence_id):
+    """
+    Resolve a calendar API occurrence id (``adhoc_{id}`` or
+    ``recurring_{id}_{date}``) to its serialized event, checking the rule and
+    any exception for that one date only. Returns None if there is no such
+    occurrence.
+    """
+    kind, _, rest = occurrence_id.partition("_")
+    try:
+        if kind == "adhoc":
+            event_id, occurrence_date = int(rest), None
+        elif kind == "recurring":
+            event_part, _, date_part = rest.partition("_")
+            event_id = int(event_part)
+            occurrence_date = date.fromisoformat(date_part)
+        else:
+            return None
+    except ValueError:
+        return None
+
+    row = (
+        Event.objects.filter(
+            pk=event_id, is_recurring=kind == "recurring", quarantined=False
+        )
+        .values(*SERIES_FIELDS, *RECURRENCE_FIELDS, "start_datetime", "end_datetime")
+        .first()
+    )
+    if row is None:
+        return None
+
+    if occurrence_date is None:
+        if row["start_datetime"] is None or row["end_datetime"] is None:
+            return None
+        occurrence_date = timezone.localdate(row["start_datetime"])
+        window = CalendarWindow(occurrence_date, occurrence_date)
+        occurrence = Occurrence(
+            event_id, occurrence_date, row["start_datetime"], row["end_datetime"]
+        )
+    else:
+        window = CalendarWindow(occurrence_date, occurrence_date)
+        exceptions = {
+            (event_id, exception["original_occurrence_date"]): exception
+            for exception in EventException.objects.filter(
+                event_id=event_id, original_occurrence_date=occurrence_date
+            ).values(*EXCEPTION_FIELDS)
+        }
+        try:
+            occurrence = next(window._expand_series(row, exceptions), None)
+        except (ValueError, TypeError, AttributeError, OverflowError):
+            return None
+        if occurrence is None:
+            return None
+
+    window._add_series(row)
+    return window.serialize(occurrence)
@@ -0,0 +1,165 @@
+"""
+Response caching for the calendar API.
+
+Cached bodies are keyed by the normalized request parameters plus a global
+"calendar generation" counter. The receivers in core.signals bump the counter
+on every write to the models the calendar is built from, which orphans all
+previously cached responses at once. The counter is a database row rather
+than a cache entry: cache backends need not increment atomically, and may
+evict it.
+
+Misses are built once: the first worker to miss takes a short cache lock and
+rebuilds while the others serve the previous body, kept under a
+generation-independent key for CALENDAR_CACHE_STALE_SECONDS past its expiry,
+or wait briefly for the rebuild when there is none. A stale body is only ever
+served while its replacement is being built.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import quote_etag
+
+from .models import CalendarGeneration
+
+# How long, and how often, a worker without a stale body polls for a body
+# another worker is building before building it too
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+def current_generation():
+    generation = (
+        CalendarGeneration.objects.filter(pk=1).values_list("value", flat=True).first()
+    )
+    if generation is None:
+        # Seed from the clock so a new counter never reuses a generation whose
+        # responses are still cached
+        generation, _ = CalendarGeneration.objects.get_or_create(
+            pk=1, defaults={"value": time.time_ns()}
+        )
+        generation = generation.value
+    return generation
+
+
+def bump_generation():
+    """Invalidate every cached calendar response."""
+    # Readers see the new generation once the write bumping it commits
+    if not CalendarGeneration.objects.filter(pk=1).update(value=F("value") + 1):
+        current_generation()
+
+
+def _normalize(part):
+    if isinstance(part, (list, tuple)):
+        return ",".join(str(item) for item in part)
+    return str(part)
+
+
+def _normalize_parts(parts):
+    return ":".join(_normalize(part) for part in parts)
+
+
+def response_key(*parts, generation=None):
+    return f"calendar:{generation or current_generation()}:{_normalize_parts(parts)}"
+
+
+def _single_flight(parts, build):
+    """
+    Return ``(value, stale)`` for the cached value of ``parts``, building
+    and caching it on a miss. When another worker is already building it,
+    the previous value is returned with ``stale`` set, or, lacking one, the
+    new value is waited for.
+    """
+    timeout = settings.CALENDAR_CACHE_TIMEOUT
+    stale_seconds = settings.CALENDAR_CACHE_STALE_SECONDS
+    key = response_key(*parts)
+    stale_key = f"calendar:stale:{_normalize_parts(parts)}"
+    cached = cache.get_many([key, stale_key] if stale_seconds else [key])
+    if key in cached:
+        return cached[key], False
+
+    lock_key = f"{key}:lock"
+    locked = cache.add(lock_key, True, settings.CALENDAR_CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if stale_key in cached:
+            return cached[stale_key], True
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key)
+            if value is not None:
+                return value, False
+        # The builder is slow or has died; build without the lock
+
+    try:
+        value = build()
+        cache.set(key, value, timeout)
+        if stale_seconds:
+            cache.set(stale_key, value, timeout + stale_seconds)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value, False
+
+
+def cached_json_response(parts, build):
+    """
+    Return a JSON response for ``build()``, reusing the cached body for the
+    same ``parts`` within the current calendar generation. A stale body,
+    served while another worker rebuilds it, is marked ``no-store`` so
+    clients do not keep it under the current validators.
+    """
+    if not settings.CALENDAR_CACHE_TIMEOUT:
+        return JsonResponse(build())
+
+    content, stale = _single_flight(parts, lambda: JsonResponse(build()).content)
+    response = HttpResponse(content, content_type="application/json")
+    if stale:
+        response["Cache-Control"] = "no-store"
+    return response
+
+
+def cached_values(parts_list, build):
+    """
+    Return ``[build(parts) for parts in parts_list]``, reusing the values
+    cached for each ``parts`` within the current calendar generation. Hits
+    are read, and misses stored, with one cache round trip each.
+    """
+    timeout = settings.CALENDAR_CACHE_TIMEOUT
+    if not timeout:
+        return [build(parts) for parts in parts_list]
+
+    generation = current_generation()
+    keys = [response_key(*parts, generation=generation) for parts in parts_list]
+    cached = cache.get_many(keys)
+    missing = {}
+    values = []
+    for key, parts in zip(keys, parts_list):
+        if key not in cached:
+            cached[key] = missing[key] = build(parts)
+        values.append(cached[key])
+    if missing:
+        cache.set_many(missing, timeout)
+    return values
+
+
+def cached_body(parts, build):
+    """
+    Return ``(content, etag, last_modified)`` for the text chunks yielded by
+    ``build()``, reusing the cached entry for the same ``parts`` within the
+    current calendar generation. ``last_modified`` is the epoch second the
+    body was built; a stale entry keeps its own validators.
+    """
+
+    def build_entry():
+        content = "".join(build()).encode()
+        etag = quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest())
+        return content, etag, int(time.time())
+
+    if not settings.CALENDAR_CACHE_TIMEOUT:
+        return build_entry()
+    return _single_flight(parts, build_entry)[0]
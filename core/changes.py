@@ -0,0 +1,180 @@
+"""
+Delta sync for calendar consumers.
+
+Every save and delete of an Event or EventException appends a CalendarChange
+row (see core.signals). A sync token is the id of the last change a client
+has seen, encoded opaquely; ``changes_since`` returns what changed after it,
+one entry per object with its current data, so a poll costs O(changes)
+rather than O(events). Queryset ``update()`` and ``bulk_create()`` bypass the
+signals and are not logged. Pruning records the highest id it deleted, and
+tokens below it have expired.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.http import base36_to_int, int_to_base36
+
+from .models import CalendarChange, ChangeLogHorizon, Event, EventException
+
+EVENT_CHANGE_FIELDS = (
+    "id",
+    "associated_ministry_id",
+    "title",
+    "description",
+    "location",
+    "is_recurring",
+    "start_datetime",
+    "end_datetime",
+    "series_start_date",
+    "series_end_date",
+    "start_time_of_day",
+    "end_time_of_day",
+    "recurrence_rule",
+    "updated_at",
+)
+
+EXCEPTION_CHANGE_FIELDS = (
+    "id",
+    "event_id",
+    "original_occurrence_date",
+    "status",
+    "new_start_datetime",
+    "new_end_datetime",
+    "updated_at",
+)
+
+CHANGE_MODELS = {
+    Event: ("event", EVENT_CHANGE_FIELDS),
+    EventException: ("exception", EXCEPTION_CHANGE_FIELDS),
+}
+
+
+class ExpiredSyncToken(ValueError):
+    """The changes after a sync token have been pruned; resync from scratch."""
+
+
+def record_change(instance, action):
+    name, _ = CHANGE_MODELS[type(instance)]
+    CalendarChange.objects.create(model=name, object_id=instance.pk, action=action)
+
+
+def encode_token(change_id):
+    return int_to_base36(change_id)
+
+
+def decode_token(token):
+    """Return the change id in ``token``; raises ValueError if it is invalid."""
+    if not token or len(token) > 13:
+        raise ValueError("Invalid sync token")
+    return base36_to_int(token)
+
+
+def settled_changes():
+    """
+    The log, less the newest changes: concurrent transactions that logged
+    lower ids are given time to commit first, so no change is skipped.
+    """
+    settled = timezone.now() - timedelta(
+        seconds=settings.CALENDAR_CHANGES_SETTLE_SECONDS
+    )
+    return CalendarChange.objects.filter(changed_at__lte=settled)
+
+
+def current_token():
+    """
+    The token to start syncing from after a full download. Changes that
+    are not yet settled may be reported again; applying them is idempotent.
+    """
+    latest = settled_changes().order_by("-pk").values_list("pk", flat=True)
+    return encode_token(latest.first() or 0)
+
+
+def changes_since(token, limit=None):
+    """
+    Return ``{"changes": [...], "next": token, "more": bool}`` for up to
+    ``limit`` logged changes after ``token``.
+
+    Each changed object appears once, with the net action (an object created
+    and then updated is still "created") and, unless deleted, its current
+    row under ``data``. Raises ValueError for a malformed token and
+    ExpiredSyncToken when the changes after it have been pruned.
+    """
+    since = decode_token(token)
+    limit = limit or settings.CALENDAR_CHANGES_PAGE_SIZE
+
+    if since < ChangeLogHorizon.current():
+        raise ExpiredSyncToken("Sync token has expired")
+
+    log = list(
+        settled_changes()
+        .filter(pk__gt=since)
+        .order_by("pk")
+        .values_list("pk", "model", "object_id", "action")[: limit + 1]
+    )
+    more = len(log) > limit
+    log = log[:limit]
+
+    actions = {}
+    for _, model, object_id, action in log:
+        previous = actions.get((model, object_id))
+        if previous == "created" and action == "updated":
+            action = "created"
+        actions[(model, object_id)] = action
+
+    rows = {}
+    for model_class, (name, fields) in CHANGE_MODELS.items():
+        ids = [
+            object_id
+            for (model, object_id), action in actions.items()
+            if model == name and action != "deleted"
+        ]
+        if ids:
+            for row in model_class.objects.filter(pk__in=ids).values(*fields):
+                rows[(name, row["id"])] = row
+
+    changes = []
+    for (model, object_id), action in actions.items():
+        change = {"model": model, "id": object_id, "action": action}
+        data = rows.get((model, object_id))
+        if data is None:
+            # Deleted by a later change than this page reaches
+            change["action"] = "deleted"
+        else:
+            change["data"] = data
+        changes.append(change)
+
+    return {
+        "changes": changes,
+        "next": encode_token(log[-1][0]) if log else encode_token(since),
+        "more": more,
+    }
+
+
+def prune_changes(days=None):
+    """
+    Delete changes older than ``days`` (CALENDAR_CHANGE_RETENTION_DAYS) and
+    record the highest id deleted in ChangeLogHorizon; clients with older
+    tokens must resync. The newest change is always kept so tokens that are
+    still current remain valid. Returns the number deleted.
+    """
+    days = settings.CALENDAR_CHANGE_RETENTION_DAYS if days is None else days
+    newest = CalendarChange.objects.order_by("-pk").values_list("pk", flat=True)
+    newest = newest.first()
+    if newest is None:
+        return 0
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = CalendarChange.objects.filter(changed_at__lt=cutoff, pk__lt=newest)
+    with transaction.atomic():
+        highest = expired.aggregate(highest=Max("pk"))["highest"]
+        if highest is None:
+            return 0
+        deleted, _ = expired.filter(pk__lte=highest).delete()
+        if highest > ChangeLogHorizon.current():
+            ChangeLogHorizon.objects.update_or_create(
+                pk=1, defaults={"pruned_through": highest}
+            )
+    return deleted
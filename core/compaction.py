@@ -0,0 +1,190 @@
+"""
+Calendar table maintenance (see the compact_calendar command).
+
+Exceptions and ad-hoc events are otherwise kept forever, and the calendar's
+exception lookups scan them. Two passes keep the tables small:
+
+- Cancellations that end a finite series are folded into its
+  ``series_end_date``.
+- Exceptions and events older than the retention window are copied to
+  ArchivedCalendarRow (unless purging) and deleted. A series that continues
+  past the cutoff is restarted at its first occurrence after it, so dropping
+  its old exceptions cannot bring cancelled dates back; one that cannot be
+  restarted keeps them.
+
+Work is done in batches, each in its own short transaction, so it is safe
+to run against a live database, and an interrupted run is finished by the
+next. Rows are saved and deleted through the ORM so the materialized
+occurrences, the change log and the calendar cache follow.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .changes import CHANGE_MODELS
+from .models import ArchivedCalendarRow, Event, EventException
+from .recurrence import continued_rule, parse_rule
+
+
+def fold_trailing_cancellations(batch_size=None):
+    """
+    Shorten finite series whose last occurrences are all cancelled so they
+    end before the cancellations, and delete those exceptions. Returns the
+    number of exceptions removed.
+    """
+    batch_size = batch_size or settings.CALENDAR_COMPACTION_BATCH_SIZE
+    candidates = Event.objects.filter(
+        is_recurring=True,
+        last_occurrence_date__isnull=False,
+        eventexception__status="cancelled",
+        eventexception__original_occurrence_date=F("last_occurrence_date"),
+    ).order_by("pk")
+
+    folded = 0
+    last_pk = 0
+    while True:
+        batch = list(candidates.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return folded
+        last_pk = batch[-1].pk
+        for event in batch:
+            folded += _fold(event)
+
+
+def _fold(event):
+    cancelled = set(
+        event.eventexception_set.filter(status="cancelled").values_list(
+            "original_occurrence_date", flat=True
+        )
+    )
+    dtstart = datetime.combine(event.series_start_date, event.start_time_of_day)
+    try:
+        rule = parse_rule(event.recurrence_rule, dtstart)
+    except ValueError:
+        return 0
+
+    dates = rule.between(
+        datetime.combine(min(cancelled), time.min),
+        datetime.combine(event.last_occurrence_date, time.max),
+        inc=True,
+    )
+    run = []
+    for occurrence_date in sorted({dt.date() for dt in dates}, reverse=True):
+        if occurrence_date not in cancelled:
+            break
+        run.append(occurrence_date)
+    # A series cancelled throughout is left for archiving
+    if not run or rule.before(datetime.combine(run[-1], time.min)) is None:
+        return 0
+
+    with transaction.atomic():
+        event.eventexception_set.filter(original_occurrence_date__in=run).delete()
+        event.series_end_date = run[-1] - timedelta(days=1)
+        event.save()
+    return len(run)
+
+
+def archive_expired(cutoff, batch_size=None, purge=False):
+    """
+    Move exceptions and events that ended before ``cutoff`` (a date) out of
+    the live tables, archiving them unless ``purge`` is set. Exceptions
+    rescheduled to on or after the cutoff are kept. Returns the numbers of
+    (exceptions, events) removed.
+    """
+    batch_size = batch_size or settings.CALENDAR_COMPACTION_BATCH_SIZE
+    cutoff_dt = timezone.make_aware(datetime.combine(cutoff, time.min))
+    # Rescheduled to a date that is still kept
+    moved_on = Q(new_end_datetime__gte=cutoff_dt)
+
+    events = (
+        Event.objects.filter(
+            Q(is_recurring=False, end_datetime__lt=cutoff_dt)
+            | Q(is_recurring=True, last_occurrence_date__lt=cutoff)
+        )
+        .exclude(eventexception__new_end_datetime__gte=cutoff_dt)
+        .order_by("pk")
+    )
+    archived_events = archived_exceptions = 0
+    while True:
+        ids = list(events.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            exceptions = EventException.objects.filter(event_id__in=ids)
+            archived_exceptions += _archive(exceptions, purge)
+            archived_events += _archive(Event.objects.filter(pk__in=ids), purge)
+
+    expired = EventException.objects.filter(
+        original_occurrence_date__lt=cutoff
+    ).exclude(moved_on)
+    event_ids = expired.values_list("event_id", flat=True).order_by("event_id")
+    last_id = 0
+    while True:
+        batch = list(event_ids.filter(event_id__gt=last_id).distinct()[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1]
+        for event in Event.objects.filter(pk__in=batch):
+            keep_from = min(
+                [cutoff]
+                + list(
+                    event.eventexception_set.filter(
+                        moved_on, original_occurrence_date__lt=cutoff
+                    ).values_list("original_occurrence_date", flat=True)
+                )
+            )
+            if event.is_recurring and not _restart_series(event, keep_from):
+                # Dropping its exceptions would bring cancelled dates back
+                continue
+            old = expired.filter(event=event, original_occurrence_date__lt=keep_from)
+            while True:
+                ids = list(old.values_list("pk", flat=True)[:batch_size])
+                if not ids:
+                    break
+                with transaction.atomic():
+                    archived_exceptions += _archive(
+                        EventException.objects.filter(pk__in=ids), purge
+                    )
+
+    return archived_exceptions, archived_events
+
+
+def _restart_series(event, keep_from):
+    """
+    Start ``event`` at its first occurrence on or after ``keep_from``, so
+    only occurrences before it (all older than the cutoff) are dropped with
+    their exceptions. Saving logs the change for sync clients. Returns
+    whether the series starts on or after ``keep_from``.
+    """
+    if event.series_start_date >= keep_from:
+        return True
+    dtstart = datetime.combine(event.series_start_date, event.start_time_of_day)
+    try:
+        first = parse_rule(event.recurrence_rule, dtstart).after(
+            datetime.combine(keep_from, time.min), inc=True
+        )
+        if first is None:
+            return False
+        rule_text = continued_rule(event.recurrence_rule, dtstart, first.date())
+    except ValueError:
+        return False
+    event.recurrence_rule = rule_text
+    event.series_start_date = first.date()
+    event.save()
+    return True
+
+
+def _archive(queryset, purge):
+    """Delete ``queryset``, archiving its rows first unless ``purge``."""
+    if not purge:
+        name, fields = CHANGE_MODELS[queryset.model]
+        ArchivedCalendarRow.objects.bulk_create(
+            ArchivedCalendarRow(model=name, object_id=row["id"], data=row)
+            for row in queryset.values(*fields)
+        )
+    _, deleted = queryset.delete()
+    return deleted.get(queryset.model._meta.label, 0)
@@ -0,0 +1,89 @@
+"""
+Conditional GET for the public calendar and directory views.
+
+A view's validator summarizes the rows it renders: the latest ``updated_at``
+and the row count of each queryset in its scope. Saving a row moves the
+former and deleting one changes the latter, so the validator changes
+whenever the response may have. It costs a single aggregate query, which
+lets unchanged requests be answered with 304 Not Modified before any
+recurrence expansion or template rendering.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.db import DatabaseError
+from django.db.models import Count, Max, Value
+from django.views.decorators.http import condition
+
+logger = logging.getLogger(__name__)
+
+
+def scope_state(querysets):
+    """
+    Return ``(latest updated_at or None, [row count per queryset])``, from a
+    single UNION ALL of the per-queryset aggregates.
+    """
+    summaries = [
+        queryset.order_by()
+        .annotate(scope=Value(index))
+        .values("scope")
+        .annotate(latest=Max("updated_at"), count=Count("pk"))
+        for index, queryset in enumerate(querysets)
+    ]
+    if not summaries:
+        return None, []
+    rows = {row["scope"]: row for row in summaries[0].union(*summaries[1:], all=True)}
+    counts = [
+        rows[index]["count"] if index in rows else 0 for index in range(len(summaries))
+    ]
+    stamps = [row["latest"] for row in rows.values() if row["latest"]]
+    return max(stamps, default=None), counts
+
+
+def conditional_on(scope, per_user=False, refresh_seconds=None):
+    """
+    Decorate a view to answer conditional GETs from the validator of the
+    querysets returned by ``scope(request, *args, **kwargs)``.
+
+    ``per_user`` views render the signed-in user (e.g. the navigation), so
+    their ETag also varies by user. Views that also depend on the time (e.g.
+    upcoming events) pass ``refresh_seconds``: their validator changes at
+    least that often. Without a database the validator is skipped and the
+    view handles the outage itself.
+    """
+
+    def state(request, *args, **kwargs):
+        # condition() asks for the ETag and Last-Modified separately
+        if not hasattr(request, "_conditional_state"):
+            try:
+                current = scope_state(scope(request, *args, **kwargs))
+            except DatabaseError:
+                logger.exception("Database unavailable; skipping conditional GET")
+                current = None
+            if current is not None and refresh_seconds:
+                latest, counts = current
+                period = datetime.fromtimestamp(
+                    time.time() // refresh_seconds * refresh_seconds, tz=dt_timezone.utc
+                )
+                current = (max(latest, period) if latest else period), counts
+            request._conditional_state = current
+        return request._conditional_state
+
+    def etag(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None:
+            return None
+        latest, counts = current
+        user = request.user.pk if per_user and request.user.is_authenticated else ""
+        raw = f"{latest.isoformat() if latest else ''}:{counts}:{user}"
+        return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        return current[0] if current else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
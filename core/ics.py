@@ -0,0 +1,371 @@
+"""
+iCalendar (RFC 5545) feeds.
+
+Recurring events are written as a single VEVENT carrying their RRULE, with
+cancelled occurrences as EXDATEs and rescheduled ones as RECURRENCE-ID
+overrides, so a feed's size grows with the number of events rather than the
+number of occurrences and no rule is expanded to build it. Recurring times are
+wall-clock times in settings.TIME_ZONE, described by a VTIMEZONE after the
+calendar header; ad-hoc and rescheduled times are UTC.
+"""
+
+import logging
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
+from .calendar import EXCEPTION_FIELDS, RECURRENCE_FIELDS, SERIES_FIELDS
+from .models import EventException
+from .rrule_cache import rule_cache
+
+logger = logging.getLogger(__name__)
+
+PRODID = "-//Hogtown Catholic//Parish Calendar//EN"
+
+# VTIMEZONE observances are traced back no further than this year
+FIRST_ZONE_YEAR = 1970
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def feed_chunks(events, name):
+    """
+    Yield a VCALENDAR for the Event queryset ``events`` one folded line at a
+    time. Events and exceptions are read with one query each.
+    """
+    # Quarantined series repeat too often to publish (see core.calendar)
+    events = events.filter(quarantined=False)
+    rows = events.values(
+        *SERIES_FIELDS,
+        *RECURRENCE_FIELDS,
+        "last_occurrence_date",
+        "start_datetime",
+        "end_datetime",
+    ).order_by("id")
+    exceptions = {}
+    for exception in (
+        EventException.objects.filter(event__in=events.filter(is_recurring=True))
+        .order_by("original_occurrence_date")
+        .values(*EXCEPTION_FIELDS)
+    ):
+        exceptions.setdefault(exception["event_id"], []).append(exception)
+
+    stamp = _utc(timezone.now())
+    yield from _lines(
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_text(name)}",
+        f"X-WR-TIMEZONE:{settings.TIME_ZONE}",
+        *_vtimezone(settings.TIME_ZONE, timezone.now().year),
+    )
+    for row in rows.iterator(chunk_size=2000):
+        if row["is_recurring"]:
+            yield from _recurring_event(row, exceptions.get(row["id"], ()), stamp)
+        elif row["start_datetime"] and row["end_datetime"]:
+            yield from _adhoc_event(row, stamp)
+    yield from _lines("END:VCALENDAR")
+
+
+def _adhoc_event(row, stamp):
+    yield from _lines(
+        "BEGIN:VEVENT",
+        f"UID:{_uid(row)}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_utc(row['start_datetime'])}",
+        f"DTEND:{_utc(row['end_datetime'])}",
+        *_details(row, row["title"]),
+        "END:VEVENT",
+    )
+
+
+def _recurring_event(row, exceptions, stamp):
+    rule = _rule(row)
+    if rule is None:
+        return
+
+    start_time, end_time = row["start_time_of_day"], row["end_time_of_day"]
+    yield from _lines(
+        "BEGIN:VEVENT",
+        f"UID:{_uid(row)}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;{_local(row['series_start_date'], start_time)}",
+        f"DTEND;{_local(row['series_start_date'], end_time)}",
+        f"RRULE:{rule}",
+        *(
+            f"EXDATE;{_local(exception['original_occurrence_date'], start_time)}"
+            for exception in exceptions
+            if exception["status"] == "cancelled"
+        ),
+        *_details(row, row["title"]),
+        "END:VEVENT",
+    )
+
+    for exception in exceptions:
+        new_start = exception["new_start_datetime"]
+        new_end = exception["new_end_datetime"]
+        if exception["status"] != "rescheduled" or not (new_start and new_end):
+            continue
+        yield from _lines(
+            "BEGIN:VEVENT",
+            f"UID:{_uid(row)}",
+            f"DTSTAMP:{stamp}",
+            f"RECURRENCE-ID;{_local(exception['original_occurrence_date'], start_time)}",
+            f"DTSTART:{_utc(new_start)}",
+            f"DTEND:{_utc(new_end)}",
+            *_details(row, f"{row['title']} (Rescheduled)"),
+            "END:VEVENT",
+        )
+
+
+def _rule(row):
+    """Return the RRULE value for a series, or None if it is unusable."""
+    rule_text = row["recurrence_rule"].strip()
+    if rule_text.upper().startswith("RRULE:"):
+        rule_text = rule_text[len("RRULE:") :]
+    if not rule_text or row["start_time_of_day"] is None:
+        return None
+    try:
+        # Parsed through the shared cache, but never expanded
+        rule_cache.get(
+            row["id"],
+            row["recurrence_rule"],
+            datetime.combine(row["series_start_date"], row["start_time_of_day"]),
+        )
+    except (ValueError, TypeError, AttributeError, OverflowError) as e:
+        logger.warning(
+            "Omitting recurring event %s from feed: %s - %s",
+            row["id"],
+            type(e).__name__,
+            str(e),
+        )
+        return None
+
+    if not row["series_end_date"]:
+        return rule_text
+    parts = rule_text.split(";")
+    ends = [part for part in parts if part.upper().startswith(("UNTIL=", "COUNT="))]
+    last = row["series_end_date"]
+    if ends:
+        # RFC 5545 allows one of UNTIL and COUNT. last_occurrence_date is set
+        # on save to the last occurrence up to series_end_date, whether the
+        # rule or the series ends first.
+        last = row["last_occurrence_date"]
+        if last is None:
+            # Left empty by a write that bypassed save()
+            return rule_text
+        if last < row["series_start_date"]:
+            # The series never occurs
+            return None
+        rule_text = ";".join(part for part in parts if part not in ends)
+    # UNTIL must be in UTC when DTSTART carries a TZID
+    until = timezone.make_aware(datetime.combine(last, time.max.replace(microsecond=0)))
+    return f"{rule_text};UNTIL={_utc(until)}"
+
+
+@lru_cache(maxsize=8)
+def _vtimezone(name, year):
+    """
+    The VTIMEZONE lines for the zone ``name``. Its changes of offset in
+    ``year`` become yearly rules (e.g. the second Sunday of March) when they
+    fall on the same weekday of the month the next year too, starting from
+    the first year they held. Otherwise that year's changes are listed, and
+    a zone without changes gets its fixed offset.
+    """
+    zone = ZoneInfo(name)
+    changes = [_change(zone, epoch) for epoch in _offset_changes(zone, year)]
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{name}"]
+    if not changes:
+        start = datetime(year, 1, 1, tzinfo=zone)
+        fixed = (
+            datetime(FIRST_ZONE_YEAR, 1, 1),
+            start.utcoffset(),
+            start.utcoffset(),
+            start.tzname(),
+            False,
+        )
+        lines += _observance(fixed, fixed[0])
+    rules = [_yearly_rule(zone, change) for change in changes]
+    if len(changes) == 2 and all(rules):
+        for change, (start, nth) in zip(changes, rules):
+            byday = f"{nth}{WEEKDAYS[start.weekday()]}"
+            rule = f"RRULE:FREQ=YEARLY;BYMONTH={start.month};BYDAY={byday}"
+            lines += _observance(change, start, rule)
+    else:
+        for change in changes:
+            lines += _observance(change, change[0])
+    lines.append("END:VTIMEZONE")
+    return tuple(lines)
+
+
+def _offset_changes(zone, year):
+    """The epochs in ``year`` from which ``zone``'s UTC offset changes."""
+
+    def offset(epoch):
+        return datetime.fromtimestamp(epoch, zone).utcoffset()
+
+    epoch = int(datetime(year, 1, 1, tzinfo=dt_timezone.utc).timestamp())
+    end = int(datetime(year + 1, 1, 1, tzinfo=dt_timezone.utc).timestamp())
+    changes = []
+    while epoch < end:
+        following = epoch + 24 * 60 * 60
+        if offset(following) != offset(epoch):
+            low, high = epoch, following
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset(middle) == offset(epoch):
+                    low = middle
+                else:
+                    high = middle
+            changes.append(high)
+        epoch = following
+    return changes
+
+
+def _change(zone, epoch):
+    """
+    The change of offset at ``epoch`` as ``(wall-clock time it happens at,
+    offset before, offset after, zone name after, whether DST after)``.
+    """
+    start = datetime.fromtimestamp(epoch, zone)
+    before = datetime.fromtimestamp(epoch - 1, zone).utcoffset()
+    local = (start.astimezone(dt_timezone.utc) + before).replace(tzinfo=None)
+    return local, before, start.utcoffset(), start.tzname(), bool(start.dst())
+
+
+def _yearly_rule(zone, change):
+    """
+    Return ``(first, nth)`` when ``change`` happens on the ``nth`` weekday
+    of its month (-1 for the last) in the following year too, where
+    ``first`` is the earliest such change in an unbroken run of years; else
+    None.
+    """
+    local, before, after = change[:3]
+
+    def change_in(year, nth):
+        """The change's time in ``year`` if it is on the ``nth`` weekday."""
+        day = _nth_weekday(year, local.month, local.weekday(), nth)
+        at = datetime.combine(day, local.time())
+        epoch = int((at - before).replace(tzinfo=dt_timezone.utc).timestamp())
+        if (
+            datetime.fromtimestamp(epoch - 1, zone).utcoffset() == before
+            and datetime.fromtimestamp(epoch, zone).utcoffset() == after
+        ):
+            return at
+        return None
+
+    _, days = monthrange(local.year, local.month)
+    nths = [(local.day - 1) // 7 + 1] if local.day <= 28 else []
+    if local.day + 7 > days:
+        nths.append(-1)
+
+    earliest = None
+    for nth in nths:
+        if change_in(local.year + 1, nth) is None:
+            continue
+        first = local
+        for year in range(local.year - 1, FIRST_ZONE_YEAR - 1, -1):
+            at = change_in(year, nth)
+            if at is None:
+                break
+            first = at
+        if earliest is None or first < earliest[0]:
+            earliest = (first, nth)
+    return earliest
+
+
+def _observance(change, start, *rule):
+    """A STANDARD or DAYLIGHT component for ``change`` from ``start``."""
+    _, before, after, name, dst = change
+    kind = "DAYLIGHT" if dst else "STANDARD"
+    return [
+        f"BEGIN:{kind}",
+        f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+        *rule,
+        f"TZOFFSETFROM:{_offset(before)}",
+        f"TZOFFSETTO:{_offset(after)}",
+        f"TZNAME:{name}",
+        f"END:{kind}",
+    ]
+
+
+def _nth_weekday(year, month, weekday, nth):
+    """The ``nth`` ``weekday`` of the month, counting from the end if negative."""
+    if nth > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+    last = date(year, month, monthrange(year, month)[1])
+    return last - timedelta(days=(last.weekday() - weekday) % 7 - 7 * (nth + 1))
+
+
+def _offset(value):
+    """A UTC offset as ``+HHMM``."""
+    minutes = int(value.total_seconds()) // 60
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+def _details(row, summary):
+    lines = [f"SUMMARY:{_text(summary)}"]
+    if row["description"]:
+        lines.append(f"DESCRIPTION:{_text(row['description'])}")
+    if row["location"]:
+        lines.append(f"LOCATION:{_text(row['location'])}")
+    organizer = row["associated_ministry__name"]
+    parish = row["associated_ministry__associated_parish__name"]
+    lines.append(f"CATEGORIES:{_text(organizer)},{_text(parish)}")
+    return lines
+
+
+def _uid(row):
+    return f"event-{row['id']}@hogtown"
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _local(day, time_of_day):
+    """A ``TZID=...:value`` parameter and value for a wall-clock time."""
+    value = datetime.combine(day, time_of_day).strftime("%Y%m%dT%H%M%S")
+    return f"TZID={settings.TIME_ZONE}:{value}"
+
+
+def _text(value):
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _lines(*lines):
+    for line in lines:
+        yield _fold(line)
+
+
+def _fold(line):
+    """Fold a content line at 75 octets, without splitting a character."""
+    if len(line.encode()) <= 75:
+        return f"{line}\r\n"
+    parts = []
+    current, size = "", 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            parts.append(current)
+            # Continuation lines start with a space, which counts toward the 75
+            current, size = " ", 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
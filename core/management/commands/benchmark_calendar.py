@@ -0,0 +1,144 @@
+import statistics
+import time
+from datetime import date
+from datetime import time as time_of_day
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from core.calendar import CalendarWindow
+from core.calendar_cache import bump_generation
+from core.models import Event, Ministry, Parish, User
+from core.views import get_calendar_events
+
+# Rules given to seeded series in turn; the monthly one is expanded in Python
+# by either backend
+SEED_RULES = (
+    "FREQ=DAILY",
+    "FREQ=WEEKLY;BYDAY=SU",
+    "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU",
+    "FREQ=DAILY;INTERVAL=3",
+    "FREQ=MONTHLY;BYDAY=1SA",
+)
+
+
+class Command(BaseCommand):
+    help = "Time calendar API responses with a cold and a warm response cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            help="First day of the window (YYYY-MM-DD); defaults to this month",
+        )
+        parser.add_argument(
+            "--months", type=int, default=1, help="Length of the window in months"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Number of timed runs per mode"
+        )
+        parser.add_argument(
+            "--backends",
+            action="store_true",
+            help="Also time recurrence expansion with the python and sql backends",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Add this many synthetic series for the run; they are rolled back",
+        )
+
+    def handle(self, *args, **options):
+        if options["start"]:
+            try:
+                start = date.fromisoformat(options["start"])
+            except ValueError:
+                raise CommandError("--start must be a YYYY-MM-DD date")
+        else:
+            start = timezone.localdate().replace(day=1)
+        end = start + relativedelta(months=options["months"]) - timedelta(days=1)
+
+        if options["seed"] < 0:
+            raise CommandError("--seed must not be negative")
+        with transaction.atomic():
+            if options["seed"]:
+                self._seed(options["seed"], start)
+            self._benchmark(start, end, options)
+            transaction.set_rollback(True)
+
+    def _benchmark(self, start, end, options):
+        request = RequestFactory().get(
+            "/api/calendar-events/",
+            {"start": start.isoformat(), "end": end.isoformat()},
+        )
+
+        cold, warm = [], []
+        for _ in range(options["repeat"]):
+            bump_generation()
+            cold.append(self._time(request))
+            warm.append(self._time(request))
+
+        size = len(get_calendar_events(request).content)
+        self.stdout.write(f"Window {start} to {end}, {size} bytes per response")
+        for label, timings in (("cold", cold), ("warm", warm)):
+            self.stdout.write(
+                f"{label}: median {statistics.median(timings):.2f} ms, "
+                f"min {min(timings):.2f} ms, max {max(timings):.2f} ms"
+            )
+
+        if options["backends"]:
+            for backend in ("python", "sql"):
+                with override_settings(CALENDAR_EXPANSION_BACKEND=backend):
+                    timings = [
+                        self._time_expansion(start, end)
+                        for _ in range(options["repeat"])
+                    ]
+                self.stdout.write(
+                    f"{backend} expansion: median {statistics.median(timings):.2f} ms, "
+                    f"min {min(timings):.2f} ms, max {max(timings):.2f} ms"
+                )
+
+    def _seed(self, count, start):
+        user = User.objects.create_user(
+            username="benchmark-seed", password=None, status="approved"
+        )
+        parish = Parish.objects.create(name="Benchmark Parish", address="")
+        ministry = Ministry.objects.create(
+            owner_user=user,
+            associated_parish=parish,
+            name="Benchmark Ministry",
+            description="",
+            contact_info="",
+        )
+        for i in range(count):
+            Event.objects.create(
+                associated_ministry=ministry,
+                title=f"Seeded Series {i}",
+                description="",
+                location="",
+                is_recurring=True,
+                series_start_date=start - timedelta(days=i % 400),
+                start_time_of_day=time_of_day(9 + i % 10, 0),
+                end_time_of_day=time_of_day(10 + i % 10, 0),
+                recurrence_rule=SEED_RULES[i % len(SEED_RULES)],
+            )
+        self.stdout.write(f"Seeded {count} series")
+
+    def _time_expansion(self, start, end):
+        # Expanded from the rules, whether or not a horizon is materialized
+        window = CalendarWindow(start, end)
+        started = time.perf_counter()
+        for _ in window._expanded_occurrences():
+            pass
+        return (time.perf_counter() - started) * 1000
+
+    def _time(self, request):
+        started = time.perf_counter()
+        get_calendar_events(request)
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.occurrence_index import build_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the shared occurrence index if the calendar has changed since "
+        "it was built. Intended to run every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild the index even if it is current",
+        )
+
+    def handle(self, *args, **options):
+        indexed = build_index(force=options["force"])
+        if indexed is None:
+            self.stdout.write("The occurrence index is current or disabled.")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Indexed {indexed} occurrences in "
+                    f"{settings.CALENDAR_OCCURRENCE_INDEX_PATH}."
+                )
+            )
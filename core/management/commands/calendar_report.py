@@ -0,0 +1,102 @@
+import json
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.calendar import RECURRENCE_FIELDS, explain_series
+from core.models import Event, EventException
+
+
+class Command(BaseCommand):
+    help = (
+        "Rank recurring events by what expanding them over the coming months "
+        "costs, to find rules worth simplifying or quarantining. Ad-hoc "
+        "events have a single occurrence and are not listed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months", type=int, default=12, help="Length of the window in months"
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of events listed; 0 lists them all",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Write the report as JSON"
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months must be at least 1")
+        start = timezone.localdate()
+        end = start + relativedelta(months=options["months"]) - timedelta(days=1)
+
+        exceptions = set(
+            EventException.objects.filter(
+                original_occurrence_date__range=[start, end]
+            ).values_list("event_id", "original_occurrence_date")
+        )
+        rows = (
+            Event.objects.filter(is_recurring=True)
+            .exclude(recurrence_rule="")
+            .values("id", "title", "quarantined", *RECURRENCE_FIELDS)
+        )
+        report = []
+        for row in rows.iterator(chunk_size=500):
+            stats = explain_series(row, start, end, exceptions)
+            stats["quarantined"] = row["quarantined"]
+            report.append(stats)
+        report.sort(key=lambda stats: -(stats["parse_ms"] + stats["expansion_ms"]))
+        listed = report[: options["limit"]] if options["limit"] else report
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps(
+                    {
+                        "start": start.isoformat(),
+                        "end": end.isoformat(),
+                        "events": listed,
+                    },
+                    indent=2,
+                )
+            )
+            return
+
+        self.stdout.write(
+            f"Expansion cost of {len(report)} recurring events from {start} to {end}"
+        )
+        self.stdout.write(
+            f"{'#':>4} {'Event':>7} {'Occurrences':>11} {'Exceptions':>10} "
+            f"{'Parse ms':>9} {'Expand ms':>9}  Rule"
+        )
+        for rank, stats in enumerate(listed, 1):
+            flags = [
+                flag
+                for flag, present in (
+                    ("over budget", stats["over_budget"]),
+                    ("quarantined", stats["quarantined"]),
+                    (stats.get("error"), "error" in stats),
+                )
+                if present
+            ]
+            line = (
+                f"{rank:>4} {stats['event_id']:>7} {stats['occurrences']:>11} "
+                f"{stats['exceptions_applied']:>10} {stats['parse_ms']:>9.3f} "
+                f"{stats['expansion_ms']:>9.3f}  {stats['rule']}"
+            )
+            if flags:
+                line += f"  [{', '.join(flags)}]"
+            line = self.style.WARNING(line) if flags else line
+            self.stdout.write(line)
+
+        total_ms = sum(stats["parse_ms"] + stats["expansion_ms"] for stats in report)
+        self.stdout.write(
+            f"Total: {sum(stats['occurrences'] for stats in report)} occurrences "
+            f"in {total_ms:.1f} ms"
+        )
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.compaction import archive_expired, fold_trailing_cancellations
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold trailing cancellations into series end dates and archive "
+        "exceptions and events older than the retention period. Intended to "
+        "run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CALENDAR_ARCHIVE_RETENTION_DAYS,
+            help="Number of days of past exceptions and events to keep",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CALENDAR_COMPACTION_BATCH_SIZE,
+            help="Most rows archived or deleted per transaction",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete old rows without copying them to the archive table",
+        )
+
+    def handle(self, *args, **options):
+        folded = fold_trailing_cancellations(options["batch_size"])
+        cutoff = timezone.localdate() - timedelta(days=options["days"])
+        exceptions, events = archive_expired(
+            cutoff, options["batch_size"], purge=options["purge"]
+        )
+        verb = "purged" if options["purge"] else "archived"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Folded {folded} trailing cancellations; {verb} "
+                f"{exceptions} exceptions and {events} events from before "
+                f"{cutoff}. Reclaimed {folded + exceptions + events} rows."
+            )
+        )
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.occurrence_index import build_index
+from core.occurrences import extend_horizon
+
+
+class Command(BaseCommand):
+    help = (
+        "Materialize event occurrences up to the configured horizon. "
+        "Intended to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CALENDAR_OCCURRENCE_HORIZON_DAYS,
+            help="Number of days past today to materialize occurrences for",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Regenerate all occurrences instead of only extending the horizon",
+        )
+
+    def handle(self, *args, **options):
+        through = timezone.localdate() + timedelta(days=options["days"])
+        created = extend_horizon(through, rebuild=options["rebuild"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Materialized {created} occurrences; horizon is now {through}."
+            )
+        )
+        indexed = build_index(force=True)
+        if indexed is not None:
+            self.stdout.write(
+                f"Indexed {indexed} occurrences in "
+                f"{settings.CALENDAR_OCCURRENCE_INDEX_PATH}."
+            )
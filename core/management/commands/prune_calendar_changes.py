@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.changes import prune_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete calendar change log entries older than the retention period. "
+        "Intended to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CALENDAR_CHANGE_RETENTION_DAYS,
+            help="Number of days of changes to keep for sync clients",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} calendar changes."))
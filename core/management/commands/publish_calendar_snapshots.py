@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core.snapshots import publish_snapshots, snapshot_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish this month and the following ones as calendar JSON snapshots "
+        "under CALENDAR_SNAPSHOT_ROOT. Intended to run after deploys and nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Republish even if the snapshots are already current",
+        )
+
+    def handle(self, *args, **options):
+        manifest = publish_snapshots(force=options["force"])
+        if manifest is None:
+            self.stdout.write("Calendar snapshots are already current.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Published {', '.join(manifest['months'])} to {snapshot_root()}."
+            )
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.2 on 2026-10-17 03:29
+
+from django.db import migrations, models
+
+GIST_INDEX = "core_event_adhoc_range_gist"
+
+
+def create_range_index(apps, schema_editor):
+    # PostgreSQL only: lets ad-hoc window overlap queries use a GiST index
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIST_INDEX} ON core_event USING gist "
+        "(tstzrange(start_datetime, end_datetime)) "
+        "WHERE NOT is_recurring AND start_datetime <= end_datetime"
+    )
+
+
+def drop_range_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIST_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_eventoccurrence_occurrencehorizon"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["is_recurring", "start_datetime", "end_datetime"],
+                name="core_event_is_recu_d01ba2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["is_recurring", "series_start_date", "series_end_date"],
+                name="core_event_is_recu_9b8ed9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventexception",
+            index=models.Index(
+                fields=["original_occurrence_date"],
+                name="core_evente_origina_f7058f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventoccurrence",
+            index=models.Index(fields=["end"], name="core_evento_end_4791e5_idx"),
+        ),
+        migrations.RunPython(create_range_index, drop_range_index),
+    ]
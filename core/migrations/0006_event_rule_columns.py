@@ -0,0 +1,154 @@
+# Generated by Django 5.2.2 on 2026-10-17 03:35
+
+from datetime import datetime, time, timedelta
+
+from dateutil.rrule import rruleset, rrulestr
+
+from django.db import migrations, models
+
+# The backfill uses a frozen copy of core.recurrence.recurrence_columns as of
+# this migration, so later changes to it cannot change what it writes
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def recurrence_columns(
+    rule_text, series_start_date, start_time_of_day, series_end_date
+):
+    columns = {
+        "rule_freq": "",
+        "rule_interval": None,
+        "rule_byday": 0,
+        "rule_count": None,
+        "rule_until": None,
+        "last_occurrence_date": None,
+    }
+    if not rule_text or series_start_date is None or start_time_of_day is None:
+        return columns
+
+    dtstart = datetime.combine(series_start_date, start_time_of_day)
+    try:
+        rule = rrulestr(rule_text, dtstart=dtstart)
+    except (ValueError, TypeError, AttributeError, OverflowError):
+        return columns
+
+    parts = {}
+    for line in rule_text.upper().split():
+        if line.startswith("RRULE:"):
+            line = line[len("RRULE:") :]
+        elif ":" in line:
+            continue
+        for pair in line.split(";"):
+            name, _, value = pair.partition("=")
+            parts[name] = value
+    columns["rule_freq"] = parts.get("FREQ", "")
+    columns["rule_interval"] = _int(parts.get("INTERVAL")) or 1
+    columns["rule_count"] = _int(parts.get("COUNT"))
+    columns["rule_until"] = _until_date(parts.get("UNTIL"))
+
+    # RDATEs and extra RRULEs (an rruleset) can land on any weekday
+    if not isinstance(rule, rruleset):
+        columns["rule_byday"] = _weekdays(parts, series_start_date)
+
+    if columns["rule_count"] or columns["rule_until"] or series_end_date:
+        bound = datetime.max
+        if series_end_date:
+            bound = datetime.combine(series_end_date, time.max)
+        try:
+            last = rule.before(bound, inc=True)
+        except (ValueError, OverflowError):
+            return columns
+        # A series that never occurs has "finished" before it started
+        columns["last_occurrence_date"] = (
+            last.date() if last else series_start_date - timedelta(days=1)
+        )
+    return columns
+
+
+def _weekdays(parts, series_start_date):
+    if "BYDAY" in parts:
+        # Ordinals such as 1SU still restrict the weekday
+        days = [day.lstrip("+-0123456789") for day in parts["BYDAY"].split(",")]
+        days = [WEEKDAYS.index(day) for day in days if day in WEEKDAYS]
+    elif parts.get("FREQ") == "WEEKLY" and not any(
+        name.startswith("BY") for name in parts
+    ):
+        # dateutil repeats a plain weekly rule on DTSTART's weekday
+        days = [series_start_date.weekday()]
+    else:
+        return 0
+    mask = 0
+    for weekday in days:
+        mask |= 1 << weekday
+    return mask
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _until_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def backfill_rule_columns(apps, schema_editor):
+    Event = apps.get_model("core", "Event")
+    events = Event.objects.filter(is_recurring=True).exclude(recurrence_rule="")
+    for event in events.iterator():
+        columns = recurrence_columns(
+            event.recurrence_rule,
+            event.series_start_date,
+            event.start_time_of_day,
+            event.series_end_date,
+        )
+        Event.objects.filter(pk=event.pk).update(**columns)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_calendar_window_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="last_occurrence_date",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rule_byday",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rule_count",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rule_freq",
+            field=models.CharField(blank=True, editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rule_interval",
+            field=models.PositiveSmallIntegerField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rule_until",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_rule_columns, migrations.RunPython.noop),
+    ]
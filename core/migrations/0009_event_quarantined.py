@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-17 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_calendarchange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="quarantined",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
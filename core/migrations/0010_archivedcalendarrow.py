@@ -0,0 +1,43 @@
+# Generated by Django 5.2.2 on 2026-10-17 04:14
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_event_quarantined"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedCalendarRow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "model",
+                    models.CharField(
+                        choices=[("event", "Event"), ("exception", "Event exception")],
+                        max_length=10,
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("archived_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.2 on 2026-10-17 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_archivedcalendarrow"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CalendarGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.BigIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.2 on 2026-10-17 06:09
+
+from django.db import migrations, models
+
+
+def seed_horizon(apps, schema_editor):
+    # Earlier prunes were not recorded; assume everything below the oldest
+    # remaining change was pruned, as the sync API did until now
+    CalendarChange = apps.get_model("core", "CalendarChange")
+    ChangeLogHorizon = apps.get_model("core", "ChangeLogHorizon")
+    oldest = CalendarChange.objects.order_by("pk").values_list("pk", flat=True)
+    oldest = oldest.first()
+    if oldest is not None and oldest > 1:
+        ChangeLogHorizon.objects.create(pruned_through=oldest - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_calendargeneration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogHorizon",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pruned_through", models.BigIntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_horizon, migrations.RunPython.noop),
+    ]
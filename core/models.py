@@ -1,6 +1,13 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+
+from . import recurrence
+from .recurrence import EMPTY_COLUMNS, RULE_COLUMNS, continued_rule, recurrence_columns
 
 
 class Parish(models.Model):
@@ -9,6 +16,7 @@ class Parish(models.Model):
     website_url = models.URLField(blank=True, null=True)
     phone_number = models.CharField(max_length=20, blank=True)
     mass_schedule = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -58,6 +66,7 @@ class User(AbstractUser):
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -73,6 +82,7 @@ class Ministry(models.Model):
     description = models.TextField()
     contact_info = models.TextField()
     categories = models.ManyToManyField(Category, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -99,9 +109,84 @@ class Event(models.Model):
     end_time_of_day = models.TimeField(null=True, blank=True)
     recurrence_rule = models.TextField(blank=True)
 
+    # Normalized from recurrence_rule on save (see core.recurrence) so calendar
+    # queries can skip series that cannot occur in a window
+    rule_freq = models.CharField(max_length=10, blank=True, editable=False)
+    rule_interval = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False
+    )
+    # Bit n set when the series only occurs on weekday n (Monday = 0); 0 = any day
+    rule_byday = models.PositiveSmallIntegerField(default=0, editable=False)
+    rule_count = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    rule_until = models.DateField(null=True, blank=True, editable=False)
+    # Null while the series is open-ended
+    last_occurrence_date = models.DateField(null=True, blank=True, editable=False)
+    # Series whose rule repeats more often than the calendar allows are left out
+    # of it; set on save, or when materializing runs over budget (core.occurrences)
+    quarantined = models.BooleanField(default=False, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.update_recurrence_columns()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                *RULE_COLUMNS,
+                "quarantined",
+                "updated_at",
+            }
+        super().save(*args, **kwargs)
+
+    def update_recurrence_columns(self):
+        """
+        Recompute the normalized rule columns and whether the rule is too
+        costly to show. Queryset ``update()`` and ``bulk_create()`` bypass
+        this; empty columns never hide a series.
+        """
+        self.quarantined = False
+        columns = EMPTY_COLUMNS
+        if self.is_recurring:
+            try:
+                rule, cost = self.parsed_rule()
+            except (TypeError, ValueError):
+                # Incomplete, or the rule is invalid
+                rule = cost = None
+            columns = recurrence_columns(
+                self.recurrence_rule,
+                self.series_start_date,
+                self.start_time_of_day,
+                self.series_end_date,
+                rule=rule,
+                cost=cost,
+            )
+            if rule is not None and columns["rule_freq"]:
+                budget = settings.CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES
+                self.quarantined = not cost or cost > budget
+        for name, value in columns.items():
+            setattr(self, name, value)
+
+    def parsed_rule(self):
+        """
+        Return the series' parsed rule and its cost (monthly_occurrences up
+        to CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES). Both are kept until the
+        rule or start changes, so clean() and save() parse the rule once.
+        Raises ValueError if the rule is invalid.
+        """
+        dtstart = datetime.combine(self.series_start_date, self.start_time_of_day)
+        budget = settings.CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES
+        key = (self.recurrence_rule, dtstart, budget)
+        if getattr(self, "_parsed_rule", (None,))[0] != key:
+            rule = recurrence.parse_rule(self.recurrence_rule, dtstart)
+            cost = recurrence.monthly_occurrences(
+                self.recurrence_rule, dtstart, budget, rule=rule
+            )
+            self._parsed_rule = (key, rule, cost)
+        return self._parsed_rule[1:]
+
     def clean(self):
         if self.is_recurring:
             if not all(
@@ -116,9 +201,90 @@ class Event(models.Model):
                     "Recurring events must have series dates, times, "
                     "and recurrence rule."
                 )
+            budget = settings.CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES
+            try:
+                _, cost = self.parsed_rule()
+            except ValueError:
+                raise ValidationError(
+                    {"recurrence_rule": "Enter a valid recurrence rule."}
+                )
+            if not cost:
+                raise ValidationError({"recurrence_rule": "This rule never occurs."})
+            if cost > budget:
+                raise ValidationError(
+                    {
+                        "recurrence_rule": (
+                            "This rule repeats too often; at most "
+                            f"{budget} occurrences a month are allowed."
+                        )
+                    }
+                )
         else:
             if not all([self.start_datetime, self.end_datetime]):
                 raise ValidationError("Ad-hoc events must have start and end datetime.")
+            # An empty range never overlaps a calendar window (core.calendar)
+            if self.start_datetime >= self.end_datetime:
+                raise ValidationError(
+                    {"end_datetime": "The event must end after it starts."}
+                )
+
+    def split_series(self, split_date, **changes):
+        """
+        Change this and all future occurrences: end the series the day before
+        ``split_date`` and continue it from that date as a new Event with
+        ``changes`` applied, moving the exceptions from that date on to it.
+
+        Returns the new Event. Raises ValidationError if ``split_date`` is not
+        an occurrence after the first, the series ends before it or the
+        changed series is invalid.
+        """
+        if not self.is_recurring:
+            raise ValidationError("Only recurring events can be split.")
+        if self.series_end_date and split_date > self.series_end_date:
+            raise ValidationError("The series ends before that date.")
+        dtstart = datetime.combine(self.series_start_date, self.start_time_of_day)
+        try:
+            rule_text = continued_rule(self.recurrence_rule, dtstart, split_date)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+        continuation = Event(
+            associated_ministry_id=self.associated_ministry_id,
+            title=self.title,
+            description=self.description,
+            location=self.location,
+            is_recurring=True,
+            series_start_date=split_date,
+            series_end_date=self.series_end_date,
+            start_time_of_day=self.start_time_of_day,
+            end_time_of_day=self.end_time_of_day,
+            recurrence_rule=rule_text,
+        )
+        for name, value in changes.items():
+            setattr(continuation, name, value)
+        continuation.series_start_date = split_date
+        continuation.clean()
+
+        with transaction.atomic():
+            self.series_end_date = split_date - timedelta(days=1)
+            self.save()
+            continuation.save()
+            # Saved one by one so their occurrences and change log follow
+            for exception in self.eventexception_set.filter(
+                original_occurrence_date__gte=split_date
+            ):
+                exception.event = continuation
+                exception.save()
+        return continuation
+
+    class Meta:
+        # Calendar windows are overlap queries on these columns
+        indexes = [
+            models.Index(fields=["is_recurring", "start_datetime", "end_datetime"]),
+            models.Index(
+                fields=["is_recurring", "series_start_date", "series_end_date"]
+            ),
+        ]
 
 
 class EventException(models.Model):
@@ -132,6 +298,7 @@ class EventException(models.Model):
     status = models.CharField(max_length=12, choices=STATUS_CHOICES)
     new_start_datetime = models.DateTimeField(null=True, blank=True)
     new_end_datetime = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.event.title} - {self.original_occurrence_date} ({self.status})"
@@ -146,3 +313,146 @@ class EventException(models.Model):
 
     class Meta:
         unique_together = ("event", "original_occurrence_date")
+        indexes = [models.Index(fields=["original_occurrence_date"])]
+
+
+class EventOccurrence(models.Model):
+    """A single materialized occurrence of an Event.
+
+    Rows are generated from the Event's schedule and its EventExceptions by
+    core.occurrences so the calendar can answer a date window with a single
+    indexed range query instead of expanding recurrence rules per request.
+    """
+
+    STATUS_CHOICES = [
+        ("scheduled", "Scheduled"),
+        ("cancelled", "Cancelled"),
+        ("rescheduled", "Rescheduled"),
+    ]
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="occurrences"
+    )
+    # Original (local) date of the occurrence; the key exceptions refer to
+    date = models.DateField()
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    status = models.CharField(
+        max_length=12, choices=STATUS_CHOICES, default="scheduled"
+    )
+
+    # Denormalized from the event's ministry for filtered window queries
+    ministry = models.ForeignKey(Ministry, on_delete=models.CASCADE, related_name="+")
+    parish = models.ForeignKey(Parish, on_delete=models.CASCADE, related_name="+")
+
+    def __str__(self):
+        return f"{self.event.title} - {self.date} ({self.status})"
+
+    class Meta:
+        unique_together = ("event", "date")
+        indexes = [
+            models.Index(fields=["date"]),
+            models.Index(fields=["parish", "date"]),
+            models.Index(fields=["ministry", "date"]),
+            # Finds multi-day events that started before a window
+            models.Index(fields=["end"]),
+        ]
+
+
+class OccurrenceHorizon(models.Model):
+    """Date through which EventOccurrence rows have been generated.
+
+    A single row is kept. Until it exists the calendar expands recurrence
+    rules on the fly; windows ending after it do the same.
+    """
+
+    materialized_through = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Occurrences through {self.materialized_through}"
+
+    @classmethod
+    def current(cls):
+        """Return the date occurrences are materialized through, or None."""
+        horizon = cls.objects.order_by("pk").first()
+        return horizon.materialized_through if horizon else None
+
+
+class CalendarGeneration(models.Model):
+    """Counter keying cached calendar responses (see core.calendar_cache).
+
+    A single row is kept, so bumping it is one atomic UPDATE however many
+    workers write at once.
+    """
+
+    value = models.BigIntegerField()
+
+    def __str__(self):
+        return f"Calendar generation {self.value}"
+
+
+class CalendarChange(models.Model):
+    """A created, updated or deleted Event or EventException.
+
+    Appended by the receivers in core.signals, including for deletes, so sync
+    clients can fetch only what changed since their last sync token (the id of
+    the last change they have seen) from the calendar changes API.
+    """
+
+    MODEL_CHOICES = [
+        ("event", "Event"),
+        ("exception", "Event exception"),
+    ]
+
+    ACTION_CHOICES = [
+        ("created", "Created"),
+        ("updated", "Updated"),
+        ("deleted", "Deleted"),
+    ]
+
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES)
+    object_id = models.PositiveIntegerField()
+    action = models.CharField(max_length=7, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.action}"
+
+
+class ChangeLogHorizon(models.Model):
+    """Highest CalendarChange id deleted by pruning (see core.changes).
+
+    A single row is kept. Sync tokens below it may have missed pruned
+    changes and must resync; ids can have gaps, so the oldest remaining
+    change does not tell.
+    """
+
+    pruned_through = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Changes pruned through {self.pruned_through}"
+
+    @classmethod
+    def current(cls):
+        """Return the highest pruned change id, or 0 if none was pruned."""
+        horizon = cls.objects.order_by("pk").first()
+        return horizon.pruned_through if horizon else 0
+
+
+class ArchivedCalendarRow(models.Model):
+    """An Event or EventException moved out of the live tables.
+
+    Written by the compact_calendar command once a row is older than the
+    retention window, with its field values, so the calendar lookups no
+    longer scan it.
+    """
+
+    model = models.CharField(max_length=10, choices=CalendarChange.MODEL_CHOICES)
+    object_id = models.PositiveIntegerField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} (archived {self.archived_at:%Y-%m-%d})"
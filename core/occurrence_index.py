@@ -0,0 +1,251 @@
+"""
+Shared-memory occurrence index.
+
+Gunicorn runs a worker per CPU and recycles each one after --max-requests, so
+an in-process occurrence cache would be duplicated per worker and lost on
+every recycle. Instead the materialized occurrences are written to a compact
+binary file, CALENDAR_OCCURRENCE_INDEX_PATH, which every worker maps
+read-only: the operating system keeps one copy in its page cache, and a
+freshly started worker answers from it without warming up.
+
+The file holds one row per non-cancelled EventOccurrence, sorted by start,
+as parallel fixed-width columns (the layout of a NumPy structured array,
+built with the standard library's ``array``, ``mmap`` and ``memoryview``):
+start and end epochs, event, ministry and parish ids (int64), date ordinal
+(int32) and a rescheduled flag (int8), in the host's byte order, followed by
+the numbers of the rescheduled rows sorted by date. A window is located by
+binary search over the start column and read from it in place, with the few
+rescheduled rows whose original date falls in the window merged in.
+
+The header records the calendar generation and horizon the file was built
+from; readers ignore a stale file and use the database. Rebuilding reads
+every materialized occurrence, so it is not done on each calendar change:
+the ``build_occurrence_index`` command, run every few minutes, rebuilds the
+file only when it is stale, and ``extend_occurrence_horizon`` rebuilds it
+nightly. Either writes a new file and renames it over the old one.
+"""
+
+import bisect
+import heapq
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .calendar_cache import current_generation
+from .models import EventOccurrence, OccurrenceHorizon
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HTOI"
+VERSION = 2
+
+# Magic, version, generation, horizon ordinal, longest span in days, row
+# count, rescheduled row count
+HEADER = struct.Struct("=4sH2xqiiqq")
+
+# Column name and array typecode, in file order; the 8-byte columns come
+# first so every column stays aligned. "moved" holds the rescheduled rows'
+# numbers and has one entry per rescheduled row, the others one per row.
+COLUMNS = (
+    ("start", "q"),
+    ("end", "q"),
+    ("event", "q"),
+    ("ministry", "q"),
+    ("parish", "q"),
+    ("moved", "q"),
+    ("date", "i"),
+    ("rescheduled", "b"),
+)
+
+DAY = 24 * 60 * 60
+
+# (file identity, OccurrenceIndex) for this process's current mapping
+_mapped = None
+
+
+class OccurrenceIndex:
+    """
+    The columns of an index file, as zero-copy views of ``buffer``:
+    ``index.start[i]``, ``index.event[i]`` and so on for row ``i``.
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise ValueError("Truncated occurrence index")
+        (
+            magic,
+            version,
+            generation,
+            horizon,
+            max_span,
+            count,
+            moved,
+        ) = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not an occurrence index")
+        self.generation = generation
+        self.horizon = date.fromordinal(horizon)
+        # The most days a scheduled row's end falls after its date
+        self.max_span = max_span
+        self.count = count
+
+        view = memoryview(buffer)
+        offset = HEADER.size
+        for name, typecode in COLUMNS:
+            size = array(typecode).itemsize * (moved if name == "moved" else count)
+            if offset + size > len(buffer):
+                raise ValueError("Truncated occurrence index")
+            setattr(self, name, view[offset : offset + size].cast(typecode))
+            offset += size
+
+    def span(self, window_start, window_end):
+        """
+        Return the ``range`` of rows that can belong to the window
+        [``window_start``, ``window_end``) (epochs). Scheduled rows start on
+        their date, so those dated in the window, or earlier and still
+        running, start within it or at most ``max_span`` days before it.
+        """
+        first = bisect.bisect_left(self.start, window_start - (self.max_span + 1) * DAY)
+        last = bisect.bisect_left(self.start, window_end, first)
+        return range(first, last)
+
+    def rows(self, start, end, window_start, window_end):
+        """
+        Yield the rows of the window [start, end], in start order: those
+        dated within it, and scheduled rows from earlier days still running
+        at ``window_start``, as the materialized query selects.
+        ``window_start`` and ``window_end`` are the window's bounds as
+        epochs. Rows are read in place from the span; only rescheduled rows
+        moved out of it are looked up separately and merged in.
+        """
+        first, last = start.toordinal(), end.toordinal()
+        span = self.span(window_start, window_end)
+        dates, rescheduled = self.date, self.rescheduled
+
+        def dated(row):
+            if dates[row] >= first:
+                return dates[row] <= last
+            return not rescheduled[row] and self.end[row] > window_start
+
+        # Row numbers follow start order, so they merge as they are
+        low = bisect.bisect_left(self.moved, first, key=dates.__getitem__)
+        high = bisect.bisect_right(self.moved, last, low, key=dates.__getitem__)
+        outside = sorted(row for row in self.moved[low:high] if row not in span)
+        return heapq.merge(filter(dated, span), outside)
+
+    def period(self, row):
+        """The aware (start, end) datetimes of ``row``."""
+        return (
+            datetime.fromtimestamp(self.start[row], tz=dt_timezone.utc),
+            datetime.fromtimestamp(self.end[row], tz=dt_timezone.utc),
+        )
+
+
+def current_index():
+    """
+    Return the index when it is enabled and was built from the current
+    calendar generation, else None. A file replaced by a rebuild is mapped
+    again; the old mapping lives on until nothing refers to it.
+    """
+    global _mapped
+    path = settings.CALENDAR_OCCURRENCE_INDEX_PATH
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    identity = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _mapped is None or _mapped[0] != identity:
+        try:
+            with open(path, "rb") as index_file:
+                buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            _mapped = (identity, OccurrenceIndex(buffer))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring occurrence index %s: %s", path, e)
+            return None
+
+    index = _mapped[1]
+    if index.generation != current_generation():
+        return None
+    return index
+
+
+def build_index(force=False):
+    """
+    Write the index from the materialized occurrences. Returns the number of
+    rows written, or None if the index is disabled, there is no horizon yet,
+    or (unless ``force``) the file is already current.
+    """
+    path = settings.CALENDAR_OCCURRENCE_INDEX_PATH
+    if not path:
+        return None
+    if not force and current_index() is not None:
+        return None
+    # Read before the rows: a change made meanwhile leaves the file stale
+    generation = current_generation()
+    horizon = OccurrenceHorizon.current()
+    if horizon is None:
+        return None
+
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    max_span = 0
+    rows = (
+        EventOccurrence.objects.exclude(status="cancelled")
+        .order_by("start", "date", "pk")
+        .values_list(
+            "start", "end", "date", "event_id", "ministry_id", "parish_id", "status"
+        )
+    )
+    for row in rows.iterator(chunk_size=2000):
+        start_dt, end_dt, day, event_id, ministry_id, parish_id, status = row
+        rescheduled = status == "rescheduled"
+        columns["start"].append(int(start_dt.timestamp()))
+        columns["end"].append(int(end_dt.timestamp()))
+        columns["date"].append(day.toordinal())
+        columns["event"].append(event_id)
+        columns["ministry"].append(ministry_id)
+        columns["parish"].append(parish_id)
+        columns["rescheduled"].append(rescheduled)
+        if rescheduled:
+            columns["moved"].append(len(columns["start"]) - 1)
+        else:
+            max_span = max(max_span, (timezone.localdate(end_dt) - day).days)
+
+    columns["moved"] = array(
+        "q", sorted(columns["moved"], key=columns["date"].__getitem__)
+    )
+    count = len(columns["start"])
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        generation,
+        horizon.toordinal(),
+        max_span,
+        count,
+        len(columns["moved"]),
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as index_file:
+            index_file.write(header)
+            for name, _ in COLUMNS:
+                columns[name].tofile(index_file)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return count
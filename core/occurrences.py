@@ -0,0 +1,189 @@
+"""
+Materialized event occurrences.
+
+Expands every Event (ad-hoc and recurring) into EventOccurrence rows up to the
+OccurrenceHorizon, so core.calendar.CalendarWindow can serve a date window with
+a single range query. Rows are kept in sync incrementally by the receivers in
+core.signals and the horizon is pushed forward nightly by the
+``extend_occurrence_horizon`` management command.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .calendar import distinct_dates, expansion_budget, occurrence_dates
+from .models import Event, EventException, EventOccurrence, OccurrenceHorizon
+
+logger = logging.getLogger(__name__)
+
+
+def build_occurrences(event, start, end):
+    """Return unsaved EventOccurrence rows for ``event`` dated within [start, end]."""
+    parish_id = event.associated_ministry.associated_parish_id
+
+    def occurrence(occurrence_date, start_dt, end_dt, status="scheduled"):
+        return EventOccurrence(
+            event=event,
+            date=occurrence_date,
+            start=start_dt,
+            end=end_dt,
+            status=status,
+            ministry_id=event.associated_ministry_id,
+            parish_id=parish_id,
+        )
+
+    if not event.is_recurring:
+        if not event.start_datetime or not event.end_datetime:
+            return []
+        occurrence_date = timezone.localdate(event.start_datetime)
+        if not start <= occurrence_date <= end:
+            return []
+        return [occurrence(occurrence_date, event.start_datetime, event.end_datetime)]
+
+    if event.series_end_date:
+        end = min(end, event.series_end_date)
+    if event.quarantined or not event.recurrence_rule or end < start:
+        return []
+
+    try:
+        dtstart = datetime.combine(event.series_start_date, event.start_time_of_day)
+        dates = list(
+            occurrence_dates(event.id, event.recurrence_rule, dtstart, start, end)
+        )
+    except (ValueError, TypeError, AttributeError, OverflowError) as e:
+        logger.warning(
+            "Failed to materialize recurring event %s: %s - %s",
+            event.id,
+            type(e).__name__,
+            str(e),
+        )
+        return []
+
+    # A series that reached its expansion budget was truncated
+    if len(dates) >= expansion_budget(event.series_start_date, start, end):
+        if quarantine(event):
+            return []
+    dates = distinct_dates(dates)
+
+    exceptions = {
+        exc.original_occurrence_date: exc
+        for exc in EventException.objects.filter(
+            event=event, original_occurrence_date__range=[start, end]
+        )
+    }
+
+    rows = []
+    for occurrence_date in dates:
+        exception = exceptions.get(occurrence_date)
+        if (
+            exception
+            and exception.status == "rescheduled"
+            and exception.new_start_datetime
+            and exception.new_end_datetime
+        ):
+            rows.append(
+                occurrence(
+                    occurrence_date,
+                    exception.new_start_datetime,
+                    exception.new_end_datetime,
+                    status="rescheduled",
+                )
+            )
+            continue
+
+        start_dt = timezone.make_aware(
+            datetime.combine(occurrence_date, event.start_time_of_day)
+        )
+        end_dt = timezone.make_aware(
+            datetime.combine(occurrence_date, event.end_time_of_day)
+        )
+        cancelled = exception and exception.status == "cancelled"
+        status = "cancelled" if cancelled else "scheduled"
+        rows.append(occurrence(occurrence_date, start_dt, end_dt, status=status))
+
+    return rows
+
+
+def quarantine(event):
+    """
+    Leave a series whose rule repeats too often out of the calendar until it
+    is edited. The series is saved, so its updated_at, change log, cached
+    responses and occurrences follow as for any edit; save() decides from the
+    rule whether it is quarantined. Returns whether it is.
+    """
+    event = Event.objects.filter(pk=event.pk).first()
+    if event is None or event.quarantined:
+        return event is not None
+    event.update_recurrence_columns()
+    if not event.quarantined:
+        return False
+    logger.warning("Quarantining recurring event %s", event.pk)
+    event.save()
+    return True
+
+
+def rebuild_event_occurrences(event):
+    """Regenerate all materialized rows for one event. Returns the row count."""
+    horizon = OccurrenceHorizon.current()
+    if horizon is None:
+        return 0
+
+    rows = build_occurrences(event, date.min, horizon)
+    with transaction.atomic():
+        EventOccurrence.objects.filter(event=event).delete()
+        EventOccurrence.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_occurrence(event, occurrence_date):
+    """Regenerate the materialized row for a single date of ``event``."""
+    horizon = OccurrenceHorizon.current()
+    if horizon is None or occurrence_date > horizon:
+        return
+
+    rows = build_occurrences(event, occurrence_date, occurrence_date)
+    with transaction.atomic():
+        EventOccurrence.objects.filter(event=event, date=occurrence_date).delete()
+        EventOccurrence.objects.bulk_create(rows)
+
+
+def extend_horizon(through, rebuild=False):
+    """
+    Materialize occurrences for every event up to ``through``.
+
+    Only dates past the current horizon are generated unless ``rebuild`` is
+    set or no horizon exists yet, in which case the table is regenerated from
+    scratch. Returns the number of rows created.
+    """
+    with transaction.atomic():
+        current = (
+            OccurrenceHorizon.objects.select_for_update()
+            .order_by("pk")
+            .values_list("materialized_through", flat=True)
+            .first()
+        )
+        if rebuild or current is None:
+            EventOccurrence.objects.all().delete()
+            start = date.min
+        elif through <= current:
+            return 0
+        else:
+            start = current + timedelta(days=1)
+
+        created = 0
+        events = Event.objects.select_related("associated_ministry")
+        for event in events.iterator():
+            rows = build_occurrences(event, start, through)
+            EventOccurrence.objects.bulk_create(
+                rows, batch_size=500, ignore_conflicts=True
+            )
+            created += len(rows)
+
+        OccurrenceHorizon.objects.update_or_create(
+            pk=1, defaults={"materialized_through": through}
+        )
+
+    return created
@@ -0,0 +1,285 @@
+"""
+Normalized recurrence rule columns.
+
+``Event.recurrence_rule`` is free text, which the database cannot reason
+about. When an Event is saved its rule is parsed once and summarized into
+plain columns -- frequency, interval, a weekday bitmask, COUNT, UNTIL and the
+date of the series' last occurrence -- so calendar queries can drop finished
+series and series that never fall on a window's weekdays in SQL, before any
+rule is expanded.
+"""
+
+import re
+from calendar import isleap
+from collections import deque
+from datetime import MAXYEAR, date, datetime, time, timedelta
+from functools import cache
+from itertools import takewhile
+
+from dateutil.rrule import rruleset, rrulestr
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Every weekday; also what a rule_byday of 0 (no restriction) stands for
+ALL_WEEKDAYS = (1 << len(WEEKDAYS)) - 1
+
+RULE_COLUMNS = (
+    "rule_freq",
+    "rule_interval",
+    "rule_byday",
+    "rule_count",
+    "rule_until",
+    "last_occurrence_date",
+)
+
+EMPTY_COLUMNS = {
+    "rule_freq": "",
+    "rule_interval": None,
+    "rule_byday": 0,
+    "rule_count": None,
+    "rule_until": None,
+    "last_occurrence_date": None,
+}
+
+
+def parse_rule(rule_text, dtstart):
+    """Parse ``rule_text`` with dateutil; raises ValueError if it is invalid."""
+    try:
+        return rrulestr(rule_text, dtstart=dtstart)
+    except (TypeError, AttributeError, OverflowError) as e:
+        raise ValueError(str(e)) from e
+
+
+def recurrence_columns(
+    rule_text,
+    series_start_date,
+    start_time_of_day,
+    series_end_date=None,
+    rule=None,
+    cost=None,
+):
+    """
+    Return the RULE_COLUMNS values for a recurring series.
+
+    ``rule`` and ``cost`` are the parsed rule and its monthly_occurrences,
+    when the caller has them already. Columns are left empty, which never
+    excludes the series from a window, when the series is incomplete or its
+    rule cannot be parsed.
+    """
+    columns = dict(EMPTY_COLUMNS)
+    if not rule_text or series_start_date is None or start_time_of_day is None:
+        return columns
+
+    dtstart = datetime.combine(series_start_date, start_time_of_day)
+    if rule is None:
+        try:
+            rule = parse_rule(rule_text, dtstart)
+        except ValueError:
+            return columns
+
+    parts = _rule_parts(rule_text)
+    columns["rule_freq"] = parts.get("FREQ", "")
+    columns["rule_interval"] = _int(parts.get("INTERVAL")) or 1
+    columns["rule_count"] = _int(parts.get("COUNT"))
+    columns["rule_until"] = _until_date(parts.get("UNTIL"))
+
+    # RDATEs and extra RRULEs (an rruleset) can land on any weekday
+    if not isinstance(rule, rruleset):
+        columns["rule_byday"] = _weekdays(parts, series_start_date)
+
+    if columns["rule_count"] or columns["rule_until"] or series_end_date:
+        bound = datetime.max
+        if series_end_date:
+            bound = datetime.combine(series_end_date, time.max)
+        if cost is None:
+            cost = monthly_occurrences(rule_text, dtstart, 0, rule=rule)
+        if not cost:
+            # The series never occurs; dateutil would search every year for it
+            return columns
+        try:
+            last = rule.before(bound, inc=True)
+        except (ValueError, OverflowError):
+            return columns
+        # A series that never occurs has "finished" before it started
+        columns["last_occurrence_date"] = (
+            last.date() if last else series_start_date - timedelta(days=1)
+        )
+    return columns
+
+
+def monthly_occurrences(rule_text, dtstart, limit, rule=None):
+    """
+    Estimate a rule's cost: the most occurrences it produces within any 31
+    days of the year from its first occurrence, or 0 if it never occurs.
+    Raises ValueError if the rule is invalid; pass the parsed ``rule`` when
+    it has been parsed already.
+
+    dateutil only stops searching for an occurrence when it finds one or runs
+    out of years, so a rule that never matches (February 30th) would be
+    searched until the year 9999. The rule is therefore expanded from a late
+    year with the same calendar as DTSTART's: first one where the search runs
+    out within decades, which finds the first occurrence of most rules; then,
+    for rules that first occur after a year or more (February 29th on a
+    Monday), one a whole number of 400-year calendar cycles later, leaving
+    one cycle to search. Counting stops once ``limit`` is exceeded, and an
+    estimate that cannot finish counts as over the limit.
+    """
+    if rule is None:
+        parse_rule(rule_text, dtstart)
+    try:
+        peak = _peak(
+            rule_text,
+            dtstart,
+            _probe_year(dtstart.year) - dtstart.year,
+            limit,
+            within=timedelta(days=366),
+        )
+        if peak is None:
+            cycles = max(MAXYEAR - 401 - dtstart.year, 0) // 400
+            peak = _peak(rule_text, dtstart, cycles * 400, limit)
+    except (ValueError, OverflowError):
+        return limit + 1
+    return peak or 0
+
+
+def _peak(rule_text, dtstart, years, limit, within=None):
+    """
+    The most occurrences within 31 days of the year from the first one, for
+    the rule moved ``years`` later; None if it does not occur (``within`` of
+    DTSTART).
+    """
+    start = dtstart.replace(year=dtstart.year + years)
+    rule = parse_rule(_shift_dates(rule_text, years), start)
+    occurrences = rule.xafter(start, inc=True)
+    first = next(occurrences, None)
+    if first is None or (within and first > start + within):
+        return None
+    horizon = first + timedelta(days=366)
+    recent = deque([first])
+    peak = 1
+    for occurrence in occurrences:
+        if peak > limit or occurrence > horizon:
+            break
+        recent.append(occurrence)
+        while recent[0] <= occurrence - timedelta(days=31):
+            recent.popleft()
+        peak = max(peak, len(recent))
+    return peak
+
+
+@cache
+def _probe_year(year):
+    """
+    The latest year that, with its neighbours, has the same calendar --
+    weekday of January 1st and leap day -- as ``year`` and its neighbours.
+    """
+
+    def calendars(first):
+        return [
+            (date(y, 1, 1).weekday(), isleap(y)) for y in range(first - 1, first + 3)
+        ]
+
+    if not 1 < year < MAXYEAR - 2:
+        return year
+    wanted = calendars(year)
+    for probe in range(MAXYEAR - 2, year, -1):
+        if calendars(probe) == wanted:
+            return probe
+    return year
+
+
+def _shift_dates(rule_text, years):
+    """Move the UNTIL, RDATE and EXDATE dates of a rule ``years`` later."""
+
+    def shift(match):
+        year = int(match[1]) + years
+        return f"{year}{match[2]}" if year <= MAXYEAR else f"{MAXYEAR}1231"
+
+    return re.sub(
+        r"(?:(?<=UNTIL=)|(?<=[:,]))(\d{4})(\d{4})", shift, rule_text, flags=re.I
+    )
+
+
+def continued_rule(rule_text, dtstart, split_date):
+    """
+    Return the rule that continues a series from ``split_date``: the same
+    rule, with any COUNT reduced by the occurrences before that date.
+
+    Raises ValueError if the rule is invalid or ``split_date`` is not one of
+    its occurrences after the first.
+    """
+    rule = parse_rule(rule_text, dtstart)
+    split = datetime.combine(split_date, time.min)
+    following = rule.after(split, inc=True)
+    if following is None or following.date() != split_date:
+        raise ValueError("The series does not occur on that date.")
+    before = sum(1 for _ in takewhile(lambda dt: dt < split, rule))
+    if not before:
+        raise ValueError("The series cannot be split at its first occurrence.")
+
+    count = _int(_rule_parts(rule_text).get("COUNT"))
+    if count:
+        rule_text = re.sub(
+            r"COUNT=\d+", f"COUNT={count - before}", rule_text, flags=re.IGNORECASE
+        )
+    return rule_text
+
+
+def weekday_mask(weekdays):
+    """Bitmask with bit ``n`` set for each weekday ``n`` (Monday is 0)."""
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def window_weekday_mask(start, end):
+    """Bitmask of the weekdays falling within the date window [start, end]."""
+    if (end - start).days >= 6:
+        return ALL_WEEKDAYS
+    return weekday_mask(
+        (start + timedelta(days=offset)).weekday()
+        for offset in range((end - start).days + 1)
+    )
+
+
+def _rule_parts(rule_text):
+    parts = {}
+    for line in rule_text.upper().split():
+        if line.startswith("RRULE:"):
+            line = line[len("RRULE:") :]
+        elif ":" in line:
+            continue
+        for pair in line.split(";"):
+            name, _, value = pair.partition("=")
+            parts[name] = value
+    return parts
+
+
+def _weekdays(parts, series_start_date):
+    if "BYDAY" in parts:
+        # Ordinals such as 1SU still restrict the weekday
+        days = [day.lstrip("+-0123456789") for day in parts["BYDAY"].split(",")]
+        return weekday_mask(WEEKDAYS.index(day) for day in days if day in WEEKDAYS)
+    if parts.get("FREQ") == "WEEKLY" and not any(
+        name.startswith("BY") for name in parts
+    ):
+        # dateutil repeats a plain weekly rule on DTSTART's weekday
+        return weekday_mask([series_start_date.weekday()])
+    return 0
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _until_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
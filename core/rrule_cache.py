@@ -0,0 +1,87 @@
+"""
+Process-wide cache of parsed recurrence rules.
+
+Parsing an RRULE with dateutil is the most expensive step of expanding a
+recurring series, and rules rarely change. Parsed rule objects are kept in a
+size-bounded LRU keyed by (event id, rule text, dtstart); since the key
+contains everything the rule depends on, an edit made in another worker
+process can never be served stale; the Event signals in core.signals only
+evict entries early to free memory.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from dateutil.rrule import rrulestr
+
+from django.conf import settings
+
+
+class RuleCache:
+    """Thread-safe LRU cache of parsed dateutil rules with hit/miss counters."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._rules = OrderedDict()
+        self._keys_by_event = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, event_id, rule_text, dtstart):
+        """Return the parsed rule, parsing and caching it on a miss."""
+        key = (event_id, rule_text, dtstart)
+        with self._lock:
+            rule = self._rules.get(key)
+            if rule is not None:
+                self._rules.move_to_end(key)
+                self.hits += 1
+                return rule
+            self.misses += 1
+
+        # Parse outside the lock; invalid rules raise and are not cached
+        rule = rrulestr(rule_text, dtstart=dtstart)
+
+        with self._lock:
+            self._rules[key] = rule
+            self._keys_by_event.setdefault(event_id, set()).add(key)
+            while len(self._rules) > self.maxsize:
+                evicted, _ = self._rules.popitem(last=False)
+                self._discard_key(evicted)
+                self.evictions += 1
+        return rule
+
+    def invalidate(self, event_id):
+        """Drop every cached rule for one event."""
+        with self._lock:
+            for key in self._keys_by_event.pop(event_id, ()):
+                self._rules.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._rules.clear()
+            self._keys_by_event.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "size": len(self._rules),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _discard_key(self, key):
+        keys = self._keys_by_event.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_event[key[0]]
+
+
+rule_cache = RuleCache(settings.CALENDAR_RRULE_CACHE_SIZE)
@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import calendar_cache, changes, occurrences, snapshots
+from .models import Category, Event, EventException, EventOccurrence, Ministry, Parish
+from .rrule_cache import rule_cache
+
+
+def _deleted_directly(origin, model):
+    """Whether a delete originated from ``model`` rather than a parent's cascade."""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is model
+
+
+@receiver(post_save, sender=Event)
+def rebuild_event_occurrences(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    occurrences.rebuild_event_occurrences(instance)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_rule(sender, instance, **kwargs):
+    rule_cache.invalidate(instance.pk)
+
+
+@receiver(pre_save, sender=EventException)
+def remember_exception_occurrence(sender, instance, raw=False, **kwargs):
+    # The admin can move an exception to another date, or another event
+    instance._previous_occurrence = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_occurrence = (
+        EventException.objects.filter(pk=instance.pk)
+        .values_list("event_id", "original_occurrence_date")
+        .first()
+    )
+
+
+@receiver(post_save, sender=EventException)
+def refresh_exception_occurrence(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    occurrences.refresh_occurrence(instance.event, instance.original_occurrence_date)
+    previous = getattr(instance, "_previous_occurrence", None)
+    if previous and previous != (instance.event_id, instance.original_occurrence_date):
+        event_id, occurrence_date = previous
+        event = (
+            instance.event
+            if event_id == instance.event_id
+            else Event.objects.filter(pk=event_id).first()
+        )
+        if event is not None:
+            occurrences.refresh_occurrence(event, occurrence_date)
+
+
+@receiver(post_delete, sender=EventException)
+def restore_exception_occurrence(sender, instance, origin=None, **kwargs):
+    # When the event itself is being deleted its occurrences go with it
+    if not _deleted_directly(origin, EventException):
+        return
+    occurrences.refresh_occurrence(instance.event, instance.original_occurrence_date)
+
+
+@receiver(post_save, sender=Ministry)
+def sync_occurrence_parish(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    EventOccurrence.objects.filter(ministry=instance).exclude(
+        parish_id=instance.associated_parish_id
+    ).update(parish_id=instance.associated_parish_id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=EventException)
+def log_calendar_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    changes.record_change(instance, "created" if created else "updated")
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=EventException)
+def log_calendar_delete(sender, instance, **kwargs):
+    changes.record_change(instance, "deleted")
+
+
+@receiver(m2m_changed, sender=Ministry.categories.through)
+def touch_ministry_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    # Relation changes do not save either side, so auto_now would miss them
+    if not action.startswith("post_"):
+        return
+    now = timezone.now()
+    if reverse:
+        Category.objects.filter(pk=instance.pk).update(updated_at=now)
+        Ministry.objects.filter(pk__in=pk_set or ()).update(updated_at=now)
+    else:
+        Ministry.objects.filter(pk=instance.pk).update(updated_at=now)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventException)
+@receiver(post_delete, sender=EventException)
+@receiver(post_save, sender=Ministry)
+@receiver(post_delete, sender=Ministry)
+@receiver(post_save, sender=Parish)
+@receiver(post_delete, sender=Parish)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Ministry.categories.through)
+def bump_calendar_generation(sender, **kwargs):
+    calendar_cache.bump_generation()
+    if settings.CALENDAR_SNAPSHOTS_ENABLED:
+        # Later callbacks in the same transaction find the work already done
+        transaction.on_commit(snapshots.republish)
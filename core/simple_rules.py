@@ -0,0 +1,175 @@
+"""
+Arithmetic expansion of simple recurrence rules.
+
+dateutil walks a rule forward from its DTSTART, so expanding a window of a
+series that started years ago costs time proportional to the series' age.
+Most of our rules are one of a few plain shapes -- ``FREQ=DAILY``,
+``FREQ=WEEKLY;BYDAY=..`` and ``FREQ=MONTHLY;BYMONTHDAY=..``, optionally with
+INTERVAL and UNTIL -- whose occurrences can be computed by jumping straight to
+the window start. ``simple_rule_dates`` does that, with results identical to
+dateutil's, and returns None for every other rule so callers fall back to it.
+"""
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+class SimpleRule:
+    """A parsed simple rule; ``days`` are weekdays or days of the month."""
+
+    __slots__ = ("freq", "interval", "days", "until")
+
+    def __init__(self, freq, interval, days, until):
+        self.freq = freq
+        self.interval = interval
+        self.days = days
+        self.until = until
+
+
+@lru_cache(maxsize=1024)
+def parse_simple_rule(rule_text):
+    """Return a SimpleRule for ``rule_text``, or None if it is not simple."""
+    text = rule_text.strip().upper()
+    if text.startswith("RRULE:"):
+        text = text[len("RRULE:") :]
+    if not text or any(char.isspace() for char in text):
+        return None
+
+    parts = {}
+    for pair in text.split(";"):
+        name, sep, value = pair.partition("=")
+        if not sep or not value or name in parts:
+            return None
+        parts[name] = value
+
+    freq = parts.pop("FREQ", None)
+    byday = parts.pop("BYDAY", None)
+    bymonthday = parts.pop("BYMONTHDAY", None)
+    try:
+        interval = int(parts.pop("INTERVAL", "1"))
+        until = _parse_until(parts.pop("UNTIL", None))
+    except ValueError:
+        return None
+    if parts or interval < 1:
+        # COUNT, WKST and the other BYxxx parts are left to dateutil
+        return None
+
+    if freq == "DAILY" and byday is None and bymonthday is None:
+        return SimpleRule(freq, interval, None, until)
+
+    if freq == "WEEKLY" and bymonthday is None:
+        if byday is None:
+            return SimpleRule(freq, interval, None, until)
+        weekdays = byday.split(",")
+        if not all(weekday in WEEKDAYS for weekday in weekdays):
+            return None
+        days = frozenset(WEEKDAYS.index(weekday) for weekday in weekdays)
+        return SimpleRule(freq, interval, days, until)
+
+    if freq == "MONTHLY" and byday is None:
+        if bymonthday is None:
+            return SimpleRule(freq, interval, None, until)
+        try:
+            days = frozenset(int(day) for day in bymonthday.split(","))
+        except ValueError:
+            return None
+        if not all(1 <= abs(day) <= 31 for day in days):
+            return None
+        return SimpleRule(freq, interval, days, until)
+
+    return None
+
+
+def _parse_until(value):
+    # Only floating (naive) UNTIL values; UTC ones are validated by dateutil
+    if value is None:
+        return None
+    if len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d")
+    if len(value) == 15:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S")
+    raise ValueError(f"Unsupported UNTIL value: {value}")
+
+
+def simple_rule_dates(rule_text, dtstart, start, end):
+    """
+    Return an iterator over the dates within [start, end] produced by
+    ``rule_text`` starting at the naive datetime ``dtstart``, or None if the
+    rule is not simple. Work is proportional to the window, not to how long
+    ago ``dtstart`` was.
+    """
+    rule = parse_simple_rule(rule_text)
+    if rule is None or dtstart.tzinfo is not None:
+        return None
+
+    first = dtstart.date()
+    if rule.until is not None:
+        last_dt = rule.until
+        # An occurrence on the UNTIL date counts only if it is not after UNTIL
+        last = last_dt.date()
+        if datetime.combine(last, dtstart.time()) > last_dt:
+            last -= timedelta(days=1)
+        end = min(end, last)
+    start = max(start, first)
+    if end < start:
+        return iter(())
+
+    if rule.freq == "DAILY":
+        return _daily(rule, first, start, end)
+    if rule.freq == "WEEKLY":
+        return _weekly(rule, first, start, end)
+    return _monthly(rule, first, start, end)
+
+
+def _daily(rule, first, start, end):
+    # First multiple of the interval on or after the window start
+    offset = -(-(start - first).days // rule.interval) * rule.interval
+    for ordinal in range(
+        first.toordinal() + offset, end.toordinal() + 1, rule.interval
+    ):
+        yield date.fromordinal(ordinal)
+
+
+def _weekly(rule, first, start, end):
+    weekdays = sorted(rule.days) if rule.days else [first.weekday()]
+    # Weeks start on Monday (the default WKST) and count from dtstart's week
+    first_week = first - timedelta(days=first.weekday())
+    weeks = (start - first_week).days // 7
+    week = first_week + timedelta(weeks=weeks - weeks % rule.interval)
+    while week <= end:
+        for weekday in weekdays:
+            day = week + timedelta(days=weekday)
+            if start <= day <= end:
+                yield day
+        week += timedelta(weeks=rule.interval)
+
+
+def _monthly(rule, first, start, end):
+    monthdays = rule.days or frozenset([first.day])
+    first_month = first.year * 12 + first.month - 1
+    months = start.year * 12 + start.month - 1 - first_month
+    month = first_month + months - months % rule.interval
+    end_month = end.year * 12 + end.month - 1
+    while month <= end_month:
+        year, month_index = divmod(month, 12)
+        length = _month_length(year, month_index + 1)
+        days = sorted(
+            {
+                day if day > 0 else length + 1 + day
+                for day in monthdays
+                if abs(day) <= length
+            }
+        )
+        for day_of_month in days:
+            day = date(year, month_index + 1, day_of_month)
+            if start <= day <= end:
+                yield day
+        month += rule.interval
+
+
+def _month_length(year, month):
+    if month == 12:
+        return 31
+    return (date(year, month + 1, 1) - date(year, month, 1)).days
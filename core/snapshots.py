@@ -0,0 +1,190 @@
+"""
+Static calendar month snapshots.
+
+The months most visitors look at are the same for everyone, so the calendar
+API's grid payload for each upcoming month is published as a JSON file named
+after the month and the calendar generation it was rendered from (plus .gz
+and, when the ``brotli`` package is installed, .br variants) under
+CALENDAR_SNAPSHOT_ROOT. The ``calendar_snapshot`` view serves the files,
+pre-compressed, and browsers and CDNs may cache them for good.
+
+Each instance keeps its own directory and publishes after the changes it
+saves. A snapshot of the current generation that an instance has not
+published yet is rendered on its first request, so every instance serves the
+same URLs. ``manifest.json`` records the last published months; the calendar
+page offers them when the database is unreachable.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .calendar_cache import current_generation
+
+try:
+    import brotli
+except ImportError:  # Optional; only gzip variants are written without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# "YYYY-MM.<generation>.json"
+SNAPSHOT_NAME = re.compile(r"\d{4}-\d{2}\.\d+\.json")
+
+# The attributes the calendar grid requests; details are fetched on click
+GRID_FIELDS = ("id", "title", "start", "end")
+
+# Unreferenced snapshot files are kept this long for pages rendered earlier
+PRUNE_AFTER_SECONDS = 24 * 60 * 60
+
+
+def snapshot_root():
+    return Path(settings.CALENDAR_SNAPSHOT_ROOT)
+
+
+def snapshot_name(key, generation):
+    return f"{key}.{generation}.json"
+
+
+def month_windows(today=None, months=None):
+    """Yield ``(key, first day, last day)`` for this month and the next ones."""
+    first = (today or timezone.localdate()).replace(day=1)
+    for _ in range(months or settings.CALENDAR_SNAPSHOT_MONTHS):
+        following = (first + timedelta(days=32)).replace(day=1)
+        yield first.strftime("%Y-%m"), first, following - timedelta(days=1)
+        first = following
+
+
+def publish_snapshots(today=None, force=False):
+    """
+    Render and publish the upcoming months. Returns the manifest, or None if
+    the published snapshots were already of the current calendar generation.
+    """
+    generation = current_generation()
+    manifest = read_manifest()
+    months = list(month_windows(today))
+    if (
+        not force
+        and manifest
+        and manifest["generation"] == generation
+        and list(manifest["months"]) == [key for key, _, _ in months]
+    ):
+        return None
+
+    root = snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    published = {}
+    for key, first, last in months:
+        name = published[key] = snapshot_name(key, generation)
+        if force or not (root / name).exists():
+            _publish_month(root / name, first, last)
+
+    manifest = {
+        "generation": generation,
+        "published_at": timezone.now().isoformat(),
+        "months": published,
+    }
+    _write(root / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+    _prune(root, set(published.values()))
+    return manifest
+
+
+def republish():
+    """Publish after a calendar change; failures are logged, not raised."""
+    try:
+        publish_snapshots()
+    except Exception:
+        logger.exception("Failed to publish calendar snapshots")
+
+
+def read_manifest():
+    try:
+        with open(snapshot_root() / MANIFEST_NAME, "rb") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_file(name):
+    """
+    Return the path of the snapshot file ``name``, rendering it first if it
+    is an upcoming month of the current generation not yet published here,
+    or None if there is no such snapshot.
+    """
+    if not SNAPSHOT_NAME.fullmatch(name):
+        return None
+    path = snapshot_root() / name
+    if path.exists():
+        return path
+    generation = current_generation()
+    for key, first, last in month_windows():
+        if name == snapshot_name(key, generation):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _publish_month(path, first, last)
+            return path
+    return None
+
+
+def snapshot_urls(generation):
+    """
+    Map each upcoming month (``YYYY-MM``) to the URL of its snapshot of
+    ``generation``. Pass None when the current generation is unknown (e.g.
+    the database is down) to get the last published snapshots instead.
+    """
+    if generation is not None:
+        names = {key: snapshot_name(key, generation) for key, _, _ in month_windows()}
+    else:
+        manifest = read_manifest()
+        names = manifest["months"] if manifest else {}
+    return {
+        key: reverse("calendar_snapshot", args=[name]) for key, name in names.items()
+    }
+
+
+def _publish_month(path, first, last):
+    payload = CalendarWindow(first, last, fields=GRID_FIELDS).compact()
+    content = json.dumps(payload, separators=(",", ":")).encode()
+    _write(path.with_name(f"{path.name}.gz"), gzip.compress(content, 9, mtime=0))
+    if brotli is not None:
+        _write(path.with_name(f"{path.name}.br"), brotli.compress(content))
+    # The plain file last, so its presence means every variant exists
+    _write(path, content)
+
+
+def _write(path, content):
+    """Write atomically, so a partial file is never served."""
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(content)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _prune(root, current_names):
+    cutoff = time.time() - PRUNE_AFTER_SECONDS
+    for path in root.glob("*.json*"):
+        name = path.name.removesuffix(".gz").removesuffix(".br")
+        if name == MANIFEST_NAME or name in current_names:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
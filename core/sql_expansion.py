@@ -0,0 +1,204 @@
+"""
+SQL-side expansion of simple recurrence rules.
+
+With CALENDAR_EXPANSION_BACKEND = "sql", CalendarWindow has the database
+expand daily and weekly series whose rules are simple (see
+core.simple_rules) instead of fetching each series and expanding it in
+Python: one statement generates the window's days (``generate_series`` on
+PostgreSQL, a recursive CTE on SQLite), keeps those each series occurs on,
+left-joins EventException to drop cancelled dates and pick up reschedules,
+and returns the rows sorted. Other rules, and other databases, stay on the
+Python path.
+
+A series is passed to the statement as ``(anchor, period, span, weekdays)``:
+it occurs on day ``d`` when ``(d - anchor) % period < span`` and ``d``'s
+weekday is in the ``weekdays`` bitmask. A daily rule has its first date as
+the anchor, its interval as the period and a span of one day; a weekly rule
+has the Monday of its first week as the anchor, ``7 * interval`` days as the
+period, a span of seven days and its BYDAY weekdays.
+"""
+
+import functools
+from datetime import date, datetime, timedelta
+
+from django.db import connection
+
+from .models import EventException
+from .recurrence import ALL_WEEKDAYS, weekday_mask
+from .simple_rules import parse_simple_rule
+
+SQL_FREQS = ("DAILY", "WEEKLY")
+
+# Series per statement, keeping well under the databases' parameter limits
+CHUNK_SIZE = 500
+
+# Each day with its ordinal and weekday (Monday is 0), so neither is
+# computed again for every series it is joined to
+SQLITE_DAYS = """
+days(day, n, weekday) AS (
+    SELECT date(%s), %s, %s
+    UNION ALL
+    SELECT date(day, '+1 day'), n + 1, (weekday + 1) %% 7 FROM days WHERE n < %s
+)"""
+
+# Series days are ordinals here
+SQLITE_QUERY = """
+WITH RECURSIVE {days}, series({columns}) AS (VALUES {values})
+SELECT s.event_id, d.day, e.status, e.new_start_datetime, e.new_end_datetime
+FROM series s
+JOIN days d ON d.n BETWEEN s.first_day AND s.last_day
+LEFT JOIN {exceptions} e
+    ON e.event_id = s.event_id AND e.original_occurrence_date = d.day
+WHERE (d.n - s.anchor) %% s.period < s.span
+    AND (s.weekdays >> d.weekday) & 1 = 1
+    AND (e.status IS NULL OR e.status <> 'cancelled')
+ORDER BY d.n, s.position
+"""
+
+POSTGRESQL_QUERY = """
+WITH series({columns}) AS (VALUES {values})
+SELECT s.event_id, d.day::date, e.status, e.new_start_datetime, e.new_end_datetime
+FROM series s
+CROSS JOIN LATERAL generate_series(
+    s.first_day, s.last_day, interval '1 day'
+) AS d(day)
+LEFT JOIN {exceptions} e
+    ON e.event_id = s.event_id AND e.original_occurrence_date = d.day::date
+WHERE (d.day::date - s.anchor) %% s.period < s.span
+    AND (s.weekdays >> (EXTRACT(ISODOW FROM d.day)::int - 1)) & 1 = 1
+    AND (e.status IS NULL OR e.status <> 'cancelled')
+ORDER BY d.day, s.position
+"""
+
+COLUMNS = (
+    "event_id",
+    "first_day",
+    "last_day",
+    "anchor",
+    "period",
+    "span",
+    "weekdays",
+    "position",
+)
+
+POSTGRESQL_VALUE = (
+    "(%s::int, %s::date, %s::date, %s::date, %s::int, %s::int, %s::int, %s::int)"
+)
+
+
+def supported():
+    """Whether the database can expand rules itself."""
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def sql_rule(rule_text):
+    """Return the parsed simple rule if the database can expand it, else None."""
+    rule = parse_simple_rule(rule_text)
+    if rule is None or rule.freq not in SQL_FREQS:
+        return None
+    return rule
+
+
+def series_spec(row, rule, start, end):
+    """
+    Return the ``(event_id, first_day, last_day, anchor, period, span,
+    weekdays)`` a series row is expanded from within [start, end], or None
+    if it cannot occur there.
+    """
+    first = row["series_start_date"]
+    last = min(end, row["series_end_date"] or end)
+    if rule.until is not None:
+        # An occurrence on the UNTIL date counts only if it is not after UNTIL
+        until = rule.until.date()
+        if datetime.combine(until, row["start_time_of_day"]) > rule.until:
+            until -= timedelta(days=1)
+        last = min(last, until)
+    first_day = max(start, first)
+    if last < first_day:
+        return None
+
+    if rule.freq == "DAILY":
+        return (row["id"], first_day, last, first, rule.interval, 1, ALL_WEEKDAYS)
+    weekdays = weekday_mask(rule.days or [first.weekday()])
+    monday = first - timedelta(days=first.weekday())
+    return (row["id"], first_day, last, monday, 7 * rule.interval, 7, weekdays)
+
+
+def expand(specs):
+    """
+    Yield ``(event_id, date, status, new_start, new_end)`` for every
+    non-cancelled occurrence of the series in ``specs`` (from series_spec),
+    sorted by date and then by the order of ``specs``. ``status`` is None
+    unless the occurrence has an exception.
+    """
+    # Raw rows are converted as the ORM would convert these columns
+    # A window has few distinct days, each returned for many series
+    convert_day = functools.cache(_converter("original_occurrence_date"))
+    convert_datetime = _converter("new_start_datetime")
+
+    rows = []
+    for offset in range(0, len(specs), CHUNK_SIZE):
+        chunk = specs[offset : offset + CHUNK_SIZE]
+        sql, params = _statement(chunk, offset)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows.extend(cursor.fetchall())
+    if len(specs) > CHUNK_SIZE:
+        rows.sort(key=lambda row: row[1])
+
+    for event_id, day, status, new_start, new_end in rows:
+        if status is None:
+            yield event_id, convert_day(day), None, None, None
+        else:
+            yield (
+                event_id,
+                convert_day(day),
+                status,
+                convert_datetime(new_start),
+                convert_datetime(new_end),
+            )
+
+
+def _statement(specs, offset):
+    exceptions = connection.ops.quote_name(EventException._meta.db_table)
+    params = []
+    for position, spec in enumerate(specs, offset):
+        params.extend((*spec, position))
+
+    if connection.vendor == "postgresql":
+        values = ", ".join([POSTGRESQL_VALUE] * len(specs))
+        sql = POSTGRESQL_QUERY.format(
+            columns=", ".join(COLUMNS), values=values, exceptions=exceptions
+        )
+        return sql, params
+
+    placeholders = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    sql = SQLITE_QUERY.format(
+        days=SQLITE_DAYS,
+        columns=", ".join(COLUMNS),
+        values=", ".join([placeholders] * len(specs)),
+        exceptions=exceptions,
+    )
+    params = [
+        value.toordinal() if isinstance(value, date) else value for value in params
+    ]
+    first_day = min(spec[1] for spec in specs)
+    last_day = max(spec[2] for spec in specs)
+    days = [first_day, first_day.toordinal(), first_day.weekday(), last_day.toordinal()]
+    return sql, days + params
+
+
+def _converter(field_name):
+    """Return a function converting a raw value of an EventException column."""
+    column = EventException._meta.get_field(field_name)
+    column = column.get_col(EventException._meta.db_table)
+    converters = connection.ops.get_db_converters(column) + column.get_db_converters(
+        connection
+    )
+
+    def convert(value):
+        for converter in converters:
+            value = converter(value, column, connection)
+        return value
+
+    return convert
@@ -0,0 +1,50 @@
+from django import template
+from django.utils import timezone
+
+from core.calendar import UpcomingWindow
+
+register = template.Library()
+
+
+def _ids(value):
+    if value is None:
+        return None
+    return [getattr(value, "pk", value)]
+
+
+def _aware(value):
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+@register.simple_tag
+def upcoming_events(limit=5, parish=None, ministry=None, category=None):
+    """
+    The next ``limit`` occurrences, soonest first, as dicts with ``title``,
+    ``start``, ``end``, ``location``, ``ministry``, ``parish``, ``recurring``
+    and ``rescheduled``. ``parish``, ``ministry`` and ``category`` take an
+    instance or id.
+
+    Usage: ``{% upcoming_events 5 parish=parish as occurrences %}``
+    """
+    window = UpcomingWindow(
+        limit,
+        parish_ids=_ids(parish),
+        category_ids=_ids(category),
+        ministry_ids=_ids(ministry),
+    )
+    upcoming = []
+    for occurrence in window.occurrences():
+        series = window.series[occurrence.event_id]
+        upcoming.append(
+            {
+                "title": series["title"],
+                "start": _aware(occurrence.start),
+                "end": _aware(occurrence.end),
+                "location": series["location"],
+                "ministry": series["ministry"],
+                "parish": series["parish"],
+                "recurring": series["is_recurring"],
+                "rescheduled": occurrence.rescheduled,
+            }
+        )
+    return upcoming
@@ -297,7 +297,7 @@ class ErrorHandlingTest(CalendarEventGenerationTest):
 
     def test_invalid_recurrence_rule(self):
         """Test that invalid recurrence rules are handled gracefully."""
-        with patch("core.views.logger") as mock_logger:
+        with patch("core.calendar.logger") as mock_logger:
             Event.objects.create(
                 associated_ministry=self.ministry,
                 title="Invalid Rule Event",
@@ -321,7 +321,7 @@ class ErrorHandlingTest(CalendarEventGenerationTest):
 
     def test_missing_time_fields(self):
         """Test handling of events with missing time fields."""
-        with patch("core.views.logger") as mock_logger:
+        with patch("core.calendar.logger") as mock_logger:
             Event.objects.create(
                 associated_ministry=self.ministry,
                 title="Missing Times",
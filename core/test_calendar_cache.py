@@ -0,0 +1,215 @@
+import threading
+import time as clock
+from datetime import date, time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import calendar_cache
+from .models import Event, EventException, Ministry, Parish, User
+
+
+class CalendarResponseCacheTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+
+    def _get(self, start="2025-06-01T00:00:00Z", end="2025-06-30T23:59:59Z"):
+        response = self.client.get(
+            reverse("calendar_events_api"), {"start": start, "end": end}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_identical_window_served_from_cache(self):
+        first = self._get()
+        # Conditional GET validator, generation counter and cached body only
+        with self.assertNumQueries(3):
+            second = self._get()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second["Content-Type"], "application/json")
+
+    def test_window_normalized_to_dates(self):
+        self._get()
+        with self.assertNumQueries(3):
+            self._get(start="2025-06-01T04:00:00Z", end="2025-06-30T00:00:00Z")
+
+    def test_model_writes_bump_generation(self):
+        writes = [
+            lambda: self.event.save(),
+            lambda: EventException.objects.create(
+                event=self.event,
+                original_occurrence_date=date(2025, 6, 8),
+                status="cancelled",
+            ),
+            lambda: self.ministry.save(),
+            lambda: self.parish.save(),
+        ]
+        for write in writes:
+            generation = calendar_cache.current_generation()
+            write()
+            self.assertNotEqual(calendar_cache.current_generation(), generation)
+
+    def test_cancellation_invalidates_cached_window(self):
+        self.assertEqual(len(self._get().json()["events"]), 5)
+        EventException.objects.create(
+            event=self.event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        self.assertEqual(len(self._get().json()["events"]), 4)
+
+    @override_settings(CALENDAR_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_cache(self):
+        self._get()
+        Event.objects.filter(pk=self.event.pk).update(title="Renamed")
+        self.assertEqual(self._get().json()["events"][0]["title"], "Renamed")
+
+
+class CalendarGenerationTest(TestCase):
+    def test_bump_is_one_update(self):
+        generation = calendar_cache.current_generation()
+        with self.assertNumQueries(1):
+            calendar_cache.bump_generation()
+        self.assertEqual(calendar_cache.current_generation(), generation + 1)
+
+    def test_generation_outlives_cache_entries(self):
+        generation = calendar_cache.current_generation()
+        cache.clear()
+        self.assertEqual(calendar_cache.current_generation(), generation)
+
+    def test_first_bump_seeds_generation(self):
+        calendar_cache.bump_generation()
+        self.assertGreater(calendar_cache.current_generation(), 0)
+
+    def test_cache_not_culled_at_default_size(self):
+        self.assertGreater(cache._max_entries, 300)
+
+
+class BenchmarkCalendarCommandTest(TestCase):
+    def test_reports_cold_and_warm_timings(self):
+        out = StringIO()
+        call_command(
+            "benchmark_calendar", "--start", "2025-06-01", "--repeat", "2", stdout=out
+        )
+        output = out.getvalue()
+        self.assertIn("Window 2025-06-01 to 2025-06-30", output)
+        self.assertIn("cold: median", output)
+        self.assertIn("warm: median", output)
+
+
+PARTS = ("events", date(2025, 6, 1), date(2025, 6, 30))
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class SingleFlightTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+        # Committed, so the generation is there for other threads to read
+        calendar_cache.current_generation()
+
+    def _build(self):
+        self.builds += 1
+        return {"build": self.builds}
+
+    def _hold_lock(self):
+        cache.add(f"{calendar_cache.response_key(*PARTS)}:lock", True)
+
+    def test_concurrent_misses_build_once(self):
+        def slow_build():
+            clock.sleep(0.2)
+            return self._build()
+
+        responses = []
+        threads = [
+            threading.Thread(
+                target=lambda: responses.append(
+                    calendar_cache.cached_json_response(PARTS, slow_build)
+                )
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(
+            {response.content for response in responses}, {b'{"build": 1}'}
+        )
+
+    def test_stale_body_served_while_rebuilding(self):
+        calendar_cache.cached_json_response(PARTS, self._build)
+        calendar_cache.bump_generation()
+        self._hold_lock()
+
+        response = calendar_cache.cached_json_response(PARTS, self._build)
+        self.assertEqual(response.content, b'{"build": 1}')
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.assertEqual(self.builds, 1)
+
+        cache.delete(f"{calendar_cache.response_key(*PARTS)}:lock")
+        response = calendar_cache.cached_json_response(PARTS, self._build)
+        self.assertEqual(response.content, b'{"build": 2}')
+        self.assertFalse(response.has_header("Cache-Control"))
+
+    def test_waits_for_body_without_stale_copy(self):
+        self._hold_lock()
+        key = calendar_cache.response_key(*PARTS)
+        with mock.patch(
+            "core.calendar_cache.time.sleep",
+            side_effect=lambda seconds: cache.set(key, b'{"other": 1}'),
+        ):
+            response = calendar_cache.cached_json_response(PARTS, self._build)
+        self.assertEqual(response.content, b'{"other": 1}')
+        self.assertEqual(self.builds, 0)
+
+    @override_settings(CALENDAR_CACHE_STALE_SECONDS=0)
+    def test_builds_when_lock_holder_never_finishes(self):
+        calendar_cache.cached_json_response(PARTS, self._build)
+        calendar_cache.bump_generation()
+        self._hold_lock()
+        with mock.patch("core.calendar_cache.LOCK_WAIT", 0.1):
+            response = calendar_cache.cached_json_response(PARTS, self._build)
+        self.assertEqual(response.content, b'{"build": 2}')
+
+    def test_failed_build_releases_lock(self):
+        with self.assertRaises(RuntimeError):
+            calendar_cache.cached_json_response(
+                PARTS, mock.Mock(side_effect=RuntimeError)
+            )
+        self.assertIsNone(cache.get(f"{calendar_cache.response_key(*PARTS)}:lock"))
+        self.assertEqual(
+            calendar_cache.cached_json_response(PARTS, self._build).content,
+            b'{"build": 1}',
+        )
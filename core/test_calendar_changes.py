@@ -0,0 +1,154 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .changes import decode_token
+from .models import CalendarChange, Event, EventException, Ministry, Parish, User
+
+
+@override_settings(CALENDAR_CHANGES_SETTLE_SECONDS=0)
+class CalendarChangesTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            description="Every Sunday",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        self.token = self._changes()["next"]
+
+    def _changes(self, since=None, expected_status=200):
+        params = {"since": since} if since else {}
+        response = self.client.get(reverse("calendar_changes_api"), params)
+        self.assertEqual(response.status_code, expected_status)
+        return response.json()
+
+    def _summary(self, data):
+        return [(c["model"], c["id"], c["action"]) for c in data["changes"]]
+
+    def test_no_changes_since_current_token(self):
+        data = self._changes(self.token)
+        self.assertEqual(data["changes"], [])
+        self.assertEqual(data["next"], self.token)
+        self.assertFalse(data["more"])
+
+    def test_created_updated_and_deleted_rows(self):
+        exception = EventException.objects.create(
+            event=self.event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        self.event.title = "Sunday Service"
+        self.event.save()
+
+        data = self._changes(self.token)
+        self.assertEqual(
+            self._summary(data),
+            [
+                ("exception", exception.id, "created"),
+                ("event", self.event.id, "updated"),
+            ],
+        )
+        self.assertEqual(data["changes"][1]["data"]["title"], "Sunday Service")
+        self.assertEqual(data["changes"][0]["data"]["status"], "cancelled")
+
+        # Deleting the event also deletes its exception
+        event_id = self.event.id
+        self.event.delete()
+        data = self._changes(data["next"])
+        self.assertCountEqual(
+            self._summary(data),
+            [
+                ("exception", exception.id, "deleted"),
+                ("event", event_id, "deleted"),
+            ],
+        )
+        self.assertNotIn("data", data["changes"][0])
+
+    def test_object_reported_once_with_net_action(self):
+        event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Picnic",
+            description="",
+            location="Park",
+            start_datetime=timezone.now(),
+            end_datetime=timezone.now() + timedelta(hours=2),
+        )
+        event.title = "Parish Picnic"
+        event.save()
+
+        data = self._changes(self.token)
+        self.assertEqual(self._summary(data), [("event", event.id, "created")])
+        self.assertEqual(data["changes"][0]["data"]["title"], "Parish Picnic")
+
+    def test_paged_by_limit(self):
+        for day in (8, 15, 22):
+            EventException.objects.create(
+                event=self.event,
+                original_occurrence_date=date(2025, 6, day),
+                status="cancelled",
+            )
+        with self.settings(CALENDAR_CHANGES_PAGE_SIZE=2):
+            first = self._changes(self.token)
+            second = self._changes(first["next"])
+        self.assertEqual((len(first["changes"]), first["more"]), (2, True))
+        self.assertEqual((len(second["changes"]), second["more"]), (1, False))
+
+    def test_unsettled_changes_held_back(self):
+        self.event.save()
+        with self.settings(CALENDAR_CHANGES_SETTLE_SECONDS=60):
+            data = self._changes(self.token)
+        self.assertEqual(data["changes"], [])
+        self.assertEqual(data["next"], self.token)
+
+    def test_invalid_token_rejected(self):
+        self._changes("not a token!", expected_status=400)
+
+    def test_pruned_token_expired(self):
+        old_token = self._changes()["next"]
+        for _ in range(3):
+            self.event.save()
+        CalendarChange.objects.update(changed_at=timezone.now() - timedelta(days=100))
+
+        out = StringIO()
+        call_command("prune_calendar_changes", stdout=out)
+        self.assertIn("Pruned 3 calendar changes", out.getvalue())
+
+        # Only the newest change is kept, so current tokens stay valid
+        self.assertEqual(CalendarChange.objects.count(), 1)
+        self.assertIn("error", self._changes(old_token, expected_status=410))
+        self._changes(self._changes()["next"])
+
+    def test_id_gaps_do_not_expire_tokens(self):
+        self.event.save()
+        self.event.save()
+        # Ids skipped by rolled-back inserts leave gaps below the oldest change
+        CalendarChange.objects.filter(pk__lte=decode_token(self.token) + 1).delete()
+
+        data = self._changes(self.token)
+        self.assertEqual(self._summary(data), [("event", self.event.id, "updated")])
@@ -0,0 +1,136 @@
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from operator import itemgetter
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, EventException, Ministry, Parish, User
+
+LONG_DESCRIPTION = (
+    "Join us for prayer, scripture reading and fellowship. All parishioners "
+    "and visitors are welcome; please use the side entrance by the parking "
+    "lot and bring a bible if you have one. Light refreshments afterwards."
+)
+
+
+class CompactCalendarFormatTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Bible Study Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.weekly = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Bible Study",
+            description=LONG_DESCRIPTION,
+            location="Parish Hall, Room 2",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 1),
+            start_time_of_day=time(19, 0),
+            end_time_of_day=time(20, 30),
+            recurrence_rule="FREQ=DAILY",
+        )
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=datetime(2025, 6, 16, 14, 0, tzinfo=dt_timezone.utc),
+            new_end_datetime=datetime(2025, 6, 16, 15, 0, tzinfo=dt_timezone.utc),
+        )
+        self.adhoc = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Retreat",
+            description=LONG_DESCRIPTION,
+            location="Retreat Center",
+            is_recurring=False,
+            start_datetime=timezone.make_aware(datetime(2025, 6, 20, 9, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 20, 17, 0)),
+        )
+
+    def _get(self, **params):
+        params.update({"start": "2025-06-01", "end": "2025-06-30"})
+        response = self.client.get(reverse("calendar_events_api"), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _rehydrate(self, data):
+        """Mirror of rehydrateCompactEvents() in event_calendar.html."""
+        window_start = date.fromisoformat(data["start"])
+        events = []
+        for series_index, start, end, day, rescheduled in data["occurrences"]:
+            series = data["series"][series_index]
+            occurrence_date = window_start + timedelta(days=day)
+            if series["recurring"]:
+                event_id = f"recurring_{series['id']}_{occurrence_date}"
+            else:
+                event_id = f"adhoc_{series['id']}"
+            events.append(
+                {
+                    "id": event_id,
+                    "title": (
+                        f"{series['title']} (Rescheduled)"
+                        if rescheduled
+                        else series["title"]
+                    ),
+                    "start": start,
+                    "end": end,
+                    "description": series["description"],
+                    "location": series["location"],
+                    "ministry": data["ministries"][series["ministry"]],
+                    "parish": data["parishes"][series["parish"]],
+                }
+            )
+        return events
+
+    def _epoch(self, value):
+        dt = datetime.fromisoformat(value)
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+        return int(dt.timestamp())
+
+    def test_compact_rehydrates_to_full_events(self):
+        full = self._get().json()["events"]
+        compact = self._get(format="compact").json()
+
+        for event in full:
+            event["start"] = self._epoch(event["start"])
+            event["end"] = self._epoch(event["end"])
+        key = itemgetter("id")
+        self.assertEqual(
+            sorted(self._rehydrate(compact), key=key), sorted(full, key=key)
+        )
+
+    def test_metadata_stored_once(self):
+        data = self._get(format="compact").json()
+
+        self.assertEqual(data["format"], "compact")
+        self.assertEqual(len(data["series"]), 2)
+        self.assertEqual(data["ministries"], ["Bible Study Ministry"])
+        self.assertEqual(data["parishes"], ["Test Parish"])
+        self.assertEqual(len(data["occurrences"]), 31)
+
+    def test_compact_payload_at_least_five_times_smaller(self):
+        full_size = len(self._get().content)
+        compact_size = len(self._get(format="compact").content)
+        self.assertGreaterEqual(full_size / compact_size, 5)
+
+    def test_unknown_format_rejected(self):
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {"start": "2025-06-01", "end": "2025-06-30", "format": "xml"},
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,144 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .models import Event, EventException, Ministry, Parish, User
+from .occurrences import extend_horizon
+
+
+class CalendarCountsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.weekly = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Sunday Mass",
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 5),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=timezone.make_aware(datetime(2025, 6, 17, 18, 0)),
+            new_end_datetime=timezone.make_aware(datetime(2025, 6, 17, 19, 0)),
+        )
+        # Friday evening to Sunday noon
+        Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Retreat",
+            description="",
+            location="Camp",
+            start_datetime=timezone.make_aware(datetime(2025, 6, 27, 18, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 29, 12, 0)),
+        )
+        # Ends at midnight, so only on the 10th
+        Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Vigil",
+            description="",
+            location="Church",
+            start_datetime=timezone.make_aware(datetime(2025, 6, 10, 20, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 11, 0, 0)),
+        )
+
+    def _counts(self, start, end, **params):
+        response = self.client.get(
+            reverse("calendar_counts_api"), {"start": start, "end": end, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _by_day(self, data):
+        first = date.fromisoformat(data["start"])
+        return {
+            (first + timedelta(days=offset)).isoformat(): count
+            for offset, count in enumerate(data["counts"])
+            if count
+        }
+
+    def test_counts_per_day(self):
+        data = self._counts("2025-06-01", "2025-06-30")
+        self.assertEqual(len(data["counts"]), 30)
+        self.assertEqual(
+            self._by_day(data),
+            {
+                "2025-06-01": 1,
+                "2025-06-10": 1,
+                "2025-06-17": 1,
+                "2025-06-22": 1,
+                "2025-06-27": 1,
+                "2025-06-28": 1,
+                "2025-06-29": 2,
+            },
+        )
+
+    def test_materialized_counts_match_expanded(self):
+        expanded = CalendarWindow(date(2025, 6, 1), date(2025, 6, 30)).day_counts()
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        materialized = CalendarWindow(date(2025, 6, 1), date(2025, 6, 30)).day_counts()
+        self.assertEqual(materialized, expanded)
+
+    def test_window_spanning_months_is_clipped(self):
+        data = self._counts("2025-05-25", "2025-06-05")
+        self.assertEqual(data["start"], "2025-05-25")
+        self.assertEqual(len(data["counts"]), 12)
+        self.assertEqual(self._by_day(data), {"2025-05-25": 1, "2025-06-01": 1})
+
+    def test_months_cached(self):
+        year = self._counts("2025-01-01", "2025-12-31")
+        # Validator, generation and one read of the cached months
+        with self.assertNumQueries(3):
+            quarter = self._counts("2025-04-01", "2025-06-30")
+        self.assertEqual(quarter["counts"], year["counts"][90:181])
+
+    def test_year_payload_is_small(self):
+        response = self.client.get(
+            reverse("calendar_counts_api"),
+            {"start": "2025-01-01", "end": "2025-12-31"},
+        )
+        self.assertLess(len(response.content), 4096)
+
+    def test_filtered_by_parish(self):
+        other = Parish.objects.create(name="Other Parish", address="456 Other St")
+        data = self._counts("2025-06-01", "2025-06-30", parish=other.id)
+        self.assertEqual(data["counts"], [0] * 30)
+
+    def test_invalid_window_rejected(self):
+        for params in (
+            {"start": "2025-06-01"},
+            {"start": "2025-06-01", "end": "June"},
+            {"start": "2024-01-01", "end": "2025-12-31"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(reverse("calendar_counts_api"), params)
+                self.assertEqual(response.status_code, 400)
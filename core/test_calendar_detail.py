@@ -0,0 +1,146 @@
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, EventException, Ministry, Parish, User
+
+
+@override_settings(CALENDAR_CACHE_TIMEOUT=0)
+class CalendarFieldsAndDetailTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.weekly = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            description="Every Sunday",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 30),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        self.adhoc = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Special Event",
+            description="Once only",
+            is_recurring=False,
+            start_datetime=timezone.make_aware(datetime(2025, 6, 15, 14, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 15, 16, 0)),
+        )
+
+    def _get(self, **params):
+        params = {
+            "start": "2025-06-01T00:00:00Z",
+            "end": "2025-06-30T23:59:59Z",
+            **params,
+        }
+        return self.client.get(reverse("calendar_events_api"), params)
+
+    def _detail(self, occurrence_id):
+        return self.client.get(reverse("calendar_event_detail", args=[occurrence_id]))
+
+    def test_fields_limit_serialized_attributes(self):
+        response = self._get(fields="title,start,end")
+        self.assertEqual(response.status_code, 200)
+        events = response.json()["events"]
+        self.assertEqual(len(events), 6)
+        for event in events:
+            self.assertEqual(list(event), ["id", "title", "start", "end"])
+
+    def test_fields_limit_compact_series(self):
+        response = self._get(format="compact", fields="id,title,start,end")
+        data = response.json()
+        self.assertEqual(
+            {key for series in data["series"] for key in series},
+            {"id", "recurring", "title"},
+        )
+        self.assertEqual(data["ministries"], [])
+        self.assertEqual(len(data["occurrences"]), 6)
+
+    def test_unknown_field_rejected(self):
+        response = self._get(fields="title,secret")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+    def test_recurring_occurrence_detail(self):
+        # Conditional GET validator, the event and that date's exception
+        with self.assertNumQueries(3):
+            response = self._detail(f"recurring_{self.weekly.id}_2025-06-08")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["event"],
+            {
+                "id": f"recurring_{self.weekly.id}_2025-06-08",
+                "title": "Weekly Service",
+                "start": "2025-06-08T10:00:00",
+                "end": "2025-06-08T11:30:00",
+                "description": "Every Sunday",
+                "location": "Main Chapel",
+                "ministry": "Test Ministry",
+                "parish": "Test Parish",
+            },
+        )
+
+    def test_detail_matches_window_event(self):
+        events = self._get().json()["events"]
+        for event in events:
+            self.assertEqual(self._detail(event["id"]).json()["event"], event)
+
+    def test_rescheduled_occurrence_detail(self):
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=datetime(2025, 6, 16, 14, 0, tzinfo=dt_timezone.utc),
+            new_end_datetime=datetime(2025, 6, 16, 15, 0, tzinfo=dt_timezone.utc),
+        )
+        event = self._detail(f"recurring_{self.weekly.id}_2025-06-15").json()["event"]
+        self.assertEqual(event["title"], "Weekly Service (Rescheduled)")
+        self.assertEqual(event["start"], "2025-06-16T14:00:00+00:00")
+
+    def test_adhoc_detail(self):
+        event = self._detail(f"adhoc_{self.adhoc.id}").json()["event"]
+        self.assertEqual(event["title"], "Special Event")
+        self.assertEqual(event["description"], "Once only")
+
+    def test_missing_occurrences_not_found(self):
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 22),
+            status="cancelled",
+        )
+        for occurrence_id in (
+            # Cancelled
+            f"recurring_{self.weekly.id}_2025-06-22",
+            # Not a Sunday
+            f"recurring_{self.weekly.id}_2025-06-10",
+            # Before the series starts
+            f"recurring_{self.weekly.id}_2025-05-25",
+            f"recurring_{self.adhoc.id}_2025-06-15",
+            f"adhoc_{self.weekly.id}",
+            "adhoc_999999",
+            "recurring_abc_2025-06-08",
+            "recurring_1_not-a-date",
+            "something-else",
+        ):
+            with self.subTest(occurrence_id=occurrence_id):
+                self.assertEqual(self._detail(occurrence_id).status_code, 404)
@@ -0,0 +1,151 @@
+"""
+Tests for the core.calendar engine.
+
+Focuses on CalendarWindow issuing a constant number of queries regardless of
+how many events and exceptions fall inside the window.
+"""
+
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .calendar import CalendarWindow, Occurrence
+from .models import Event, EventException, Ministry, Parish, User
+from .occurrences import extend_horizon
+
+WINDOW_START = date(2025, 6, 1)
+WINDOW_END = date(2025, 6, 30)
+
+
+class CalendarWindowTestCase(TestCase):
+    def setUp(self):
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+
+    def _seed(self, count):
+        """Bulk create ``count`` events (half recurring) and an exception each."""
+        events = []
+        for i in range(count):
+            if i % 2:
+                events.append(
+                    Event(
+                        associated_ministry=self.ministry,
+                        title=f"Series {i}",
+                        is_recurring=True,
+                        series_start_date=date(2025, 1, 5),
+                        start_time_of_day=time(10, 0),
+                        end_time_of_day=time(11, 0),
+                        recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+                    )
+                )
+            else:
+                events.append(
+                    Event(
+                        associated_ministry=self.ministry,
+                        title=f"Event {i}",
+                        is_recurring=False,
+                        start_datetime=timezone.make_aware(datetime(2025, 6, 15, 14)),
+                        end_datetime=timezone.make_aware(datetime(2025, 6, 15, 16)),
+                    )
+                )
+        Event.objects.bulk_create(events, batch_size=500)
+
+        EventException.objects.bulk_create(
+            [
+                EventException(
+                    event=event,
+                    original_occurrence_date=date(2025, 6, 8),
+                    status="cancelled",
+                )
+                for event in Event.objects.filter(is_recurring=True)
+            ],
+            batch_size=500,
+        )
+
+    def _occurrences(self):
+        return list(CalendarWindow(WINDOW_START, WINDOW_END).occurrences())
+
+
+class ConstantQueryCountTest(CalendarWindowTestCase):
+    def test_query_count_with_10_events(self):
+        self._seed(10)
+        # Horizon, ad-hoc events, recurring series, exceptions
+        with self.assertNumQueries(4):
+            occurrences = self._occurrences()
+        # 5 ad-hoc + 5 series x (5 Sundays - 1 cancelled)
+        self.assertEqual(len(occurrences), 5 + 5 * 4)
+
+    def test_query_count_with_10000_events(self):
+        self._seed(10000)
+        with self.assertNumQueries(4):
+            occurrences = self._occurrences()
+        self.assertEqual(len(occurrences), 5000 + 5000 * 4)
+
+    def test_query_count_from_materialized_table(self):
+        self._seed(10)
+        # Bulk created rows bypass the signals, so materialize them explicitly
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+
+        # Horizon, occurrence range
+        with self.assertNumQueries(2):
+            occurrences = self._occurrences()
+        self.assertEqual(len(occurrences), 5 + 5 * 4)
+
+
+class OccurrenceRecordsTest(CalendarWindowTestCase):
+    def test_records_reference_series_metadata(self):
+        event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            description="Every Sunday",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 30),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=datetime(2025, 6, 16, 14, 0, tzinfo=dt_timezone.utc),
+            new_end_datetime=datetime(2025, 6, 16, 15, 0, tzinfo=dt_timezone.utc),
+        )
+
+        window = CalendarWindow(WINDOW_START, WINDOW_END)
+        occurrences = list(window.occurrences())
+
+        self.assertEqual(len(occurrences), 5)
+        self.assertEqual(
+            occurrences[0],
+            Occurrence(
+                event.id,
+                date(2025, 6, 1),
+                datetime(2025, 6, 1, 10, 0),
+                datetime(2025, 6, 1, 11, 30),
+            ),
+        )
+        rescheduled = [o for o in occurrences if o.rescheduled]
+        self.assertEqual([o.date for o in rescheduled], [date(2025, 6, 15)])
+
+        self.assertEqual(list(window.series), [event.id])
+        self.assertEqual(window.series[event.id]["parish"], "Test Parish")
+        self.assertEqual(
+            window.serialize(rescheduled[0])["title"], "Weekly Service (Rescheduled)"
+        )
@@ -0,0 +1,145 @@
+import json
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, EventException, Ministry, Parish, User
+
+
+class CalendarExplainTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.admin_user = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="testpass123",
+            full_name="Admin User",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.weekly = self._series("Sunday Mass", "FREQ=WEEKLY;BYDAY=SU")
+        self.monthly = self._series("First Sunday", "FREQ=MONTHLY;BYDAY=1SU")
+        self.hourly = self._series("Adoration", "FREQ=DAILY")
+        # Past the form and the save-time guardrail, as a direct edit would be
+        Event.objects.filter(pk=self.hourly.pk).update(recurrence_rule="FREQ=HOURLY")
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+
+    def _series(self, title, rule):
+        return Event.objects.create(
+            associated_ministry=self.ministry,
+            title=title,
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 5),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule=rule,
+        )
+
+
+class ExplainModeTest(CalendarExplainTestCase):
+    def _explain(self):
+        return self.client.get(
+            reverse("calendar_events_api"),
+            {"start": "2025-06-01", "end": "2025-06-30", "explain": "1"},
+        )
+
+    def test_staff_only(self):
+        self.assertEqual(self._explain().status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self._explain().status_code, 403)
+
+    def test_series_stats(self):
+        self.client.force_login(self.admin_user)
+        response = self._explain()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-store", response["Cache-Control"])
+        explain = response.json()["explain"]
+
+        series = {stats["event_id"]: stats for stats in explain["series"]}
+        weekly = series[self.weekly.pk]
+        self.assertEqual(weekly["rule"], "FREQ=WEEKLY;BYDAY=SU")
+        self.assertEqual(weekly["expander"], "simple")
+        self.assertEqual(weekly["occurrences"], 5)
+        self.assertEqual(weekly["exceptions_applied"], 1)
+        self.assertEqual(weekly["queries"], 0)
+        self.assertFalse(weekly["over_budget"])
+        self.assertEqual(series[self.monthly.pk]["expander"], "rrule")
+        self.assertEqual(series[self.monthly.pk]["occurrences"], 1)
+
+        hourly = series[self.hourly.pk]
+        self.assertEqual(hourly["occurrences"], 30 * 24)
+        self.assertTrue(hourly["over_budget"])
+        # Reported, not enforced
+        self.hourly.refresh_from_db()
+        self.assertFalse(self.hourly.quarantined)
+
+        # Costliest first
+        costs = [s["parse_ms"] + s["expansion_ms"] for s in explain["series"]]
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        totals = explain["totals"]
+        self.assertEqual(totals["series"], 3)
+        self.assertEqual(totals["occurrences"], 5 + 1 + 30 * 24)
+        self.assertEqual(totals["exceptions_applied"], 1)
+        # The series and exceptions queries
+        self.assertEqual(totals["queries"], 2)
+
+    def test_invalid_rule_reported(self):
+        Event.objects.filter(pk=self.monthly.pk).update(recurrence_rule="FREQ=NEVER")
+        self.client.force_login(self.admin_user)
+        explain = self._explain().json()["explain"]
+        broken = next(s for s in explain["series"] if s["event_id"] == self.monthly.pk)
+        self.assertIn("ValueError", broken["error"])
+        self.assertEqual(broken["occurrences"], 0)
+
+
+class CalendarReportCommandTest(CalendarExplainTestCase):
+    def test_ranks_events_by_cost(self):
+        out = StringIO()
+        call_command("calendar_report", months=1, limit=2, stdout=out)
+        lines = out.getvalue().splitlines()
+        start = timezone.localdate()
+        self.assertIn("Expansion cost of 3 recurring events from", lines[0])
+        self.assertIn(str(start), lines[0])
+        # Header, two events and the total
+        self.assertEqual(len(lines), 5)
+        self.assertIn("FREQ=HOURLY", lines[2])
+        self.assertIn("over budget", lines[2])
+        self.assertTrue(lines[-1].startswith("Total: "))
+
+    def test_json(self):
+        self.weekly.series_start_date = timezone.localdate() + timedelta(days=400)
+        self.weekly.save()
+        out = StringIO()
+        call_command("calendar_report", "--json", limit=0, stdout=out)
+        report = json.loads(out.getvalue())
+        events = {stats["event_id"]: stats for stats in report["events"]}
+        self.assertEqual(set(events), {self.weekly.pk, self.monthly.pk, self.hourly.pk})
+        self.assertEqual(events[self.weekly.pk]["occurrences"], 0)
+        # Twelve first Sundays, or thirteen when today is one
+        self.assertIn(events[self.monthly.pk]["occurrences"], (12, 13))
+        self.assertFalse(events[self.hourly.pk]["quarantined"])
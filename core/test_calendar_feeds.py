@@ -0,0 +1,217 @@
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .ics import _fold
+from .models import Event, EventException, Ministry, Parish, User
+
+
+class CalendarFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.other_parish = Parish.objects.create(name="Other Parish", address="456 St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.other_ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.other_parish,
+            name="Other Ministry",
+            description="Another ministry",
+            contact_info="Contact info",
+        )
+        self.weekly = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            description="Every Sunday; all welcome",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            series_end_date=date(2025, 6, 30),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 30),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        EventException.objects.create(
+            event=self.weekly,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=datetime(2025, 6, 16, 14, 0, tzinfo=dt_timezone.utc),
+            new_end_datetime=datetime(2025, 6, 16, 15, 0, tzinfo=dt_timezone.utc),
+        )
+        self.adhoc = Event.objects.create(
+            associated_ministry=self.other_ministry,
+            title="Special Event",
+            description="Once only",
+            location="Hall",
+            is_recurring=False,
+            start_datetime=timezone.make_aware(datetime(2025, 6, 15, 14, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 15, 16, 0)),
+        )
+
+    def _feed(self, url=None, **headers):
+        response = self.client.get(url or reverse("calendar_feed"), headers=headers)
+        if response.streaming:
+            body = b"".join(response.streaming_content)
+        else:
+            body = response.content
+        return response, body.decode()
+
+    def test_recurring_event_emitted_as_rrule(self):
+        response, body = self._feed()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(body.endswith("END:VCALENDAR\r\n"))
+
+        lines = body.split("\r\n")
+        self.assertIn("DTSTART;TZID=America/New_York:20250601T100000", lines)
+        self.assertIn("RRULE:FREQ=WEEKLY;BYDAY=SU;UNTIL=20250701T035959Z", lines)
+        self.assertIn("EXDATE;TZID=America/New_York:20250608T100000", lines)
+        self.assertIn("RECURRENCE-ID;TZID=America/New_York:20250615T100000", lines)
+        self.assertIn("DTSTART:20250616T140000Z", lines)
+        self.assertIn("SUMMARY:Weekly Service (Rescheduled)", lines)
+        self.assertIn("DESCRIPTION:Every Sunday\\; all welcome", lines)
+        # One master, one override and one ad-hoc event; nothing pre-expanded
+        self.assertEqual(lines.count("BEGIN:VEVENT"), 3)
+        self.assertEqual(lines.count(f"UID:event-{self.weekly.id}@hogtown"), 2)
+
+    def test_series_end_replaces_rule_end(self):
+        for rule_text in (
+            "FREQ=WEEKLY;BYDAY=SU;COUNT=10",
+            "FREQ=WEEKLY;BYDAY=SU;UNTIL=20251231",
+        ):
+            with self.subTest(rule_text=rule_text):
+                # As when the series was split on June 22nd
+                self.weekly.recurrence_rule = rule_text
+                self.weekly.series_end_date = date(2025, 6, 21)
+                self.weekly.save()
+                _, body = self._feed()
+                self.assertIn(
+                    "RRULE:FREQ=WEEKLY;BYDAY=SU;UNTIL=20250616T035959Z",
+                    body.split("\r\n"),
+                )
+
+        # The rule ends first
+        self.weekly.recurrence_rule = "FREQ=WEEKLY;BYDAY=SU;COUNT=2"
+        self.weekly.save()
+        _, body = self._feed()
+        self.assertIn("RRULE:FREQ=WEEKLY;BYDAY=SU;UNTIL=20250609T035959Z", body)
+        self.assertNotIn("COUNT=", body)
+
+    def test_time_zone_described(self):
+        _, body = self._feed()
+        lines = body.split("\r\n")
+        start = lines.index("BEGIN:VTIMEZONE")
+        end = lines.index("END:VTIMEZONE")
+        # After the calendar header, before any event
+        self.assertLess(end, lines.index("BEGIN:VEVENT"))
+        self.assertEqual(lines[start + 1], "TZID:America/New_York")
+        self.assertEqual(
+            lines[start + 2 : end],
+            [
+                "BEGIN:DAYLIGHT",
+                "DTSTART:20070311T020000",
+                "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU",
+                "TZOFFSETFROM:-0500",
+                "TZOFFSETTO:-0400",
+                "TZNAME:EDT",
+                "END:DAYLIGHT",
+                "BEGIN:STANDARD",
+                "DTSTART:20071104T020000",
+                "RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU",
+                "TZOFFSETFROM:-0400",
+                "TZOFFSETTO:-0500",
+                "TZNAME:EST",
+                "END:STANDARD",
+            ],
+        )
+
+    @override_settings(TIME_ZONE="Europe/London")
+    def test_last_weekday_rules(self):
+        _, body = self._feed()
+        self.assertIn("RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU\r\n", body)
+        self.assertIn("RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU\r\n", body)
+
+    def test_rules_are_not_expanded(self):
+        with patch("core.calendar.occurrence_dates") as occurrence_dates:
+            self._feed()
+        occurrence_dates.assert_not_called()
+
+    def test_invalid_rule_omitted(self):
+        Event.objects.filter(pk=self.weekly.pk).update(recurrence_rule="INVALID_RULE")
+        with patch("core.ics.logger") as mock_logger:
+            _, body = self._feed()
+        self.assertNotIn(f"UID:event-{self.weekly.id}@hogtown", body)
+        self.assertIn("SUMMARY:Special Event", body)
+        mock_logger.warning.assert_called_once()
+
+    def test_parish_and_ministry_feeds(self):
+        _, body = self._feed(reverse("parish_calendar_feed", args=[self.parish.id]))
+        self.assertIn("SUMMARY:Weekly Service", body)
+        self.assertNotIn("Special Event", body)
+        self.assertIn("X-WR-CALNAME:Test Parish", body)
+
+        _, body = self._feed(
+            reverse("ministry_calendar_feed", args=[self.other_ministry.id])
+        )
+        self.assertIn("SUMMARY:Special Event", body)
+        self.assertNotIn("Weekly Service", body)
+
+        response, _ = self._feed(reverse("parish_calendar_feed", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        response, body = self._feed()
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response, _ = self._feed(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response, _ = self._feed(if_modified_since=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+        # Editing an event invalidates the cached feed and its validators
+        self.adhoc.title = "Renamed Event"
+        self.adhoc.save()
+        response, body = self._feed(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("SUMMARY:Renamed Event", body)
+
+    @override_settings(CALENDAR_CACHE_TIMEOUT=0)
+    def test_feed_streamed_without_cache(self):
+        response, body = self._feed()
+        self.assertTrue(response.streaming)
+        self.assertIn("RRULE:FREQ=WEEKLY", body)
+
+    def test_long_lines_folded(self):
+        line = "DESCRIPTION:" + "é" * 100
+        folded = _fold(line)
+        for part in folded.split("\r\n")[:-1]:
+            self.assertLessEqual(len(part.encode()), 75)
+        self.assertEqual(folded.replace("\r\n ", "").rstrip("\r\n"), line)
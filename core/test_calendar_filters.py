@@ -0,0 +1,119 @@
+from datetime import date, time
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .models import Category, Event, Ministry, Parish, User
+from .occurrences import extend_horizon
+
+
+class CalendarFilterTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.youth = Category.objects.create(name="Youth")
+        self.music = Category.objects.create(name="Music")
+        self.st_mary = Parish.objects.create(name="St. Mary", address="1 Main St")
+        self.st_john = Parish.objects.create(name="St. John", address="2 Main St")
+
+        self.choir = self._ministry("Choir", self.st_mary, [self.music])
+        self.youth_group = self._ministry(
+            "Youth Group", self.st_john, [self.youth, self.music]
+        )
+        self._weekly_event("Choir Practice", self.choir)
+        self._weekly_event("Youth Night", self.youth_group)
+
+    def _ministry(self, name, parish, categories):
+        ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=parish,
+            name=name,
+            description=name,
+            contact_info="Contact info",
+        )
+        ministry.categories.set(categories)
+        return ministry
+
+    def _weekly_event(self, title, ministry):
+        return Event.objects.create(
+            associated_ministry=ministry,
+            title=title,
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(19, 0),
+            end_time_of_day=time(20, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=WE",
+        )
+
+    def _titles(self, **filters):
+        params = {"start": "2025-06-01T00:00:00Z", "end": "2025-06-30T23:59:59Z"}
+        params.update(filters)
+        response = self.client.get(reverse("calendar_events_api"), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted({e["title"] for e in response.json()["events"]})
+
+    def test_unfiltered(self):
+        self.assertEqual(self._titles(), ["Choir Practice", "Youth Night"])
+
+    def test_parish_filter(self):
+        self.assertEqual(self._titles(parish=self.st_mary.id), ["Choir Practice"])
+
+    def test_category_filter(self):
+        self.assertEqual(self._titles(category=self.youth.id), ["Youth Night"])
+
+    def test_multi_valued_filters(self):
+        self.assertEqual(
+            self._titles(parish=[self.st_mary.id, self.st_john.id]),
+            ["Choir Practice", "Youth Night"],
+        )
+        self.assertEqual(
+            self._titles(category=f"{self.youth.id},{self.music.id}"),
+            ["Choir Practice", "Youth Night"],
+        )
+
+    def test_ministry_in_several_matching_categories_not_duplicated(self):
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {
+                "start": "2025-06-01T00:00:00Z",
+                "end": "2025-06-30T23:59:59Z",
+                "category": [self.youth.id, self.music.id],
+                "parish": self.st_john.id,
+            },
+        )
+        # Four Wednesdays in June 2025
+        self.assertEqual(len(response.json()["events"]), 4)
+
+    def test_filters_apply_to_materialized_occurrences(self):
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        self.assertEqual(self._titles(parish=self.st_john.id), ["Youth Night"])
+        self.assertEqual(
+            self._titles(category=self.music.id),
+            ["Choir Practice", "Youth Night"],
+        )
+
+    def test_category_change_invalidates_cached_response(self):
+        self.assertEqual(self._titles(category=self.youth.id), ["Youth Night"])
+        self.choir.categories.add(self.youth)
+        self.assertEqual(
+            self._titles(category=self.youth.id), ["Choir Practice", "Youth Night"]
+        )
+
+    def test_empty_filter_ignored(self):
+        self.assertEqual(
+            self._titles(category="", parish=""), ["Choir Practice", "Youth Night"]
+        )
+
+    def test_invalid_filter_rejected(self):
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {"start": "2025-06-01", "end": "2025-06-30", "parish": "abc"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid filter value", response.json()["error"])
@@ -0,0 +1,142 @@
+"""
+Tests for the calendar's window queries.
+
+Checks that windows are selected with overlap predicates that the database
+answers from indexes, and that multi-day events overlapping a window appear.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .models import Event, EventException, Ministry, OccurrenceHorizon, Parish, User
+from .occurrences import extend_horizon
+
+# Full scans of the seeded tables, as reported by SQLite and PostgreSQL EXPLAIN
+SEQUENTIAL_SCAN = re.compile(
+    r"(\bSCAN|Seq Scan on) (core_event|core_eventexception|core_eventoccurrence)\b"
+)
+
+
+class CalendarIndexTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+
+
+class WindowQueryPlanTest(CalendarIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        # Two years of ad-hoc events and a mix of current and finished series
+        first_day = date(2024, 1, 1)
+        events = [
+            Event(
+                associated_ministry=self.ministry,
+                title=f"Event {i}",
+                is_recurring=False,
+                start_datetime=timezone.make_aware(
+                    datetime.combine(first_day + timedelta(days=i % 730), time(14))
+                ),
+                end_datetime=timezone.make_aware(
+                    datetime.combine(first_day + timedelta(days=i % 730), time(16))
+                ),
+            )
+            for i in range(2000)
+        ]
+        events += [
+            Event(
+                associated_ministry=self.ministry,
+                title=f"Series {i}",
+                is_recurring=True,
+                series_start_date=first_day + timedelta(days=i % 700),
+                series_end_date=first_day + timedelta(days=i % 700 + 60),
+                start_time_of_day=time(10, 0),
+                end_time_of_day=time(11, 0),
+                recurrence_rule="FREQ=WEEKLY",
+            )
+            for i in range(300)
+        ]
+        Event.objects.bulk_create(events, batch_size=500)
+        EventException.objects.bulk_create(
+            [
+                EventException(
+                    event=event,
+                    original_occurrence_date=event.series_start_date,
+                    status="cancelled",
+                )
+                for event in Event.objects.filter(is_recurring=True)
+            ],
+            batch_size=500,
+        )
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertIndexed(self, queryset):
+        plan = queryset.explain()
+        self.assertIsNone(SEQUENTIAL_SCAN.search(plan), plan)
+
+    def test_window_queries_use_indexes(self):
+        window = CalendarWindow(date(2025, 6, 1), date(2025, 6, 30))
+        for name in (
+            "_adhoc_events",
+            "_recurring_events",
+            "_exceptions",
+            "_materialized_rows",
+        ):
+            with self.subTest(query=name):
+                self.assertIndexed(getattr(window, name)())
+
+
+@override_settings(CALENDAR_CACHE_TIMEOUT=0)
+class OverlappingEventTest(CalendarIndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.retreat = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekend Retreat",
+            is_recurring=False,
+            start_datetime=timezone.make_aware(datetime(2025, 5, 30, 18, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 1, 12, 0)),
+        )
+        Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Finished Before",
+            is_recurring=False,
+            start_datetime=timezone.make_aware(datetime(2025, 5, 30, 18, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 5, 31, 23, 0)),
+        )
+
+    def _titles(self):
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {"start": "2025-06-01T00:00:00Z", "end": "2025-06-30T23:59:59Z"},
+        )
+        return [event["title"] for event in response.json()["events"]]
+
+    def test_multi_day_event_overlapping_window_start(self):
+        self.assertEqual(self._titles(), ["Weekend Retreat"])
+
+    def test_multi_day_event_from_materialized_table(self):
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        self.assertTrue(OccurrenceHorizon.objects.exists())
+        self.assertEqual(self._titles(), ["Weekend Retreat"])
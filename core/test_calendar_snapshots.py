@@ -0,0 +1,173 @@
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import date, time
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .calendar_cache import bump_generation
+from .models import Event, Ministry, Parish, User
+from .snapshots import MANIFEST_NAME, publish_snapshots, read_manifest, snapshot_urls
+
+TODAY = date(2025, 6, 10)
+
+
+class CalendarSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.snapshot_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.snapshot_root)
+        settings_override = override_settings(
+            CALENDAR_SNAPSHOT_ROOT=self.snapshot_root,
+            CALENDAR_SNAPSHOTS_ENABLED=True,
+            CALENDAR_CACHE_TIMEOUT=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            description="Every Sunday",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 5),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+
+    def _snapshot_path(self, month, manifest=None):
+        manifest = manifest or read_manifest()
+        return Path(self.snapshot_root) / manifest["months"][month]
+
+    def test_publish_writes_api_payload_per_month(self):
+        manifest = publish_snapshots(today=TODAY)
+        self.assertEqual(list(manifest["months"]), ["2025-06", "2025-07", "2025-08"])
+
+        path = self._snapshot_path("2025-06", manifest)
+        content = path.read_bytes()
+        self.assertEqual(gzip.decompress(Path(f"{path}.gz").read_bytes()), content)
+
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {
+                "start": "2025-06-01",
+                "end": "2025-06-30",
+                "format": "compact",
+                "fields": "id,title,start,end",
+            },
+        )
+        self.assertEqual(json.loads(content), response.json())
+        self.assertEqual(len(response.json()["occurrences"]), 5)
+
+    def test_republished_only_after_changes(self):
+        # The on-change hook publishes the months from today
+        first = publish_snapshots()
+        self.assertIsNone(publish_snapshots())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.title = "Sunday Service"
+            self.event.save()
+
+        manifest = read_manifest()
+        month = next(iter(manifest["months"]))
+        self.assertNotEqual(manifest["generation"], first["generation"])
+        self.assertNotEqual(manifest["months"][month], first["months"][month])
+        payload = json.loads(self._snapshot_path(month, manifest).read_bytes())
+        self.assertEqual(payload["series"][0]["title"], "Sunday Service")
+
+    def test_page_offers_current_snapshots_only(self):
+        publish_snapshots()
+        response = self.client.get(reverse("event_calendar"))
+        urls = response.context["snapshots"]
+        self.assertEqual(len(urls), 3)
+        month, url = next(iter(urls.items()))
+        self.assertTrue(url.startswith("/calendar/snapshots/"))
+
+        # Changed, but not yet republished (e.g. by another instance)
+        Event.objects.filter(pk=self.event.pk).update(title="Changed")
+        bump_generation()
+        response = self.client.get(reverse("event_calendar"))
+        self.assertNotEqual(response.context["snapshots"][month], url)
+        # The new snapshot is rendered on its first request
+        payload = json.loads(
+            self.client.get(response.context["snapshots"][month]).content
+        )
+        self.assertEqual(payload["series"][0]["title"], "Changed")
+
+    def test_snapshot_served_compressed(self):
+        publish_snapshots()
+        url = next(iter(snapshot_urls(None).values()))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn("immutable", response["Cache-Control"])
+        content = gzip.decompress(response.content)
+
+        response = self.client.get(url)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, content)
+
+    def test_only_published_or_current_snapshots_served(self):
+        publish_snapshots()
+        published = next(iter(snapshot_urls(None).values()))
+        bump_generation()
+        # Pages rendered before the change still load their snapshots
+        self.assertEqual(self.client.get(published).status_code, 200)
+        for name in ("2000-01.1.json", "..", MANIFEST_NAME):
+            with self.subTest(name=name):
+                response = self.client.get(reverse("calendar_snapshot", args=[name]))
+                self.assertEqual(response.status_code, 404)
+
+    def test_page_falls_back_to_snapshots_without_database(self):
+        publish_snapshots(today=TODAY)
+        bump_generation()
+
+        with patch(
+            "core.views.calendar_cache.current_generation", side_effect=DatabaseError
+        ):
+            response = self.client.get(reverse("event_calendar"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["snapshots"]), 3)
+
+    def test_api_reports_unavailable_database(self):
+        with patch("core.views.CalendarWindow.events", side_effect=DatabaseError):
+            response = self.client.get(
+                reverse("calendar_events_api"),
+                {"start": "2025-06-01", "end": "2025-06-30"},
+            )
+        self.assertEqual(response.status_code, 503)
+
+    def test_command_publishes(self):
+        out = StringIO()
+        call_command("publish_calendar_snapshots", stdout=out)
+        self.assertIn("Published", out.getvalue())
+        call_command("publish_calendar_snapshots", stdout=out)
+        self.assertIn("already current", out.getvalue())
@@ -0,0 +1,78 @@
+import json
+from datetime import date, time
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .calendar import CalendarWindow
+from .models import Event, Ministry, Parish, User
+
+
+class CalendarStreamingTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Daily Prayer",
+            description="Morning prayer",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 1),
+            start_time_of_day=time(8, 0),
+            end_time_of_day=time(8, 30),
+            recurrence_rule="FREQ=DAILY",
+        )
+
+    def _get(self, start, end):
+        return self.client.get(
+            reverse("calendar_events_api"), {"start": start, "end": end}
+        )
+
+    def test_wide_window_is_streamed(self):
+        response = self._get("2025-01-01", "2025-12-31")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        events = json.loads(b"".join(response.streaming_content))["events"]
+        self.assertEqual(len(events), 365)
+
+    def test_narrow_window_is_not_streamed(self):
+        response = self._get("2025-06-01", "2025-06-30")
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.json()["events"]), 30)
+
+    def test_streamed_document_matches_events(self):
+        window = CalendarWindow(date(2025, 3, 1), date(2025, 6, 30))
+        expected = {"events": CalendarWindow(window.start, window.end).events()}
+
+        for batch_size in (1, 7, 1000):
+            document = "".join(window.json_chunks(batch_size=batch_size))
+            self.assertEqual(json.loads(document), expected)
+
+    def test_empty_window(self):
+        window = CalendarWindow(date(2024, 1, 1), date(2024, 3, 31))
+        self.assertEqual("".join(window.json_chunks()), '{"events": []}')
+
+    @override_settings(CALENDAR_MAX_WINDOW_DAYS=31)
+    def test_window_over_maximum_rejected(self):
+        response = self._get("2025-06-01", "2025-07-31")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("at most 31 days", response.json()["error"])
+
+        response = self._get("2025-06-01", "2025-07-01")
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,139 @@
+from datetime import date, time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .calendar_cache import current_generation
+from .models import Event, Ministry, Parish, User
+
+
+class CalendarMonthTileTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.other_parish = Parish.objects.create(name="Other Parish", address="456")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.other_ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.other_parish,
+            name="Other Ministry",
+            description="",
+            contact_info="",
+        )
+        for ministry, title in (
+            (self.ministry, "Weekly Service"),
+            (self.other_ministry, "Other Service"),
+        ):
+            Event.objects.create(
+                associated_ministry=ministry,
+                title=title,
+                description="Every Sunday",
+                location="Main Chapel",
+                is_recurring=True,
+                series_start_date=date(2025, 1, 5),
+                start_time_of_day=time(10, 0),
+                end_time_of_day=time(11, 0),
+                recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+            )
+
+    def _url(self, month="2025-06"):
+        return reverse("calendar_month_api", args=[month])
+
+    def _get(self, month="2025-06", **params):
+        if "v" not in params:
+            params["v"] = current_generation()
+        return self.client.get(self._url(month), params)
+
+    def test_versioned_month_cacheable_for_a_year(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        data = response.json()
+        self.assertEqual(data["start"], "2025-06-01")
+        # June 2025 has five Sundays
+        self.assertEqual(len(data["occurrences"]), 10)
+        self.assertEqual(set(data["series"][0]), {"id", "title", "recurring"})
+
+    def test_month_matches_api_window(self):
+        api = self.client.get(
+            reverse("calendar_events_api"),
+            {
+                "start": "2025-06-01",
+                "end": "2025-06-30",
+                "format": "compact",
+                "fields": "id,title,start,end",
+            },
+        )
+        self.assertEqual(self._get().json(), api.json())
+
+    def test_repeat_request_served_from_cache(self):
+        version = current_generation()
+        first = self._get(v=version)
+        # Generation counter (for the version check and the cache key) and
+        # cached body only
+        with self.assertNumQueries(3):
+            second = self._get(v=version)
+        self.assertEqual(first.content, second.content)
+
+    def test_unversioned_request_redirected_to_current_version(self):
+        response = self.client.get(self._url(), {"parish": self.parish.id})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            response["Location"],
+            f"{self._url()}?parish={self.parish.id}&v={current_generation()}",
+        )
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_write_moves_to_new_version(self):
+        old_version = current_generation()
+        Event.objects.filter(title="Other Service").get().delete()
+        response = self.client.get(self._url(), {"v": old_version})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self.client.get(response["Location"]).json()["series"]), 1)
+
+    def test_filters(self):
+        data = self._get(parish=self.other_parish.id).json()
+        self.assertEqual(
+            [series["title"] for series in data["series"]], ["Other Service"]
+        )
+
+    def test_invalid_month_or_filter_not_found(self):
+        for month, params in (
+            ("2025-13", {}),
+            ("June", {}),
+            ("9999-12", {}),
+            ("2025-06", {"parish": "abc"}),
+        ):
+            with self.subTest(month=month, params=params):
+                self.assertEqual(self._get(month, **params).status_code, 404)
+
+    def test_unavailable_database(self):
+        with patch("core.views.CalendarWindow.compact", side_effect=DatabaseError):
+            response = self._get()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.has_header("Cache-Control"))
+
+    def test_page_requests_tiles_of_its_version(self):
+        response = self.client.get(reverse("event_calendar"))
+        self.assertEqual(response.context["calendar_version"], current_generation())
+        self.assertContains(response, 'id="calendar-version"')
+        self.assertContains(response, reverse("calendar_month_api", args=["0000-00"]))
@@ -0,0 +1,201 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .changes import changes_since, current_token
+from .compaction import archive_expired, fold_trailing_cancellations
+from .models import ArchivedCalendarRow, Event, EventException, Ministry, Parish, User
+
+CUTOFF = date(2025, 6, 1)
+
+
+class CompactionTestCase(TestCase):
+    def setUp(self):
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+
+    def _series(self, title, rule="FREQ=WEEKLY;BYDAY=SU", end=None):
+        return Event.objects.create(
+            associated_ministry=self.ministry,
+            title=title,
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 5),
+            series_end_date=end,
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule=rule,
+        )
+
+    def _adhoc(self, title, day):
+        start = timezone.make_aware(datetime.combine(day, time(18, 0)))
+        return Event.objects.create(
+            associated_ministry=self.ministry,
+            title=title,
+            description="",
+            location="Hall",
+            start_datetime=start,
+            end_datetime=start + timedelta(hours=2),
+        )
+
+    def _cancel(self, event, *days):
+        for day in days:
+            EventException.objects.create(
+                event=event, original_occurrence_date=day, status="cancelled"
+            )
+
+    def _starts(self, start, end):
+        return [event["start"] for event in CalendarWindow(start, end).events()]
+
+
+class FoldTrailingCancellationsTest(CompactionTestCase):
+    def test_trailing_cancellations_folded(self):
+        event = self._series("Lent Series", end=date(2025, 3, 30))
+        self._cancel(
+            event,
+            date(2025, 2, 9),
+            date(2025, 3, 16),
+            date(2025, 3, 23),
+            date(2025, 3, 30),
+        )
+        before = self._starts(date(2025, 1, 1), date(2025, 12, 31))
+
+        self.assertEqual(fold_trailing_cancellations(), 3)
+        event.refresh_from_db()
+        self.assertEqual(event.series_end_date, date(2025, 3, 15))
+        self.assertEqual(event.last_occurrence_date, date(2025, 3, 9))
+        self.assertEqual(
+            list(
+                event.eventexception_set.values_list(
+                    "original_occurrence_date", flat=True
+                )
+            ),
+            [date(2025, 2, 9)],
+        )
+        self.assertEqual(self._starts(date(2025, 1, 1), date(2025, 12, 31)), before)
+
+    def test_counted_series_folded(self):
+        event = self._series("Five Weeks", rule="FREQ=WEEKLY;BYDAY=SU;COUNT=5")
+        self._cancel(event, date(2025, 2, 2))
+        self.assertEqual(fold_trailing_cancellations(batch_size=1), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.series_end_date, date(2025, 2, 1))
+
+    def test_other_series_untouched(self):
+        open_ended = self._series("Sunday Mass")
+        self._cancel(open_ended, date(2025, 3, 30))
+        cancelled = self._series("Called Off", end=date(2025, 1, 19))
+        self._cancel(cancelled, date(2025, 1, 5), date(2025, 1, 12), date(2025, 1, 19))
+
+        self.assertEqual(fold_trailing_cancellations(), 0)
+        self.assertEqual(EventException.objects.count(), 4)
+
+
+class ArchiveExpiredTest(CompactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old_picnic = self._adhoc("Old Picnic", date(2025, 5, 3))
+        self.picnic = self._adhoc("Picnic", date(2025, 6, 7))
+        self.ended = self._series("Lent Series", end=date(2025, 3, 30))
+        self._cancel(self.ended, date(2025, 3, 16))
+        self.ongoing = self._series("Sunday Mass")
+        self._cancel(self.ongoing, date(2025, 2, 9), date(2025, 6, 15))
+        EventException.objects.create(
+            event=self.ongoing,
+            original_occurrence_date=date(2025, 5, 18),
+            status="rescheduled",
+            new_start_datetime=timezone.make_aware(datetime(2025, 6, 3, 18, 0)),
+            new_end_datetime=timezone.make_aware(datetime(2025, 6, 3, 19, 0)),
+        )
+
+    def test_old_rows_archived(self):
+        kept = self._starts(CUTOFF, date(2025, 12, 31))
+
+        self.assertEqual(archive_expired(CUTOFF, batch_size=1), (2, 2))
+        self.assertCountEqual(
+            Event.objects.values_list("title", flat=True), ["Picnic", "Sunday Mass"]
+        )
+        # The series now starts at the oldest date still referenced
+        self.ongoing.refresh_from_db()
+        self.assertEqual(self.ongoing.series_start_date, date(2025, 5, 18))
+        self.assertCountEqual(
+            self.ongoing.eventexception_set.values_list(
+                "original_occurrence_date", flat=True
+            ),
+            [date(2025, 5, 18), date(2025, 6, 15)],
+        )
+        self.assertEqual(self._starts(CUTOFF, date(2025, 12, 31)), kept)
+
+        archived = ArchivedCalendarRow.objects.filter(model="event")
+        self.assertCountEqual(
+            [row.data["title"] for row in archived], ["Old Picnic", "Lent Series"]
+        )
+        self.assertEqual(
+            ArchivedCalendarRow.objects.filter(model="exception").count(), 2
+        )
+
+    def test_counted_series_restarted(self):
+        counted = self._series("Thirty Weeks", rule="FREQ=WEEKLY;BYDAY=SU;COUNT=30")
+        self._cancel(counted, date(2025, 1, 12))
+        kept = self._starts(CUTOFF, date(2025, 12, 31))
+
+        archive_expired(CUTOFF)
+        counted.refresh_from_db()
+        self.assertEqual(counted.series_start_date, date(2025, 6, 1))
+        self.assertEqual(counted.recurrence_rule, "FREQ=WEEKLY;BYDAY=SU;COUNT=9")
+        self.assertEqual(self._starts(CUTOFF, date(2025, 12, 31)), kept)
+
+    @override_settings(CALENDAR_CHANGES_SETTLE_SECONDS=0)
+    def test_restart_logged_for_sync_clients(self):
+        token = current_token()
+        archive_expired(CUTOFF)
+        changes = changes_since(token)["changes"]
+        restarted = [
+            c for c in changes if c["model"] == "event" and c["id"] == self.ongoing.pk
+        ]
+        self.assertEqual(restarted[0]["action"], "updated")
+        self.assertEqual(restarted[0]["data"]["series_start_date"], date(2025, 5, 18))
+
+    def test_series_not_restarted_keeps_exceptions(self):
+        # Stored before rules were validated
+        Event.objects.filter(pk=self.ongoing.pk).update(
+            recurrence_rule="FREQ=SOMETIMES"
+        )
+
+        self.assertEqual(archive_expired(CUTOFF), (1, 2))
+        self.ongoing.refresh_from_db()
+        self.assertEqual(self.ongoing.series_start_date, date(2025, 1, 5))
+        self.assertEqual(self.ongoing.eventexception_set.count(), 3)
+
+    def test_purge(self):
+        self.assertEqual(archive_expired(CUTOFF, purge=True), (2, 2))
+        self.assertFalse(ArchivedCalendarRow.objects.exists())
+
+    def test_command_reports_reclaimed_rows(self):
+        self._cancel(self.ended, date(2025, 3, 30))
+        days = (timezone.localdate() - CUTOFF).days
+        out = StringIO()
+        call_command("compact_calendar", days=days, stdout=out)
+        self.assertIn(
+            "Folded 1 trailing cancellations; archived 2 exceptions and 2 events",
+            out.getvalue(),
+        )
+        self.assertIn("Reclaimed 5 rows", out.getvalue())
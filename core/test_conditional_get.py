@@ -0,0 +1,190 @@
+from datetime import date, time
+from unittest.mock import patch
+
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Event, EventException, Ministry, Parish, User
+
+
+@override_settings(CALENDAR_CACHE_TIMEOUT=0)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            description="Every Sunday",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        self.calendar_params = {"start": "2025-06-01", "end": "2025-06-30"}
+
+    def _calendar(self, **headers):
+        return self.client.get(
+            reverse("calendar_events_api"), self.calendar_params, headers=headers
+        )
+
+    def test_unchanged_calendar_not_modified(self):
+        first = self._calendar()
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Last-Modified", first)
+
+        # The validator only; nothing is expanded
+        with patch("core.views.CalendarWindow") as window:
+            with self.assertNumQueries(1):
+                second = self._calendar(if_none_match=first["ETag"])
+        window.assert_not_called()
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        third = self._calendar(if_modified_since=first["Last-Modified"])
+        self.assertEqual(third.status_code, 304)
+
+    def test_changes_in_scope_modify_calendar(self):
+        changes = [
+            lambda: self.event.save(),
+            lambda: EventException.objects.create(
+                event=self.event,
+                original_occurrence_date=date(2025, 6, 8),
+                status="cancelled",
+            ),
+            lambda: EventException.objects.all().delete(),
+            lambda: self.ministry.save(),
+            lambda: self.parish.save(),
+        ]
+        etag = self._calendar()["ETag"]
+        for change in changes:
+            change()
+            response = self._calendar(if_none_match=etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response["ETag"]
+
+    def test_filtered_calendar_ignores_other_parishes(self):
+        other = Parish.objects.create(name="Other Parish", address="456 Other St")
+        self.calendar_params["parish"] = str(self.parish.pk)
+        etag = self._calendar()["ETag"]
+
+        other.save()
+        self.assertEqual(self._calendar(if_none_match=etag).status_code, 304)
+
+        self.parish.save()
+        self.assertEqual(self._calendar(if_none_match=etag).status_code, 200)
+
+    def test_category_change_modifies_filtered_calendar(self):
+        category = Category.objects.create(name="Youth")
+        self.calendar_params["category"] = str(category.pk)
+        etag = self._calendar()["ETag"]
+
+        self.ministry.categories.add(category)
+        response = self._calendar(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["events"]), 5)
+
+    def test_occurrence_detail_not_modified(self):
+        url = reverse(
+            "calendar_event_detail", args=[f"recurring_{self.event.id}_2025-06-08"]
+        )
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        response = self.client.get(url, headers={"if_none_match": first["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+        EventException.objects.create(
+            event=self.event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        response = self.client.get(url, headers={"if_none_match": first["ETag"]})
+        self.assertEqual(response.status_code, 404)
+
+    def test_directory_and_detail_pages_not_modified(self):
+        urls = [
+            reverse("parish_directory"),
+            reverse("parish_detail", args=[self.parish.pk]),
+            reverse("ministry_detail", args=[self.ministry.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                with self.assertTemplateNotUsed("core/base.html"):
+                    response = self.client.get(url, headers={"if_none_match": etag})
+                self.assertEqual(response.status_code, 304)
+
+    def test_ministry_page_modified_by_event_and_category_changes(self):
+        url = reverse("ministry_detail", args=[self.ministry.pk])
+        etag = self.client.get(url)["ETag"]
+        self.event.save()
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        category = Category.objects.create(name="Youth")
+        category.ministry_set.add(self.ministry)
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_pages_modified_by_new_events_and_exceptions(self):
+        changes = [
+            lambda: Event.objects.create(
+                associated_ministry=self.ministry,
+                title="Parish Picnic",
+                is_recurring=False,
+                start_datetime=timezone.now(),
+                end_datetime=timezone.now(),
+            ),
+            lambda: EventException.objects.create(
+                event=self.event,
+                original_occurrence_date=date(2025, 6, 8),
+                status="cancelled",
+            ),
+        ]
+        etags = {
+            url: self.client.get(url)["ETag"]
+            for url in (
+                reverse("parish_detail", args=[self.parish.pk]),
+                reverse("ministry_detail", args=[self.ministry.pk]),
+            )
+        }
+        for change in changes:
+            change()
+            for url, etag in etags.items():
+                response = self.client.get(url, headers={"if_none_match": etag})
+                self.assertEqual(response.status_code, 200)
+                etags[url] = response["ETag"]
+
+    def test_pages_vary_by_signed_in_user(self):
+        url = reverse("parish_directory")
+        etag = self.client.get(url)["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_validator_skipped_without_database(self):
+        with patch("core.conditional.scope_state", side_effect=DatabaseError):
+            with patch("core.views.CalendarWindow.events", side_effect=DatabaseError):
+                response = self._calendar(if_none_match='"anything"')
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn("ETag", response)
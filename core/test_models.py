@@ -1,4 +1,4 @@
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -173,6 +173,21 @@ class EventModelTest(TestCase):
         with self.assertRaises(ValidationError):
             event.clean()
 
+    def test_adhoc_event_must_end_after_it_starts(self):
+        start = timezone.make_aware(datetime(2025, 1, 15, 19, 0))
+        for end in (start, start - timedelta(hours=1)):
+            with self.subTest(end=end):
+                event = Event(
+                    associated_ministry=self.ministry,
+                    title="Instant Event",
+                    is_recurring=False,
+                    start_datetime=start,
+                    end_datetime=end,
+                )
+                with self.assertRaises(ValidationError) as cm:
+                    event.clean()
+                self.assertIn("end_datetime", cm.exception.message_dict)
+
     def test_event_validation_recurring(self):
         event = Event(
             associated_ministry=self.ministry,
@@ -0,0 +1,187 @@
+import tempfile
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .models import Category, Event, EventException, Ministry, Parish, User
+from .occurrence_index import build_index, current_index
+from .occurrences import extend_horizon
+
+
+class OccurrenceIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "occurrences.idx"
+        settings = override_settings(CALENDAR_OCCURRENCE_INDEX_PATH=str(self.path))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.other_parish = Parish.objects.create(name="Other Parish", address="456")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.category = Category.objects.create(name="Worship")
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.ministry.categories.add(self.category)
+        self.other_ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.other_parish,
+            name="Other Ministry",
+            description="",
+            contact_info="",
+        )
+        self.series = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Sunday Mass",
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 5),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        EventException.objects.create(
+            event=self.series,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        EventException.objects.create(
+            event=self.series,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=timezone.make_aware(datetime(2025, 7, 2, 18, 0)),
+            new_end_datetime=timezone.make_aware(datetime(2025, 7, 2, 19, 0)),
+        )
+        # Runs from the end of May into June
+        start = timezone.make_aware(datetime(2025, 5, 30, 18, 0))
+        Event.objects.create(
+            associated_ministry=self.other_ministry,
+            title="Retreat",
+            description="",
+            location="Camp",
+            start_datetime=start,
+            end_datetime=start + timedelta(days=3),
+        )
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        self.assertEqual(build_index(), 52)
+
+    def _without_index(self, build):
+        with self.settings(CALENDAR_OCCURRENCE_INDEX_PATH=""):
+            return build()
+
+    def test_windows_match_materialized(self):
+        for start, end, filters in (
+            (date(2025, 6, 1), date(2025, 6, 30), {}),
+            (
+                date(2025, 6, 1),
+                date(2025, 6, 7),
+                {"parish_ids": [self.other_parish.id]},
+            ),
+            (date(2025, 5, 1), date(2025, 7, 31), {"category_ids": [self.category.id]}),
+            (date(2025, 1, 1), date(2025, 12, 31), {}),
+        ):
+            with self.subTest(start=start, end=end, filters=filters):
+                window = CalendarWindow(start, end, **filters)
+                self.assertEqual(
+                    window.events(),
+                    self._without_index(CalendarWindow(start, end, **filters).events),
+                )
+                self.assertEqual(
+                    window.day_counts(),
+                    self._without_index(
+                        CalendarWindow(start, end, **filters).day_counts
+                    ),
+                )
+
+    def test_occurrences_read_from_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            titles = [
+                e["title"]
+                for e in CalendarWindow(date(2025, 6, 1), date(2025, 6, 30)).events()
+            ]
+        self.assertEqual(titles.count("Sunday Mass"), 3)
+        self.assertEqual(titles.count("Retreat"), 1)
+        self.assertFalse(
+            any("core_eventoccurrence" in query["sql"] for query in queries)
+        )
+
+    def test_stale_index_ignored_until_rebuilt(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.series.title = "Parish Mass"
+            self.series.save()
+        # Saving does not rebuild the index; the database answers meanwhile
+        self.assertIsNone(current_index())
+        events = CalendarWindow(date(2025, 6, 1), date(2025, 6, 30)).events()
+        self.assertIn("Parish Mass", {event["title"] for event in events})
+
+        out = StringIO()
+        call_command("build_occurrence_index", stdout=out)
+        self.assertIn("Indexed 52 occurrences", out.getvalue())
+        self.assertIsNotNone(current_index())
+        call_command("build_occurrence_index", stdout=out)
+        self.assertIn("current or disabled", out.getvalue())
+
+    def test_ids_past_int32(self):
+        start = timezone.make_aware(datetime(2025, 6, 20, 9, 0))
+        event = Event.objects.create(
+            pk=2**40,
+            associated_ministry=self.ministry,
+            title="Picnic",
+            description="",
+            location="Park",
+            start_datetime=start,
+            end_datetime=start + timedelta(hours=2),
+        )
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        build_index(force=True)
+        events = CalendarWindow(date(2025, 6, 20), date(2025, 6, 20)).events()
+        self.assertEqual([e["id"] for e in events], [f"adhoc_{event.pk}"])
+
+    def test_rebuild_replaces_file_for_existing_mappings(self):
+        old = current_index()
+        self.assertEqual(build_index(force=True), 52)
+        new = current_index()
+        self.assertIsNot(new, old)
+        # Mapped before the rename, the old file stays readable
+        self.assertEqual(list(old.start), list(new.start))
+
+    def test_window_past_horizon_not_indexed(self):
+        window = CalendarWindow(date(2026, 1, 1), date(2026, 1, 31))
+        self.assertEqual(len(window.events()), 4)
+
+    def test_corrupt_index_ignored(self):
+        self.path.write_bytes(b"not an index")
+        with self.assertLogs("core.occurrence_index", "WARNING"):
+            self.assertIsNone(current_index())
+        events = CalendarWindow(date(2025, 6, 1), date(2025, 6, 30)).events()
+        self.assertEqual(len(events), 5)
+
+    def test_horizon_command_rebuilds_index(self):
+        out = StringIO()
+        call_command("extend_occurrence_horizon", days=30, stdout=out)
+        self.assertIn("Indexed", out.getvalue())
+        self.assertEqual(
+            current_index().horizon, timezone.localdate() + timedelta(days=30)
+        )
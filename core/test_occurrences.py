@@ -0,0 +1,275 @@
+"""
+Tests for the materialized EventOccurrence table.
+
+Covers incremental maintenance through model signals, the nightly
+extend_occurrence_horizon command and serving the calendar API from the table.
+"""
+
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, EventException, Ministry, OccurrenceHorizon, Parish, User
+
+
+class OccurrenceTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        OccurrenceHorizon.objects.create(materialized_through=date(2025, 12, 31))
+
+    def _create_weekly_event(self, **kwargs):
+        fields = {
+            "associated_ministry": self.ministry,
+            "title": "Weekly Service",
+            "description": "Every Sunday",
+            "location": "Main Chapel",
+            "is_recurring": True,
+            "series_start_date": date(2025, 6, 1),
+            "series_end_date": date(2025, 6, 30),
+            "start_time_of_day": time(10, 0),
+            "end_time_of_day": time(11, 30),
+            "recurrence_rule": "FREQ=WEEKLY;BYDAY=SU",
+        }
+        fields.update(kwargs)
+        return Event.objects.create(**fields)
+
+
+class OccurrenceMaintenanceTest(OccurrenceTestCase):
+    def test_recurring_event_materialized_on_save(self):
+        event = self._create_weekly_event()
+
+        dates = list(event.occurrences.order_by("date").values_list("date", flat=True))
+        self.assertEqual(
+            dates,
+            [
+                date(2025, 6, 1),
+                date(2025, 6, 8),
+                date(2025, 6, 15),
+                date(2025, 6, 22),
+                date(2025, 6, 29),
+            ],
+        )
+        occurrence = event.occurrences.get(date=date(2025, 6, 1))
+        self.assertEqual(occurrence.parish, self.parish)
+        self.assertEqual(occurrence.ministry, self.ministry)
+        self.assertEqual(timezone.localtime(occurrence.start).time(), time(10, 0))
+
+    def test_series_not_materialized_past_horizon(self):
+        event = self._create_weekly_event(series_end_date=None)
+        latest = event.occurrences.order_by("-date").first()
+        self.assertEqual(latest.date, date(2025, 12, 28))
+
+    def test_event_update_rebuilds_occurrences(self):
+        event = self._create_weekly_event()
+        event.recurrence_rule = "FREQ=WEEKLY;BYDAY=SA"
+        event.save()
+
+        weekdays = set(
+            d.weekday() for d in event.occurrences.values_list("date", flat=True)
+        )
+        self.assertEqual(weekdays, {5})
+
+    def test_adhoc_event_materialized(self):
+        event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Special Event",
+            is_recurring=False,
+            start_datetime=timezone.make_aware(datetime(2025, 6, 15, 14, 0)),
+            end_datetime=timezone.make_aware(datetime(2025, 6, 15, 16, 0)),
+        )
+        occurrence = event.occurrences.get()
+        self.assertEqual(occurrence.date, date(2025, 6, 15))
+        self.assertEqual(occurrence.start, event.start_datetime)
+
+    def test_exception_updates_single_occurrence(self):
+        event = self._create_weekly_event()
+        exception = EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        self.assertEqual(
+            event.occurrences.get(date=date(2025, 6, 8)).status, "cancelled"
+        )
+
+        exception.status = "rescheduled"
+        exception.new_start_datetime = datetime(
+            2025, 6, 9, 14, 0, tzinfo=dt_timezone.utc
+        )
+        exception.new_end_datetime = datetime(2025, 6, 9, 15, 0, tzinfo=dt_timezone.utc)
+        exception.save()
+        occurrence = event.occurrences.get(date=date(2025, 6, 8))
+        self.assertEqual(occurrence.status, "rescheduled")
+        self.assertEqual(occurrence.start, exception.new_start_datetime)
+
+        exception.delete()
+        self.assertEqual(
+            event.occurrences.get(date=date(2025, 6, 8)).status, "scheduled"
+        )
+        self.assertEqual(event.occurrences.count(), 5)
+
+    def test_exception_moved_to_another_date(self):
+        event = self._create_weekly_event()
+        exception = EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        # As when edited in the admin
+        exception.original_occurrence_date = date(2025, 6, 15)
+        exception.save()
+        self.assertEqual(
+            event.occurrences.get(date=date(2025, 6, 8)).status, "scheduled"
+        )
+        self.assertEqual(
+            event.occurrences.get(date=date(2025, 6, 15)).status, "cancelled"
+        )
+
+    def test_event_with_exceptions_can_be_deleted(self):
+        event = self._create_weekly_event()
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        event.delete()
+        self.assertFalse(EventException.objects.exists())
+
+    def test_ministry_parish_change_updates_occurrences(self):
+        event = self._create_weekly_event()
+        other_parish = Parish.objects.create(name="Other Parish", address="456 St")
+        self.ministry.associated_parish = other_parish
+        self.ministry.save()
+
+        self.assertEqual(
+            set(event.occurrences.values_list("parish_id", flat=True)),
+            {other_parish.id},
+        )
+
+    def test_rule_repeating_within_a_day_materialized_once_a_day(self):
+        event = self._create_weekly_event(recurrence_rule="FREQ=DAILY;BYHOUR=9,18")
+        self.assertEqual(event.occurrences.count(), 30)
+
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        self.assertEqual(
+            event.occurrences.get(date=date(2025, 6, 8)).status, "cancelled"
+        )
+
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {"start": "2025-06-01T00:00:00Z", "end": "2025-07-01T00:00:00Z"},
+        )
+        # Less the cancelled one
+        self.assertEqual(len(response.json()["events"]), 29)
+
+    def test_invalid_rule_materializes_nothing(self):
+        event = self._create_weekly_event(recurrence_rule="INVALID_RULE")
+        self.assertFalse(event.occurrences.exists())
+
+    def test_nothing_materialized_without_horizon(self):
+        OccurrenceHorizon.objects.all().delete()
+        event = self._create_weekly_event()
+        self.assertFalse(event.occurrences.exists())
+
+
+class ExtendOccurrenceHorizonCommandTest(OccurrenceTestCase):
+    def test_command_extends_horizon(self):
+        event = self._create_weekly_event(series_end_date=None)
+        call_command("extend_occurrence_horizon", "--days", "30", stdout=StringIO())
+
+        horizon = OccurrenceHorizon.objects.get()
+        expected = timezone.localdate() + timedelta(days=30)
+        self.assertEqual(horizon.materialized_through, expected)
+        latest = event.occurrences.order_by("-date").first()
+        self.assertGreater(latest.date, expected - timedelta(days=7))
+        self.assertLessEqual(latest.date, expected)
+
+    def test_command_rebuild_initializes_table(self):
+        OccurrenceHorizon.objects.all().delete()
+        event = self._create_weekly_event()
+        self.assertFalse(event.occurrences.exists())
+
+        out = StringIO()
+        call_command("extend_occurrence_horizon", "--rebuild", stdout=out)
+        self.assertEqual(event.occurrences.count(), 5)
+        self.assertIn("Materialized 5 occurrences", out.getvalue())
+
+
+@override_settings(CALENDAR_CACHE_TIMEOUT=0)
+class MaterializedCalendarApiTest(OccurrenceTestCase):
+    def _get_events(self, start="2025-06-01T00:00:00Z", end="2025-06-30T23:59:59Z"):
+        response = self.client.get(
+            reverse("calendar_events_api"), {"start": start, "end": end}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["events"]
+
+    def test_window_served_with_single_range_query(self):
+        event = self._create_weekly_event()
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+
+        # The conditional GET validator, the horizon and the window
+        with self.assertNumQueries(3):
+            events = self._get_events()
+
+        self.assertEqual(
+            [e["start"] for e in events],
+            [
+                "2025-06-01T10:00:00",
+                "2025-06-15T10:00:00",
+                "2025-06-22T10:00:00",
+                "2025-06-29T10:00:00",
+            ],
+        )
+        self.assertEqual(events[0]["id"], f"recurring_{event.id}_2025-06-01")
+        self.assertEqual(events[0]["parish"], "Test Parish")
+
+    def test_rescheduled_occurrence_title(self):
+        event = self._create_weekly_event()
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=datetime(2025, 6, 16, 14, 0, tzinfo=dt_timezone.utc),
+            new_end_datetime=datetime(2025, 6, 16, 15, 30, tzinfo=dt_timezone.utc),
+        )
+
+        events = self._get_events()
+        rescheduled = [e for e in events if "Rescheduled" in e["title"]]
+        self.assertEqual(len(rescheduled), 1)
+        self.assertEqual(rescheduled[0]["start"], "2025-06-16T14:00:00+00:00")
+
+    def test_window_past_horizon_expands_on_the_fly(self):
+        self._create_weekly_event(series_end_date=None)
+        events = self._get_events(
+            start="2026-01-01T00:00:00Z", end="2026-01-31T23:59:59Z"
+        )
+        self.assertEqual(len(events), 4)
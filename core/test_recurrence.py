@@ -0,0 +1,158 @@
+from datetime import date, time
+from importlib import import_module
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+
+from .calendar import CalendarWindow
+from .models import Event, Ministry, Parish, User
+from .recurrence import ALL_WEEKDAYS, recurrence_columns, window_weekday_mask
+
+SUNDAY = 1 << 6
+
+
+class RecurrenceColumnsTest(SimpleTestCase):
+    def columns(self, rule_text, series_end_date=None):
+        return recurrence_columns(
+            rule_text, date(2025, 6, 1), time(10, 0), series_end_date
+        )
+
+    def test_weekly_byday(self):
+        columns = self.columns("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,SU")
+        self.assertEqual(columns["rule_freq"], "WEEKLY")
+        self.assertEqual(columns["rule_interval"], 2)
+        self.assertEqual(columns["rule_byday"], 1 | SUNDAY)
+        self.assertIsNone(columns["last_occurrence_date"])
+
+    def test_weekly_defaults_to_dtstart_weekday(self):
+        # 2025-06-01 is a Sunday
+        self.assertEqual(self.columns("FREQ=WEEKLY")["rule_byday"], SUNDAY)
+
+    def test_ordinal_byday_restricts_weekday(self):
+        self.assertEqual(self.columns("FREQ=MONTHLY;BYDAY=1SU")["rule_byday"], SUNDAY)
+
+    def test_unrestricted_weekdays(self):
+        for rule_text in ("FREQ=DAILY", "FREQ=MONTHLY;BYMONTHDAY=15"):
+            with self.subTest(rule=rule_text):
+                self.assertEqual(self.columns(rule_text)["rule_byday"], 0)
+
+    def test_count_computes_last_occurrence(self):
+        columns = self.columns("FREQ=WEEKLY;BYDAY=SU;COUNT=3")
+        self.assertEqual(columns["rule_count"], 3)
+        self.assertEqual(columns["last_occurrence_date"], date(2025, 6, 15))
+
+    def test_until_computes_last_occurrence(self):
+        columns = self.columns("FREQ=DAILY;UNTIL=20250610")
+        self.assertEqual(columns["rule_until"], date(2025, 6, 10))
+        # UNTIL is midnight, so the 10:00 occurrence that day is excluded
+        self.assertEqual(columns["last_occurrence_date"], date(2025, 6, 9))
+
+    def test_series_end_date_computes_last_occurrence(self):
+        columns = self.columns("FREQ=WEEKLY", series_end_date=date(2025, 6, 30))
+        self.assertEqual(columns["last_occurrence_date"], date(2025, 6, 29))
+
+    def test_invalid_rule_leaves_columns_empty(self):
+        columns = self.columns("INVALID_RULE")
+        self.assertEqual(columns["rule_freq"], "")
+        self.assertEqual(columns["rule_byday"], 0)
+        self.assertIsNone(columns["last_occurrence_date"])
+
+    def test_window_weekday_mask(self):
+        # Wednesday only
+        self.assertEqual(window_weekday_mask(date(2025, 6, 4), date(2025, 6, 4)), 4)
+        self.assertEqual(
+            window_weekday_mask(date(2025, 6, 1), date(2025, 6, 7)), ALL_WEEKDAYS
+        )
+
+
+class EventRecurrenceColumnsTest(TestCase):
+    def setUp(self):
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+
+    def _create_series(self, rule_text, **kwargs):
+        return Event.objects.create(
+            associated_ministry=self.ministry,
+            title=rule_text,
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule=rule_text,
+            **kwargs,
+        )
+
+    def test_save_persists_columns(self):
+        event = self._create_series("FREQ=WEEKLY;BYDAY=SU;COUNT=3")
+        event.refresh_from_db()
+        self.assertEqual(event.rule_byday, SUNDAY)
+        self.assertEqual(event.last_occurrence_date, date(2025, 6, 15))
+
+        event.recurrence_rule = "FREQ=DAILY"
+        event.save(update_fields=["recurrence_rule"])
+        event.refresh_from_db()
+        self.assertEqual(event.rule_byday, 0)
+        self.assertIsNone(event.last_occurrence_date)
+
+    def test_clean_rejects_invalid_rule(self):
+        event = self._create_series("FREQ=WEEKLY")
+        event.recurrence_rule = "INVALID_RULE"
+        with self.assertRaises(ValidationError) as cm:
+            event.clean()
+        self.assertIn("recurrence_rule", cm.exception.message_dict)
+
+    def test_window_excludes_finished_and_off_weekday_series(self):
+        finished = self._create_series("FREQ=WEEKLY;BYDAY=SU;COUNT=2")
+        sundays = self._create_series("FREQ=WEEKLY;BYDAY=SU")
+        daily = self._create_series("FREQ=DAILY")
+        # Bulk loaded rows without columns are never excluded
+        Event.objects.filter(pk=daily.pk).update(rule_byday=0, rule_freq="")
+
+        def series_ids(start, end):
+            return {row["id"] for row in CalendarWindow(start, end)._recurring_events()}
+
+        # A Wednesday in July: only the daily series can occur
+        self.assertEqual(series_ids(date(2025, 7, 2), date(2025, 7, 2)), {daily.id})
+        # A Sunday in July: the two-occurrence series has finished
+        self.assertEqual(
+            series_ids(date(2025, 7, 6), date(2025, 7, 6)), {sundays.id, daily.id}
+        )
+        self.assertEqual(
+            series_ids(date(2025, 6, 1), date(2025, 6, 30)),
+            {finished.id, sundays.id, daily.id},
+        )
+
+    def test_excluded_series_are_not_expanded(self):
+        self._create_series("FREQ=WEEKLY;BYDAY=SU;COUNT=2")
+        window = CalendarWindow(date(2025, 7, 1), date(2025, 7, 31))
+        with patch.object(CalendarWindow, "_expand_series") as expand:
+            self.assertEqual(list(window.occurrences()), [])
+        expand.assert_not_called()
+
+    def test_migration_backfills_columns(self):
+        event = self._create_series("FREQ=WEEKLY;BYDAY=SU;COUNT=2")
+        Event.objects.filter(pk=event.pk).update(
+            rule_byday=0, last_occurrence_date=None
+        )
+
+        migration = import_module("core.migrations.0006_event_rule_columns")
+        migration.backfill_rule_columns(apps, None)
+
+        event.refresh_from_db()
+        self.assertEqual(event.rule_byday, SUNDAY)
+        self.assertEqual(event.last_occurrence_date, date(2025, 6, 8))
@@ -0,0 +1,121 @@
+from datetime import date, datetime, time
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .models import Event, Ministry, Parish, User
+from .rrule_cache import RuleCache, rule_cache
+
+DTSTART = datetime(2025, 6, 1, 10, 0)
+
+
+class RuleCacheTest(TestCase):
+    def setUp(self):
+        self.cache = RuleCache(maxsize=2)
+
+    def test_hit_and_miss_counters(self):
+        first = self.cache.get(1, "FREQ=WEEKLY;BYDAY=SU", DTSTART)
+        second = self.cache.get(1, "FREQ=WEEKLY;BYDAY=SU", DTSTART)
+
+        self.assertIs(first, second)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_rule_text_and_dtstart_are_part_of_key(self):
+        weekly = self.cache.get(1, "FREQ=WEEKLY;BYDAY=SU", DTSTART)
+        self.assertIsNot(weekly, self.cache.get(1, "FREQ=DAILY", DTSTART))
+        self.assertIsNot(
+            weekly, self.cache.get(1, "FREQ=WEEKLY;BYDAY=SU", datetime(2025, 7, 6, 10))
+        )
+
+    def test_least_recently_used_rule_evicted(self):
+        self.cache.get(1, "FREQ=DAILY", DTSTART)
+        self.cache.get(2, "FREQ=DAILY", DTSTART)
+        self.cache.get(1, "FREQ=DAILY", DTSTART)
+        self.cache.get(3, "FREQ=DAILY", DTSTART)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        # Event 1 was used most recently, so event 2 was evicted
+        self.cache.get(1, "FREQ=DAILY", DTSTART)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_invalid_rule_not_cached(self):
+        with self.assertRaises(ValueError):
+            self.cache.get(1, "INVALID_RULE", DTSTART)
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_invalidate_drops_event_rules(self):
+        self.cache.get(1, "FREQ=DAILY", DTSTART)
+        self.cache.get(2, "FREQ=DAILY", DTSTART)
+        self.cache.invalidate(1)
+
+        self.cache.get(1, "FREQ=DAILY", DTSTART)
+        self.assertEqual(self.cache.stats()["misses"], 3)
+
+
+@override_settings(CALENDAR_CACHE_TIMEOUT=0)
+class RuleCacheIntegrationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        rule_cache.clear()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Weekly Service",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            # Simple rules are expanded without dateutil, so use the first Sunday
+            recurrence_rule="FREQ=MONTHLY;BYDAY=1SU",
+        )
+
+    def _get_calendar_events(self):
+        response = self.client.get(
+            reverse("calendar_events_api"),
+            {"start": "2025-06-01T00:00:00Z", "end": "2025-06-30T23:59:59Z"},
+        )
+        return response.json()["events"]
+
+    def test_calendar_requests_reuse_parsed_rule(self):
+        self._get_calendar_events()
+        self._get_calendar_events()
+
+        stats = rule_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_event_save_invalidates_rule(self):
+        self._get_calendar_events()
+        self.event.recurrence_rule = "FREQ=MONTHLY;BYDAY=1SA"
+        self.event.save()
+
+        self.assertEqual(rule_cache.stats()["size"], 0)
+        events = self._get_calendar_events()
+        self.assertEqual(events[0]["start"], "2025-06-07T10:00:00")
+
+    def test_stats_endpoint_requires_staff(self):
+        response = self.client.get(reverse("calendar_cache_stats"))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("calendar_cache_stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.json()["rrule_cache"])
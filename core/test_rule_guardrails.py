@@ -0,0 +1,191 @@
+import time as clock
+from datetime import date, datetime, time
+from unittest.mock import patch
+
+from dateutil.rrule import rrulestr
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .models import Event, EventOccurrence, Ministry, Parish, User
+from .occurrences import extend_horizon
+from .recurrence import monthly_occurrences
+
+DTSTART = datetime(2025, 6, 1, 10, 0)
+
+
+class MonthlyOccurrencesTest(SimpleTestCase):
+    def cost(self, rule_text, limit=62):
+        return monthly_occurrences(rule_text, DTSTART, limit)
+
+    def test_typical_rules(self):
+        self.assertEqual(self.cost("FREQ=WEEKLY;BYDAY=SU"), 5)
+        self.assertEqual(self.cost("FREQ=DAILY"), 31)
+        # First Sundays can fall four weeks apart
+        self.assertEqual(self.cost("FREQ=MONTHLY;BYDAY=1SU"), 2)
+
+    def test_counting_stops_past_limit(self):
+        self.assertEqual(self.cost("FREQ=SECONDLY"), 63)
+        self.assertEqual(self.cost("FREQ=MINUTELY", limit=1000), 1001)
+
+    def test_busiest_month_of_first_year(self):
+        # Quiet until December
+        self.assertEqual(self.cost("FREQ=HOURLY;BYMONTH=12"), 63)
+
+    def test_rule_that_never_occurs(self):
+        started = clock.perf_counter()
+        # dateutil alone searches until the year 9999 for it
+        self.assertEqual(self.cost("FREQ=HOURLY;BYMONTH=2;BYMONTHDAY=30"), 0)
+        self.assertLess(clock.perf_counter() - started, 5)
+        self.assertEqual(self.cost("FREQ=DAILY;UNTIL=20250531"), 0)
+        self.assertEqual(self.cost("FREQ=DAILY;UNTIL=20250602T100000"), 2)
+
+    def test_cost_counted_from_first_occurrence(self):
+        # First in 2028, and in 2032 on a Monday
+        self.assertEqual(self.cost("FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=29"), 1)
+        self.assertEqual(self.cost("FREQ=DAILY;BYMONTH=2;BYMONTHDAY=29;BYDAY=MO"), 1)
+        self.assertEqual(self.cost("FREQ=HOURLY;BYMONTH=2;BYMONTHDAY=29"), 24)
+
+
+@override_settings(CALENDAR_CACHE_TIMEOUT=0)
+class RuleGuardrailTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+
+    def _event(self, rule_text):
+        return Event(
+            associated_ministry=self.ministry,
+            title=rule_text,
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 6, 1),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule=rule_text,
+        )
+
+    def _titles(self):
+        response = self.client.get(
+            reverse("calendar_events_api"), {"start": "2025-06-01", "end": "2025-06-30"}
+        )
+        return [event["title"] for event in response.json()["events"]]
+
+    def test_clean_rejects_costly_rule(self):
+        with self.assertRaises(ValidationError) as cm:
+            self._event("FREQ=MINUTELY").clean()
+        self.assertIn("too often", cm.exception.message_dict["recurrence_rule"][0])
+
+        self._event("FREQ=DAILY").clean()
+
+    def test_clean_rejects_rule_that_never_occurs(self):
+        with self.assertRaises(ValidationError) as cm:
+            self._event("FREQ=HOURLY;BYMONTH=2;BYMONTHDAY=30").full_clean()
+        self.assertIn("never occurs", cm.exception.message_dict["recurrence_rule"][0])
+
+    def test_clean_accepts_rule_first_occurring_years_later(self):
+        event = self._event("FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=29")
+        event.series_start_date = date(2026, 1, 4)
+        event.clean()
+        event.save()
+        self.assertFalse(event.quarantined)
+
+    def test_rule_parsed_once_for_clean_and_save(self):
+        event = self._event("FREQ=WEEKLY;BYDAY=SU;COUNT=10")
+        with patch("core.recurrence.rrulestr", wraps=rrulestr) as parse:
+            event.clean()
+            parsed = parse.call_count
+            event.save()
+        # Saving reuses the rule and cost clean() computed
+        self.assertEqual(parse.call_count, parsed)
+        self.assertEqual(event.last_occurrence_date, date(2025, 8, 3))
+
+    def test_rule_that_never_occurs_saved_directly_is_quarantined(self):
+        event = self._event("FREQ=HOURLY;BYMONTH=2;BYMONTHDAY=30;COUNT=3")
+        event.save()
+        self.assertTrue(event.quarantined)
+        self.assertIsNone(event.last_occurrence_date)
+        self.assertEqual(self._titles(), [])
+
+    def test_event_form_rejects_costly_rule(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("event_create"),
+            {
+                "associated_ministry": self.ministry.pk,
+                "title": "Every Second",
+                "description": "",
+                "location": "Hall",
+                "is_recurring": "on",
+                "series_start_date": "2025-06-01",
+                "start_time_of_day": "10:00",
+                "end_time_of_day": "11:00",
+                "recurrence_rule": "FREQ=SECONDLY",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "repeats too often")
+        self.assertFalse(Event.objects.exists())
+
+    def test_costly_rule_saved_directly_is_quarantined(self):
+        event = self._event("FREQ=HOURLY")
+        event.save()
+        self.assertTrue(event.quarantined)
+        self.assertEqual(self._titles(), [])
+
+        response = self.client.get(reverse("calendar_feed"))
+        self.assertNotIn(b"FREQ=HOURLY", b"".join(response.streaming_content))
+
+        # Fixing the rule brings the series back
+        event.recurrence_rule = "FREQ=WEEKLY;BYDAY=SU"
+        event.save()
+        self.assertFalse(event.quarantined)
+        self.assertEqual(len(self._titles()), 5)
+
+    def test_expansion_truncated_without_writing(self):
+        # bulk_create skips save(), as a data import would
+        (event,) = Event.objects.bulk_create([self._event("FREQ=HOURLY")])
+        Event.objects.bulk_create([self._event("FREQ=WEEKLY;BYDAY=SU")])
+
+        with self.assertLogs("core.calendar", "WARNING") as logs:
+            titles = self._titles()
+        # 62 hourly occurrences, shown once a day
+        self.assertEqual(titles.count("FREQ=HOURLY"), 3)
+        self.assertEqual(titles.count("FREQ=WEEKLY;BYDAY=SU"), 5)
+        self.assertIn("truncating", logs.output[0])
+
+        event.refresh_from_db()
+        self.assertFalse(event.quarantined)
+        # Quarantined once saved
+        event.save()
+        self.assertTrue(event.quarantined)
+        self.assertEqual(self._titles(), ["FREQ=WEEKLY;BYDAY=SU"] * 5)
+
+    def test_materialization_skips_costly_series(self):
+        (event,) = Event.objects.bulk_create([self._event("FREQ=HOURLY")])
+        updated_at = event.updated_at
+        with self.assertLogs("core.occurrences", "WARNING"):
+            extend_horizon(date(2025, 12, 31), rebuild=True)
+
+        event.refresh_from_db()
+        self.assertTrue(event.quarantined)
+        self.assertGreater(event.updated_at, updated_at)
+        self.assertFalse(EventOccurrence.objects.filter(event=event).exists())
@@ -0,0 +1,165 @@
+from datetime import date, datetime, time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .models import Event, EventException, EventOccurrence, Ministry, Parish, User
+from .occurrences import extend_horizon
+
+
+class SeriesSplitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        self.event = Event.objects.create(
+            associated_ministry=self.ministry,
+            title="Sunday Mass",
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 5),
+            start_time_of_day=time(10, 0),
+            end_time_of_day=time(11, 0),
+            recurrence_rule="FREQ=WEEKLY;BYDAY=SU",
+        )
+        for day in (date(2025, 3, 2), date(2025, 6, 15)):
+            EventException.objects.create(
+                event=self.event, original_occurrence_date=day, status="cancelled"
+            )
+        EventException.objects.create(
+            event=self.event,
+            original_occurrence_date=date(2025, 6, 22),
+            status="rescheduled",
+            new_start_datetime=timezone.make_aware(datetime(2025, 6, 24, 18, 0)),
+            new_end_datetime=timezone.make_aware(datetime(2025, 6, 24, 19, 0)),
+        )
+        self.client.force_login(self.user)
+
+    def _split(self, occurrence_date, event=None, **data):
+        return self.client.post(
+            reverse(
+                "event_occurrence_action",
+                args=[(event or self.event).id, occurrence_date],
+            ),
+            {"action": "split", **data},
+        )
+
+    def _starts(self, start, end):
+        return [event["start"] for event in CalendarWindow(start, end).events()]
+
+    def test_future_occurrences_changed(self):
+        response = self._split(
+            "2025-06-01", start_time_of_day="11:30", end_time_of_day="12:30"
+        )
+        self.assertEqual(response.status_code, 200)
+        continuation = Event.objects.get(pk=response.json()["event_id"])
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.series_end_date, date(2025, 5, 31))
+        self.assertEqual(continuation.series_start_date, date(2025, 6, 1))
+        self.assertEqual(continuation.start_time_of_day, time(11, 30))
+        self.assertEqual(continuation.title, "Sunday Mass")
+
+        # Exceptions follow their dates; none are added
+        self.assertEqual(EventException.objects.count(), 3)
+        self.assertEqual(
+            set(continuation.eventexception_set.values_list("status", flat=True)),
+            {"cancelled", "rescheduled"},
+        )
+
+        self.assertEqual(
+            self._starts(date(2025, 5, 25), date(2025, 6, 30)),
+            [
+                "2025-05-25T10:00:00",
+                "2025-06-01T11:30:00",
+                "2025-06-08T11:30:00",
+                "2025-06-24T22:00:00+00:00",
+                "2025-06-29T11:30:00",
+            ],
+        )
+
+    def test_materialized_occurrences_follow_split(self):
+        extend_horizon(date(2025, 12, 31), rebuild=True)
+        response = self._split("2025-06-01", location="Parish Hall")
+        continuation = Event.objects.get(pk=response.json()["event_id"])
+
+        self.assertFalse(
+            EventOccurrence.objects.filter(
+                event=self.event, start__date__gte=date(2025, 6, 1)
+            ).exists()
+        )
+        statuses = EventOccurrence.objects.filter(event=continuation).values_list(
+            "status", flat=True
+        )
+        # Every Sunday from June, with the moved exceptions applied
+        self.assertEqual(len(statuses), 31)
+        self.assertEqual(list(statuses).count("cancelled"), 1)
+        self.assertEqual(list(statuses).count("rescheduled"), 1)
+
+    def test_count_carried_over(self):
+        self.event.recurrence_rule = "FREQ=WEEKLY;BYDAY=SU;COUNT=10"
+        self.event.save()
+
+        response = self._split("2025-02-02")
+        continuation = Event.objects.get(pk=response.json()["event_id"])
+        self.assertEqual(continuation.recurrence_rule, "FREQ=WEEKLY;BYDAY=SU;COUNT=6")
+        # Ten occurrences in all, less the cancelled one
+        self.assertEqual(len(self._starts(date(2025, 1, 1), date(2025, 12, 31))), 9)
+
+    def test_invalid_splits_rejected(self):
+        for occurrence_date, data in (
+            ("2025-06-02", {}),
+            ("2025-01-05", {}),
+            ("2025-06-01", {"start_time_of_day": "noon"}),
+            ("2025-06-01", {"recurrence_rule": "FREQ=MINUTELY"}),
+        ):
+            with self.subTest(occurrence_date=occurrence_date, data=data):
+                response = self._split(occurrence_date, **data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        self.assertEqual(Event.objects.count(), 1)
+        self.event.refresh_from_db()
+        self.assertIsNone(self.event.series_end_date)
+
+    def test_split_past_series_end_rejected(self):
+        self.event.series_end_date = date(2025, 5, 31)
+        self.event.save()
+        with self.assertRaises(ValidationError):
+            self.event.split_series(date(2025, 6, 1))
+
+        response = self._split("2025-06-08")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ends before", response.json()["error"])
+        self.assertEqual(Event.objects.count(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.series_end_date, date(2025, 5, 31))
+
+    def test_only_owner_can_split(self):
+        other = User.objects.create_user(
+            username="other",
+            email="other@example.com",
+            password="testpass123",
+            full_name="Other User",
+            status="approved",
+        )
+        self.client.force_login(other)
+        self.assertEqual(self._split("2025-06-01").status_code, 404)
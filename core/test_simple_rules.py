@@ -0,0 +1,162 @@
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from dateutil.rrule import rrulestr
+
+from django.test import SimpleTestCase
+
+from .calendar import occurrence_dates
+from .simple_rules import parse_simple_rule, simple_rule_dates
+
+SIMPLE_RULES = [
+    "FREQ=DAILY",
+    "FREQ=DAILY;INTERVAL=3",
+    "FREQ=WEEKLY",
+    "FREQ=WEEKLY;BYDAY=SU",
+    "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,SA",
+    "FREQ=WEEKLY;INTERVAL=3",
+    "FREQ=MONTHLY",
+    "FREQ=MONTHLY;BYMONTHDAY=15",
+    "FREQ=MONTHLY;BYMONTHDAY=1,31",
+    "FREQ=MONTHLY;BYMONTHDAY=-1",
+    "FREQ=MONTHLY;INTERVAL=2;BYMONTHDAY=30",
+    "FREQ=WEEKLY;BYDAY=SU;UNTIL=20250622",
+    "FREQ=DAILY;UNTIL=20250610T100000",
+    "RRULE:FREQ=WEEKLY;BYDAY=TH",
+    "freq=weekly;byday=th",
+]
+
+NOT_SIMPLE_RULES = [
+    "FREQ=MONTHLY;BYDAY=1SU",
+    "FREQ=WEEKLY;COUNT=10",
+    "FREQ=WEEKLY;WKST=SU;INTERVAL=2",
+    "FREQ=YEARLY",
+    "FREQ=DAILY;BYDAY=MO",
+    "FREQ=WEEKLY;UNTIL=20250622T000000Z",
+    "FREQ=DAILY;INTERVAL=0",
+    "INVALID_RULE",
+    "",
+]
+
+DTSTARTS = [
+    datetime(2025, 1, 31, 10, 0),
+    datetime(2024, 2, 29, 19, 0),
+    datetime(2025, 6, 4, 7, 30),
+    datetime(2019, 12, 31, 0, 0),
+]
+
+WINDOWS = [
+    (date(2025, 6, 1), date(2025, 6, 30)),
+    (date(2025, 5, 26), date(2025, 7, 6)),
+    (date(2025, 1, 1), date(2025, 3, 31)),
+    (date(2024, 12, 30), date(2025, 1, 2)),
+]
+
+
+def dateutil_dates(rule_text, dtstart, start, end):
+    rule = rrulestr(rule_text, dtstart=dtstart)
+    return [
+        dt.date()
+        for dt in rule.between(
+            datetime.combine(start, time.min), datetime.combine(end, time.max), True
+        )
+    ]
+
+
+class SimpleRuleDatesTest(SimpleTestCase):
+    def test_matches_dateutil(self):
+        for rule_text in SIMPLE_RULES:
+            for dtstart in DTSTARTS:
+                for start, end in WINDOWS:
+                    with self.subTest(rule=rule_text, dtstart=dtstart, start=start):
+                        self.assertEqual(
+                            list(simple_rule_dates(rule_text, dtstart, start, end)),
+                            dateutil_dates(rule_text, dtstart, start, end),
+                        )
+
+    def test_other_rules_fall_back(self):
+        for rule_text in NOT_SIMPLE_RULES:
+            with self.subTest(rule=rule_text):
+                self.assertIsNone(parse_simple_rule(rule_text))
+                self.assertIsNone(
+                    simple_rule_dates(
+                        rule_text, DTSTARTS[0], date(2025, 6, 1), date(2025, 6, 30)
+                    )
+                )
+
+    def test_cost_independent_of_series_age(self):
+        dtstart = datetime(1925, 6, 1, 10, 0)
+        dates = simple_rule_dates(
+            "FREQ=DAILY", dtstart, date(2025, 6, 1), date(2025, 6, 7)
+        )
+        # A generator that starts at the window, not at 1925
+        self.assertEqual(next(dates), date(2025, 6, 1))
+        self.assertEqual(len(list(dates)), 6)
+
+    def test_occurrence_dates_uses_fast_path(self):
+        dtstart = datetime(2025, 6, 1, 10, 0)
+        with patch("core.calendar.rule_cache") as mock_cache:
+            dates = list(
+                occurrence_dates(
+                    1,
+                    "FREQ=WEEKLY;BYDAY=SU",
+                    dtstart,
+                    date(2025, 6, 1),
+                    date(2025, 6, 30),
+                )
+            )
+        mock_cache.get.assert_not_called()
+        self.assertEqual(len(dates), 5)
+
+        with patch("core.calendar.rule_cache") as mock_cache:
+            mock_cache.get.return_value = rrulestr(
+                "FREQ=MONTHLY;BYDAY=1SU", dtstart=dtstart
+            )
+            dates = list(
+                occurrence_dates(
+                    1,
+                    "FREQ=MONTHLY;BYDAY=1SU",
+                    dtstart,
+                    date(2025, 6, 1),
+                    date(2025, 8, 31),
+                )
+            )
+        mock_cache.get.assert_called_once()
+        self.assertEqual(dates, [date(2025, 6, 1), date(2025, 7, 6), date(2025, 8, 3)])
+
+    def test_window_before_series_start(self):
+        dtstart = datetime(2025, 6, 15, 10, 0)
+        self.assertEqual(
+            list(
+                simple_rule_dates(
+                    "FREQ=DAILY", dtstart, date(2025, 6, 1), date(2025, 6, 14)
+                )
+            ),
+            [],
+        )
+        self.assertEqual(
+            list(
+                simple_rule_dates(
+                    "FREQ=DAILY", dtstart, date(2025, 6, 1), date(2025, 6, 16)
+                )
+            ),
+            [date(2025, 6, 15), date(2025, 6, 16)],
+        )
+
+    def test_sliding_windows_match_dateutil(self):
+        dtstart = datetime(2023, 3, 17, 18, 0)
+        start = date(2023, 1, 1)
+        for offset in range(0, 900, 37):
+            window_start = start + timedelta(days=offset)
+            window_end = window_start + timedelta(days=45)
+            for rule_text in SIMPLE_RULES:
+                with self.subTest(rule=rule_text, start=window_start):
+                    self.assertEqual(
+                        list(
+                            simple_rule_dates(
+                                rule_text, dtstart, window_start, window_end
+                            )
+                        ),
+                        dateutil_dates(rule_text, dtstart, window_start, window_end),
+                    )
@@ -0,0 +1,126 @@
+from datetime import date, datetime, time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .calendar import CalendarWindow
+from .models import Event, EventException, Ministry, Parish, User
+
+RULES = (
+    ("FREQ=DAILY", date(2025, 5, 20), None),
+    ("FREQ=DAILY;INTERVAL=3", date(2024, 11, 13), None),
+    ("FREQ=WEEKLY", date(2024, 11, 13), None),
+    ("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,FR", date(2024, 11, 13), None),
+    ("FREQ=WEEKLY;BYDAY=SU;UNTIL=20250615", date(2025, 1, 5), None),
+    ("FREQ=WEEKLY;BYDAY=SA;UNTIL=20250614T090000", date(2025, 1, 4), None),
+    ("FREQ=WEEKLY;BYDAY=TU,TH", date(2025, 3, 4), date(2025, 6, 19)),
+    # Left to Python
+    ("FREQ=MONTHLY;BYDAY=1SU", date(2025, 1, 5), None),
+    ("FREQ=WEEKLY;BYDAY=TU;COUNT=5", date(2025, 5, 27), None),
+)
+
+
+class SqlExpansionTest(TestCase):
+    def setUp(self):
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+        for rule, series_start, series_end in RULES:
+            Event.objects.create(
+                associated_ministry=self.ministry,
+                title=rule,
+                description="",
+                location="Main Chapel",
+                is_recurring=True,
+                series_start_date=series_start,
+                series_end_date=series_end,
+                start_time_of_day=time(10, 0),
+                end_time_of_day=time(11, 0),
+                recurrence_rule=rule,
+            )
+        self.daily = daily = Event.objects.get(recurrence_rule="FREQ=DAILY")
+        EventException.objects.create(
+            event=daily, original_occurrence_date=date(2025, 6, 3), status="cancelled"
+        )
+        EventException.objects.create(
+            event=daily,
+            original_occurrence_date=date(2025, 6, 4),
+            status="rescheduled",
+            new_start_datetime=timezone.make_aware(datetime(2025, 6, 5, 18, 0)),
+            new_end_datetime=timezone.make_aware(datetime(2025, 6, 5, 19, 0)),
+        )
+
+    def _events(self, backend, start, end):
+        with self.settings(CALENDAR_EXPANSION_BACKEND=backend):
+            events = CalendarWindow(start, end).events()
+        return sorted(events, key=lambda event: (event["start"], event["id"]))
+
+    def test_backends_agree(self):
+        for start, end in (
+            (date(2025, 6, 1), date(2025, 6, 30)),
+            (date(2025, 1, 1), date(2025, 12, 31)),
+            (date(2024, 11, 1), date(2024, 11, 30)),
+            (date(2024, 1, 1), date(2024, 1, 31)),
+        ):
+            with self.subTest(start=start, end=end):
+                self.assertEqual(
+                    self._events("sql", start, end),
+                    self._events("python", start, end),
+                )
+
+    def test_exceptions_joined(self):
+        events = self._events("sql", date(2025, 6, 2), date(2025, 6, 5))
+        prefix = f"recurring_{self.daily.id}_"
+        daily = [event for event in events if event["id"].startswith(prefix)]
+        self.assertEqual(
+            [(event["id"], event["start"]) for event in daily],
+            [
+                (prefix + "2025-06-02", "2025-06-02T10:00:00"),
+                (prefix + "2025-06-05", "2025-06-05T10:00:00"),
+                (prefix + "2025-06-04", "2025-06-05T22:00:00+00:00"),
+            ],
+        )
+        self.assertEqual(daily[2]["title"], "FREQ=DAILY (Rescheduled)")
+
+    @override_settings(CALENDAR_EXPANSION_BACKEND="sql")
+    def test_simple_series_expanded_in_one_statement(self):
+        Event.objects.exclude(
+            recurrence_rule__in=[rule for rule, _, _ in RULES[:7]]
+        ).delete()
+        window = CalendarWindow(date(2025, 6, 1), date(2025, 6, 30))
+        # Horizon, ad-hoc events, series and the expansion; no exception query
+        with self.assertNumQueries(4):
+            occurrences = list(window.occurrences())
+        dates = [occurrence.date for occurrence in occurrences]
+        self.assertEqual(dates, sorted(dates))
+
+    def test_benchmark_compares_backends_on_seeded_series(self):
+        out = StringIO()
+        call_command(
+            "benchmark_calendar",
+            "--start=2025-06-01",
+            "--repeat=1",
+            "--backends",
+            "--seed=12",
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn("Seeded 12 series", output)
+        self.assertIn("python expansion: median", output)
+        self.assertIn("sql expansion: median", output)
+        # The seeded series are rolled back
+        self.assertEqual(Event.objects.count(), len(RULES))
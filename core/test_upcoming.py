@@ -0,0 +1,189 @@
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import calendar
+from .calendar import UpcomingWindow
+from .models import Event, EventException, Ministry, Parish, User
+
+# A Wednesday
+NOW = timezone.make_aware(datetime(2025, 6, 4, 12, 0))
+
+
+class UpcomingTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.parish = Parish.objects.create(name="Test Parish", address="123 Test St")
+        self.user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",
+            full_name="Test User",
+            status="approved",
+        )
+        self.ministry = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Test Ministry",
+            description="A test ministry",
+            contact_info="Contact info",
+        )
+
+    def _series(self, title, rule, start_time=time(10, 0), ministry=None):
+        return Event.objects.create(
+            associated_ministry=ministry or self.ministry,
+            title=title,
+            description="",
+            location="Main Chapel",
+            is_recurring=True,
+            series_start_date=date(2025, 1, 1),
+            start_time_of_day=start_time,
+            end_time_of_day=time(start_time.hour + 1, start_time.minute),
+            recurrence_rule=rule,
+        )
+
+    def _adhoc(self, title, start, hours=2):
+        return Event.objects.create(
+            associated_ministry=self.ministry,
+            title=title,
+            description="",
+            location="Hall",
+            is_recurring=False,
+            start_datetime=start,
+            end_datetime=start + timedelta(hours=hours),
+        )
+
+
+class UpcomingWindowTest(UpcomingTestCase):
+    def _upcoming(self, limit, **kwargs):
+        window = UpcomingWindow(limit, now=NOW, **kwargs)
+        return [(event["title"], event["start"]) for event in window.events()]
+
+    def test_series_and_adhoc_events_merged_in_order(self):
+        self._series("Sunday Mass", "FREQ=WEEKLY;BYDAY=SU")
+        self._series("Morning Prayer", "FREQ=WEEKLY;BYDAY=TH,FR", time(7, 0))
+        self._adhoc("Picnic", NOW + timedelta(days=2))
+
+        self.assertEqual(
+            self._upcoming(4),
+            [
+                ("Morning Prayer", "2025-06-05T07:00:00"),
+                ("Morning Prayer", "2025-06-06T07:00:00"),
+                ("Picnic", "2025-06-06T16:00:00+00:00"),
+                ("Sunday Mass", "2025-06-08T10:00:00"),
+            ],
+        )
+
+    def test_ongoing_included_and_ended_excluded(self):
+        self._series("Early", "FREQ=DAILY", time(8, 0))
+        self._series("Midday", "FREQ=DAILY", time(11, 30))
+        self._adhoc("Started Yesterday", NOW - timedelta(days=1), hours=30)
+        self._adhoc("Over", NOW - timedelta(hours=3))
+
+        self.assertEqual(
+            self._upcoming(3),
+            [
+                ("Started Yesterday", "2025-06-03T16:00:00+00:00"),
+                ("Midday", "2025-06-04T11:30:00"),
+                ("Early", "2025-06-05T08:00:00"),
+            ],
+        )
+
+    def test_cancelled_skipped_and_rescheduled_moved(self):
+        event = self._series("Sunday Mass", "FREQ=WEEKLY;BYDAY=SU")
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 8),
+            status="cancelled",
+        )
+        EventException.objects.create(
+            event=event,
+            original_occurrence_date=date(2025, 6, 15),
+            status="rescheduled",
+            new_start_datetime=timezone.make_aware(datetime(2025, 6, 25, 18, 0)),
+            new_end_datetime=timezone.make_aware(datetime(2025, 6, 25, 19, 0)),
+        )
+
+        self.assertEqual(
+            self._upcoming(3),
+            [
+                ("Sunday Mass", "2025-06-22T10:00:00"),
+                ("Sunday Mass (Rescheduled)", "2025-06-25T22:00:00+00:00"),
+                ("Sunday Mass", "2025-06-29T10:00:00"),
+            ],
+        )
+
+    def test_filtered_by_ministry(self):
+        other = Ministry.objects.create(
+            owner_user=self.user,
+            associated_parish=self.parish,
+            name="Other Ministry",
+            description="",
+            contact_info="",
+        )
+        self._series("Sunday Mass", "FREQ=WEEKLY;BYDAY=SU")
+        self._series("Choir", "FREQ=DAILY", ministry=other)
+
+        titles = {title for title, _ in self._upcoming(5, ministry_ids=[other.id])}
+        self.assertEqual(titles, {"Choir"})
+
+    def test_series_expanded_only_as_far_as_needed(self):
+        for hour in range(8, 18):
+            self._series(f"Daily {hour}", "FREQ=DAILY", time(hour, 0))
+        produced = []
+        occurrence_dates = calendar.occurrence_dates
+
+        def counting(*args):
+            for day in occurrence_dates(*args):
+                produced.append(day)
+                yield day
+
+        # Ad-hoc events, series and exceptions
+        with patch("core.calendar.occurrence_dates", counting):
+            with self.assertNumQueries(3):
+                self.assertEqual(len(self._upcoming(5)), 5)
+        # Each series has been asked for at most its next two dates
+        self.assertLessEqual(len(produced), 20)
+
+
+class UpcomingViewsTest(UpcomingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self._series("Daily Prayer", "FREQ=DAILY", time(22, 0))
+
+    def test_api(self):
+        response = self.client.get(reverse("upcoming_events_api"), {"limit": 3})
+        self.assertEqual(response.status_code, 200)
+        events = response.json()["events"]
+        self.assertEqual(len(events), 3)
+        self.assertEqual(
+            [event["start"] for event in events], sorted(e["start"] for e in events)
+        )
+
+        response = self.client.get(
+            reverse("upcoming_events_api"),
+            {"limit": 2, "parish": self.parish.id + 1, "fields": "title"},
+        )
+        self.assertEqual(response.json(), {"events": []})
+
+    def test_api_rejects_bad_limit(self):
+        for limit in ("0", "1000", "many"):
+            with self.subTest(limit=limit):
+                response = self.client.get(
+                    reverse("upcoming_events_api"), {"limit": limit}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_detail_pages_list_next_occurrences(self):
+        # Five next occurrences; the ministry page also lists its events
+        for url, count in (
+            (reverse("parish_detail", args=[self.parish.id]), 5),
+            (reverse("ministry_detail", args=[self.ministry.id]), 6),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, "Next Occurrences")
+                self.assertContains(response, "Daily Prayer", count=count)
@@ -9,7 +9,53 @@ urlpatterns = [
     path("parish/<int:parish_id>/", views.parish_detail, name="parish_detail"),
     path("ministry/<int:ministry_id>/", views.ministry_detail, name="ministry_detail"),
     path("calendar/", views.event_calendar, name="event_calendar"),
+    path(
+        "calendar/snapshots/<str:name>",
+        views.calendar_snapshot,
+        name="calendar_snapshot",
+    ),
+    path("calendar.ics", views.calendar_feed, name="calendar_feed"),
+    path(
+        "parish/<int:parish_id>/calendar.ics",
+        views.parish_calendar_feed,
+        name="parish_calendar_feed",
+    ),
+    path(
+        "ministry/<int:ministry_id>/calendar.ics",
+        views.ministry_calendar_feed,
+        name="ministry_calendar_feed",
+    ),
     path("api/calendar-events/", views.get_calendar_events, name="calendar_events_api"),
+    path(
+        "api/calendar-events/<str:occurrence_id>/",
+        views.calendar_event_detail,
+        name="calendar_event_detail",
+    ),
+    path(
+        "api/calendar-counts/",
+        views.calendar_counts,
+        name="calendar_counts_api",
+    ),
+    path(
+        "api/calendar/<str:month>.json",
+        views.calendar_month,
+        name="calendar_month_api",
+    ),
+    path(
+        "api/upcoming-events/",
+        views.upcoming_events,
+        name="upcoming_events_api",
+    ),
+    path(
+        "api/calendar-changes/",
+        views.calendar_changes,
+        name="calendar_changes_api",
+    ),
+    path(
+        "api/calendar-cache-stats/",
+        views.calendar_cache_stats,
+        name="calendar_cache_stats",
+    ),
     # Authentication
     path(
         "login/",
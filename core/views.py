@@ -1,30 +1,114 @@
 import logging
-from datetime import datetime
-
-from dateutil.rrule import rrulestr
+from datetime import datetime, time
 
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
-from django.db import models
-from django.http import JsonResponse
+from django.db import DatabaseError
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.views.generic import CreateView, UpdateView
 
+from . import calendar_cache
+from .calendar import EVENT_FIELDS, CalendarWindow, UpcomingWindow, find_occurrence
+from .changes import ExpiredSyncToken, changes_since, current_token
+from .conditional import conditional_on
 from .forms import MinistryLeaderRegistrationForm
+from .ics import feed_chunks
 from .models import Category, Event, EventException, Ministry, Parish, User
+from .rrule_cache import rule_cache
+from .snapshots import GRID_FIELDS, month_windows, snapshot_file, snapshot_urls
 
 logger = logging.getLogger(__name__)
 
+# Pages listing upcoming events are revalidated at least this often
+UPCOMING_REFRESH_SECONDS = 15 * 60
+
+# Month tiles of the current calendar generation never change at their URL
+MONTH_TILE_MAX_AGE = 365 * 24 * 60 * 60
+
+# What "change this and all future occurrences" may change
+SPLIT_TEXT_FIELDS = ("title", "description", "location", "recurrence_rule")
+SPLIT_TIME_FIELDS = ("start_time_of_day", "end_time_of_day")
+
+
+def _directory_scope(request):
+    return [Parish.objects.all()]
+
+
+def _parish_scope(request, parish_id):
+    return [
+        Parish.objects.filter(pk=parish_id),
+        Ministry.objects.filter(associated_parish_id=parish_id),
+        Event.objects.filter(associated_ministry__associated_parish_id=parish_id),
+        EventException.objects.filter(
+            event__associated_ministry__associated_parish_id=parish_id
+        ),
+    ]
+
+
+def _ministry_scope(request, ministry_id):
+    return [
+        Ministry.objects.filter(pk=ministry_id),
+        Parish.objects.filter(ministry=ministry_id),
+        Category.objects.filter(ministry=ministry_id),
+        Event.objects.filter(associated_ministry_id=ministry_id),
+        EventException.objects.filter(event__associated_ministry_id=ministry_id),
+    ]
+
+
+def _calendar_scope(request):
+    """The rows behind a calendar API response, narrowed by its filters."""
+    ministries = Ministry.objects.all()
+    try:
+        parish_ids = _id_list(request.GET.getlist("parish"))
+        category_ids = _id_list(request.GET.getlist("category"))
+    except ValueError:
+        # Rejected by the view; any validator will do
+        parish_ids = category_ids = []
+    if parish_ids:
+        ministries = ministries.filter(associated_parish_id__in=parish_ids)
+    if category_ids:
+        ministries = ministries.filter(
+            pk__in=Ministry.categories.through.objects.filter(
+                category_id__in=category_ids
+            ).values("ministry_id")
+        )
+    return [
+        Event.objects.filter(associated_ministry__in=ministries),
+        EventException.objects.filter(event__associated_ministry__in=ministries),
+        ministries,
+        Parish.objects.filter(pk__in=ministries.values("associated_parish_id")),
+    ]
+
+
+def _occurrence_scope(request, occurrence_id):
+    # ``adhoc_{id}`` or ``recurring_{id}_{date}``; other ids find nothing
+    event_id = occurrence_id.partition("_")[2].partition("_")[0]
+    if not event_id.isdigit():
+        return []
+    return [
+        Event.objects.filter(pk=event_id),
+        EventException.objects.filter(event_id=event_id),
+        Ministry.objects.filter(event=event_id),
+        Parish.objects.filter(ministry__event=event_id),
+    ]
 
+
+@conditional_on(_directory_scope, per_user=True)
 def parish_directory(request):
     parishes = Parish.objects.all().order_by("name")
     return render(request, "core/parish_directory.html", {"parishes": parishes})
 
 
+@conditional_on(_parish_scope, per_user=True, refresh_seconds=UPCOMING_REFRESH_SECONDS)
 def parish_detail(request, parish_id):
     parish = get_object_or_404(Parish, pk=parish_id)
     ministries = Ministry.objects.filter(associated_parish=parish).order_by("name")
@@ -33,6 +117,9 @@ def parish_detail(request, parish_id):
     )
 
 
+@conditional_on(
+    _ministry_scope, per_user=True, refresh_seconds=UPCOMING_REFRESH_SECONDS
+)
 def ministry_detail(request, ministry_id):
     ministry = get_object_or_404(Ministry, pk=ministry_id)
     events = Event.objects.filter(associated_ministry=ministry)
@@ -42,151 +129,371 @@ def ministry_detail(request, ministry_id):
 
 
 def event_calendar(request):
-    categories = Category.objects.all()
-    parishes = Parish.objects.all()
+    snapshots = {}
+    try:
+        categories = list(Category.objects.all())
+        parishes = list(Parish.objects.all())
+        version = calendar_cache.current_generation()
+        if settings.CALENDAR_SNAPSHOTS_ENABLED:
+            snapshots = snapshot_urls(version)
+    except DatabaseError:
+        # Keep the page up on the last published snapshots, without filters
+        logger.exception("Database unavailable; serving calendar snapshots")
+        categories, parishes, version = [], [], None
+        snapshots = snapshot_urls(None)
     return render(
         request,
         "core/event_calendar.html",
-        {"categories": categories, "parishes": parishes},
+        {
+            "categories": categories,
+            "parishes": parishes,
+            "snapshots": snapshots,
+            "calendar_version": version,
+        },
     )
 
 
+@conditional_on(_calendar_scope)
 def get_calendar_events(request):
-    start_date = request.GET.get("start")
-    end_date = request.GET.get("end")
+    try:
+        return _calendar_events_response(request)
+    except DatabaseError:
+        # The calendar page falls back to its published snapshots
+        logger.exception("Database unavailable; calendar API request failed")
+        return JsonResponse(
+            {"error": "The calendar is temporarily unavailable."}, status=503
+        )
+
 
-    if not start_date or not end_date:
+def _calendar_events_response(request):
+    if not request.GET.get("start") or not request.GET.get("end"):
         return JsonResponse({"events": []})
 
+    params = _window_params(request)
+    if isinstance(params, JsonResponse):
+        return params
+    start, end, parish_ids, category_ids = params
+    window_days = (end - start).days + 1
+
+    response_format = request.GET.get("format", "full")
+    if response_format not in ("full", "compact"):
+        return JsonResponse({"error": "Unknown response format."}, status=400)
+
     try:
-        start = datetime.fromisoformat(start_date.replace("Z", "+00:00")).date()
-        end = datetime.fromisoformat(end_date.replace("Z", "+00:00")).date()
+        fields = _field_list(request.GET.get("fields"))
     except ValueError:
-        return JsonResponse({"error": "Invalid date format provided."}, status=400)
+        return JsonResponse({"error": "Unknown field requested."}, status=400)
 
-    events = []
+    window = CalendarWindow(
+        start, end, parish_ids=parish_ids, category_ids=category_ids, fields=fields
+    )
 
-    # Get ad-hoc events
-    adhoc_events = Event.objects.filter(
-        is_recurring=False, start_datetime__date__range=[start, end]
-    ).select_related("associated_ministry__associated_parish")
+    # Expansion diagnostics for staff, never cached
+    if request.GET.get("explain") == "1":
+        if not request.user.is_staff:
+            return JsonResponse(
+                {"error": "Only staff can explain calendar requests."}, status=403
+            )
+        response = JsonResponse({"explain": window.explain()})
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+    # Compact payloads stay small regardless of the window's width
+    if response_format == "compact":
+        return calendar_cache.cached_json_response(
+            ("compact", start, end, parish_ids, category_ids, fields), window.compact
+        )
 
-    for event in adhoc_events:
-        events.append(
+    # Wide windows are streamed rather than built up (and cached) in memory
+    if window_days > settings.CALENDAR_STREAMING_THRESHOLD_DAYS:
+        return StreamingHttpResponse(
+            window.json_chunks(), content_type="application/json"
+        )
+
+    return calendar_cache.cached_json_response(
+        ("events", start, end, parish_ids, category_ids, fields),
+        lambda: {"events": window.events()},
+    )
+
+
+def _window_params(request):
+    """
+    Parse the ``start``/``end`` dates and ``parish``/``category`` filters of
+    a calendar window request into ``(start, end, parish_ids,
+    category_ids)``, or return a 400 response describing the problem.
+    """
+    try:
+        start = datetime.fromisoformat(
+            request.GET["start"].replace("Z", "+00:00")
+        ).date()
+        end = datetime.fromisoformat(request.GET["end"].replace("Z", "+00:00")).date()
+    except (KeyError, ValueError):
+        return JsonResponse({"error": "Invalid date format provided."}, status=400)
+
+    try:
+        parish_ids = _id_list(request.GET.getlist("parish"))
+        category_ids = _id_list(request.GET.getlist("category"))
+    except ValueError:
+        return JsonResponse({"error": "Invalid filter value provided."}, status=400)
+
+    if (end - start).days + 1 > settings.CALENDAR_MAX_WINDOW_DAYS:
+        return JsonResponse(
             {
-                "id": f"adhoc_{event.id}",
-                "title": event.title,
-                "start": event.start_datetime.isoformat(),
-                "end": event.end_datetime.isoformat(),
-                "description": event.description,
-                "location": event.location,
-                "ministry": event.associated_ministry.name,
-                "parish": event.associated_ministry.associated_parish.name,
-            }
+                "error": (
+                    "Date range too large; at most "
+                    f"{settings.CALENDAR_MAX_WINDOW_DAYS} days can be requested."
+                )
+            },
+            status=400,
+        )
+    return start, end, parish_ids, category_ids
+
+
+@conditional_on(_calendar_scope)
+def calendar_counts(request):
+    """
+    The number of occurrences on each day of a window: ``counts[i]`` is the
+    count for the day ``i`` days after ``start``. Counts are computed and
+    cached a calendar month at a time, so overlapping windows share them.
+    """
+    params = _window_params(request)
+    if isinstance(params, JsonResponse):
+        return params
+    start, end, parish_ids, category_ids = params
+    if end < start:
+        return JsonResponse({"start": start.isoformat(), "counts": []})
+
+    month_count = (end.year - start.year) * 12 + end.month - start.month + 1
+    months = {
+        key: (first, last) for key, first, last in month_windows(start, month_count)
+    }
+    monthly = calendar_cache.cached_values(
+        [("counts", key, parish_ids, category_ids) for key in months],
+        lambda parts: CalendarWindow(
+            *months[parts[1]], parish_ids, category_ids
+        ).day_counts(),
+    )
+    counts = [count for month in monthly for count in month]
+    offset = start.day - 1
+    return JsonResponse(
+        {
+            "start": start.isoformat(),
+            "counts": counts[offset : offset + (end - start).days + 1],
+        }
+    )
+
+
+def calendar_month(request, month):
+    """
+    One calendar month (``YYYY-MM``) in the compact grid format, optionally
+    filtered by ``parish`` and ``category``. The calendar page fetches the
+    months covering its view and merges them, so every visitor requests the
+    same few URLs. ``v`` is the calendar generation: a month of the current
+    generation is cacheable for a year by browsers and CDNs, and requests
+    for any other redirect to the current one.
+    """
+    try:
+        first = datetime.strptime(month, "%Y-%m").date()
+        key, first, last = next(month_windows(first, 1))
+        parish_ids = _id_list(request.GET.getlist("parish"))
+        category_ids = _id_list(request.GET.getlist("category"))
+    except (ValueError, OverflowError):
+        raise Http404("No such calendar month")
+
+    try:
+        version = str(calendar_cache.current_generation())
+        if request.GET.get("v") != version:
+            params = request.GET.copy()
+            params["v"] = version
+            response = redirect(f"{request.path}?{params.urlencode()}")
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        window = CalendarWindow(
+            first, last, parish_ids, category_ids, fields=GRID_FIELDS
+        )
+        response = calendar_cache.cached_json_response(
+            ("tile", key, parish_ids, category_ids), window.compact
+        )
+    except DatabaseError:
+        # The calendar page falls back to its published snapshots
+        logger.exception("Database unavailable; calendar month request failed")
+        return JsonResponse(
+            {"error": "The calendar is temporarily unavailable."}, status=503
         )
 
-    # Get recurring events
-    recurring_events = (
-        Event.objects.filter(
-            is_recurring=True,
-            series_start_date__lte=end,
+    # A stale body served during a rebuild is already marked no-store
+    if not response.has_header("Cache-Control"):
+        patch_cache_control(
+            response, public=True, max_age=MONTH_TILE_MAX_AGE, immutable=True
         )
-        .filter(
-            models.Q(series_end_date__isnull=True)
-            | models.Q(series_end_date__gte=start)
+    return response
+
+
+def calendar_snapshot(request, name):
+    """
+    A published calendar month snapshot (see core.snapshots), in the best
+    pre-compressed variant the client accepts. Snapshots are named after
+    their calendar generation, so they never change at their URL.
+    """
+    try:
+        path = snapshot_file(name)
+    except DatabaseError:
+        logger.exception("Database unavailable; calendar snapshot request failed")
+        return JsonResponse(
+            {"error": "The calendar is temporarily unavailable."}, status=503
         )
-        .select_related("associated_ministry__associated_parish")
+    if path is None:
+        raise Http404("No such calendar snapshot")
+
+    accepted = {
+        coding.split(";")[0].strip()
+        for coding in request.headers.get("Accept-Encoding", "").split(",")
+    }
+    encoding = None
+    for coding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        variant = path.with_name(path.name + suffix)
+        if coding in accepted and variant.exists():
+            path, encoding = variant, coding
+            break
+
+    response = HttpResponse(path.read_bytes(), content_type="application/json")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    patch_cache_control(
+        response, public=True, max_age=MONTH_TILE_MAX_AGE, immutable=True
     )
+    return response
 
-    for event in recurring_events:
-        if event.recurrence_rule:
-            try:
-                # Parse the recurrence rule
-                dtstart = datetime.combine(
-                    event.series_start_date, event.start_time_of_day
-                )
-                rrule = rrulestr(event.recurrence_rule, dtstart=dtstart)
 
-                # Get occurrences in the date range
-                occurrences = rrule.between(
-                    datetime.combine(start, datetime.min.time()),
-                    datetime.combine(end, datetime.max.time()),
-                    inc=True,
+def upcoming_events(request):
+    """
+    The next ``limit`` occurrences (default 20), soonest first, optionally
+    filtered by ``parish``, ``category`` and ``ministry``.
+    """
+    try:
+        limit = int(request.GET.get("limit", 20))
+        parish_ids = _id_list(request.GET.getlist("parish"))
+        category_ids = _id_list(request.GET.getlist("category"))
+        ministry_ids = _id_list(request.GET.getlist("ministry"))
+    except ValueError:
+        return JsonResponse({"error": "Invalid filter value provided."}, status=400)
+    if not 1 <= limit <= settings.CALENDAR_UPCOMING_MAX_LIMIT:
+        return JsonResponse(
+            {
+                "error": (
+                    "limit must be between 1 and "
+                    f"{settings.CALENDAR_UPCOMING_MAX_LIMIT}."
                 )
+            },
+            status=400,
+        )
 
-                # Get exceptions for this event
-                exceptions = EventException.objects.filter(
-                    event=event, original_occurrence_date__range=[start, end]
-                )
-                exception_dict = {
-                    exc.original_occurrence_date: exc for exc in exceptions
-                }
-
-                for occurrence in occurrences:
-                    occurrence_date = occurrence.date()
-
-                    # Check if this occurrence has an exception
-                    if occurrence_date in exception_dict:
-                        exception = exception_dict[occurrence_date]
-                        if exception.status == "cancelled":
-                            continue
-                        elif exception.status == "rescheduled":
-                            events.append(
-                                {
-                                    "id": f"recurring_{event.id}_{occurrence_date}",
-                                    "title": f"{event.title} (Rescheduled)",
-                                    "start": exception.new_start_datetime.isoformat(),
-                                    "end": exception.new_end_datetime.isoformat(),
-                                    "description": event.description,
-                                    "location": event.location,
-                                    "ministry": event.associated_ministry.name,
-                                    "parish": (
-                                        event.associated_ministry.associated_parish.name
-                                    ),
-                                }
-                            )
-                            continue
-
-                    # Normal occurrence
-                    start_dt = datetime.combine(
-                        occurrence_date, event.start_time_of_day
-                    )
-                    end_dt = datetime.combine(occurrence_date, event.end_time_of_day)
-
-                    events.append(
-                        {
-                            "id": f"recurring_{event.id}_{occurrence_date}",
-                            "title": event.title,
-                            "start": start_dt.isoformat(),
-                            "end": end_dt.isoformat(),
-                            "description": event.description,
-                            "location": event.location,
-                            "ministry": event.associated_ministry.name,
-                            "parish": event.associated_ministry.associated_parish.name,
-                        }
-                    )
+    try:
+        fields = _field_list(request.GET.get("fields"))
+    except ValueError:
+        return JsonResponse({"error": "Unknown field requested."}, status=400)
+
+    window = UpcomingWindow(
+        limit,
+        parish_ids=parish_ids,
+        category_ids=category_ids,
+        ministry_ids=ministry_ids,
+        fields=fields,
+    )
+    return JsonResponse({"events": window.events()})
+
+
+def _id_list(values):
+    """Parse repeated and/or comma-separated id parameters into sorted ids."""
+    ids = {int(value) for raw in values for value in raw.split(",") if value.strip()}
+    return sorted(ids)
+
+
+def _field_list(value):
+    """Parse a comma-separated ``fields`` parameter; ``id`` is always included."""
+    if not value:
+        return list(EVENT_FIELDS)
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    if not requested <= set(EVENT_FIELDS):
+        raise ValueError(f"Unknown fields: {requested - set(EVENT_FIELDS)}")
+    return [field for field in EVENT_FIELDS if field == "id" or field in requested]
+
+
+@conditional_on(_occurrence_scope)
+def calendar_event_detail(request, occurrence_id):
+    """Return a single occurrence, with every field, by its calendar API id."""
+    event = find_occurrence(occurrence_id)
+    if event is None:
+        return JsonResponse({"error": "Event not found."}, status=404)
+    return JsonResponse({"event": event})
+
+
+def calendar_changes(request):
+    """
+    Events and exceptions changed since the ``since`` sync token. Without a
+    token, returns the token to start from after a full download.
+    """
+    since = request.GET.get("since")
+    if not since:
+        return JsonResponse({"changes": [], "next": current_token(), "more": False})
+    try:
+        return JsonResponse(changes_since(since))
+    except ExpiredSyncToken:
+        return JsonResponse(
+            {"error": "Sync token has expired; download the calendar again."},
+            status=410,
+        )
+    except ValueError:
+        return JsonResponse({"error": "Invalid sync token."}, status=400)
 
-            except (ValueError, TypeError, AttributeError, OverflowError) as e:
-                # Skip this event if we can't parse its recurrence rule or process data
-                logger.warning(
-                    "Failed to process recurring event %s: %s - %s",
-                    event.id,
-                    type(e).__name__,
-                    str(e),
-                )
-                continue
-            except Exception as e:
-                # Log unexpected errors for monitoring
-                logger.error(
-                    "Unexpected error processing recurring event %s: %s - %s",
-                    event.id,
-                    type(e).__name__,
-                    str(e),
-                    exc_info=True,
-                )
-                continue
 
-    return JsonResponse({"events": events})
+def calendar_feed(request):
+    return _feed_response(request, ("ics", "all"), Event.objects.all(), "Hogtown")
+
+
+def parish_calendar_feed(request, parish_id):
+    parish = get_object_or_404(Parish, pk=parish_id)
+    events = Event.objects.filter(associated_ministry__associated_parish=parish)
+    return _feed_response(request, ("ics", "parish", parish.pk), events, parish.name)
+
+
+def ministry_calendar_feed(request, ministry_id):
+    ministry = get_object_or_404(Ministry, pk=ministry_id)
+    events = Event.objects.filter(associated_ministry=ministry)
+    return _feed_response(
+        request, ("ics", "ministry", ministry.pk), events, ministry.name
+    )
+
+
+def _feed_response(request, parts, events, name):
+    """
+    Serve an iCalendar feed. Feeds are polled constantly by calendar clients,
+    so bodies are cached per calendar generation and conditional requests are
+    answered with 304 Not Modified; with caching disabled the feed is streamed.
+    """
+    content_type = "text/calendar; charset=utf-8"
+    if not settings.CALENDAR_CACHE_TIMEOUT:
+        return StreamingHttpResponse(
+            feed_chunks(events, name), content_type=content_type
+        )
+
+    content, etag, last_modified = calendar_cache.cached_body(
+        parts, lambda: feed_chunks(events, name)
+    )
+    response = HttpResponse(content, content_type=content_type)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+
+
+@staff_member_required
+def calendar_cache_stats(request):
+    """Report this worker's recurrence rule cache counters for monitoring."""
+    return JsonResponse({"rrule_cache": rule_cache.stats()})
 
 
 @login_required
@@ -276,7 +583,10 @@ class EventUpdateView(LoginRequiredMixin, UpdateView):
 
 @login_required
 def event_occurrence_action(request, event_id, occurrence_date):
-    """Handle actions on individual event occurrences (cancel/reschedule)"""
+    """
+    Handle actions on individual event occurrences (cancel/reschedule), or
+    split the series there to change this and all future occurrences
+    """
     event = get_object_or_404(
         Event, pk=event_id, associated_ministry__owner_user=request.user
     )
@@ -342,6 +652,27 @@ def event_occurrence_action(request, event_id, occurrence_date):
 
             return JsonResponse({"success": True, "action": "rescheduled"})
 
+        elif action == "split":
+            changes = {}
+            for name in SPLIT_TEXT_FIELDS:
+                if request.POST.get(name):
+                    changes[name] = request.POST[name]
+            try:
+                for name in SPLIT_TIME_FIELDS:
+                    if request.POST.get(name):
+                        changes[name] = time.fromisoformat(request.POST[name])
+            except ValueError:
+                return JsonResponse({"error": "Invalid time format"}, status=400)
+
+            try:
+                continuation = event.split_series(occurrence_date_obj, **changes)
+            except ValidationError as e:
+                return JsonResponse({"error": " ".join(e.messages)}, status=400)
+
+            return JsonResponse(
+                {"success": True, "action": "split", "event_id": continuation.pk}
+            )
+
         elif action == "restore":
             try:
                 exception = EventException.objects.get(
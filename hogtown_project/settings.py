@@ -111,6 +111,30 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The database cache is shared by all Gunicorn workers, so invalidating cached
+# calendar responses in one worker takes effect in all of them. Run
+# `python manage.py createcachetable` after migrating.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "hogtown_cache"),
+    }
+}
+# Past MAX_ENTRIES (300 by default) the database, local-memory and file caches
+# cull a third of their entries, live calendar responses included. Memcached
+# and Redis evict by memory and take no such option.
+if not CACHES["default"]["BACKEND"].startswith(
+    ("django.core.cache.backends.memcached", "django.core.cache.backends.redis")
+):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "50000"))
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -190,3 +214,78 @@ if AWS_ACCESS_KEY_ID and EMAIL_BACKEND == "anymail.backends.amazon_ses.EmailBack
         "AMAZON_SES_SECRET_ACCESS_KEY": AWS_SECRET_ACCESS_KEY,
         "AMAZON_SES_REGION": AWS_REGION,
     }
+
+# Calendar settings
+# Days past today that EventOccurrence rows are materialized for by the nightly
+# extend_occurrence_horizon command
+CALENDAR_OCCURRENCE_HORIZON_DAYS = int(
+    os.getenv("CALENDAR_OCCURRENCE_HORIZON_DAYS", "365")
+)
+
+# Maximum number of parsed recurrence rules each worker process keeps in memory
+CALENDAR_RRULE_CACHE_SIZE = int(os.getenv("CALENDAR_RRULE_CACHE_SIZE", "2048"))
+
+# Seconds a rendered calendar API response is cached for; 0 disables caching
+CALENDAR_CACHE_TIMEOUT = int(os.getenv("CALENDAR_CACHE_TIMEOUT", "300"))
+
+# Seconds after it expires or is invalidated that a cached response may still
+# be served while another worker rebuilds it; 0 makes requests wait instead
+CALENDAR_CACHE_STALE_SECONDS = int(os.getenv("CALENDAR_CACHE_STALE_SECONDS", "60"))
+
+# Seconds one worker may hold the rebuild lock for a cached response before
+# other workers give up on it
+CALENDAR_CACHE_LOCK_TIMEOUT = int(os.getenv("CALENDAR_CACHE_LOCK_TIMEOUT", "30"))
+
+# Longest window, in days, the calendar API will expand; longer requests get a 400
+CALENDAR_MAX_WINDOW_DAYS = int(os.getenv("CALENDAR_MAX_WINDOW_DAYS", "366"))
+
+# Windows longer than this many days (default: a quarter) are streamed, not cached
+CALENDAR_STREAMING_THRESHOLD_DAYS = int(
+    os.getenv("CALENDAR_STREAMING_THRESHOLD_DAYS", "92")
+)
+
+# How recurring series beyond the materialized horizon are expanded: "python"
+# (dateutil and core.simple_rules) or "sql", where the database expands simple
+# daily and weekly rules (core.sql_expansion) and Python the rest
+CALENDAR_EXPANSION_BACKEND = os.getenv("CALENDAR_EXPANSION_BACKEND", "python")
+
+# Most occurrences a recurrence rule may produce in a month. Rules that repeat
+# more often are rejected when an event is saved, and series that exceed it
+# when expanded are truncated and quarantined
+CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES = int(
+    os.getenv("CALENDAR_RULE_MAX_MONTHLY_OCCURRENCES", "62")
+)
+
+# File the materialized occurrences are indexed in, mapped read-only and shared
+# by every worker (see core.occurrence_index) and rebuilt by the
+# build_occurrence_index command; empty disables the index
+CALENDAR_OCCURRENCE_INDEX_PATH = os.getenv("CALENDAR_OCCURRENCE_INDEX_PATH", "")
+
+# Most occurrences the upcoming events API will return per request
+CALENDAR_UPCOMING_MAX_LIMIT = int(os.getenv("CALENDAR_UPCOMING_MAX_LIMIT", "100"))
+
+# Publish this month and the following ones as JSON snapshots (see
+# core.snapshots) and republish them whenever calendar data changes. Django
+# serves them from CALENDAR_SNAPSHOT_ROOT at /calendar/snapshots/, so no
+# static file server is needed; each instance keeps its own copy and renders
+# the snapshots it has not published on their first request
+_snapshots_enabled = os.getenv("CALENDAR_SNAPSHOTS_ENABLED", "False")
+CALENDAR_SNAPSHOTS_ENABLED = _snapshots_enabled.lower() in ("true", "1", "yes", "on")
+CALENDAR_SNAPSHOT_MONTHS = int(os.getenv("CALENDAR_SNAPSHOT_MONTHS", "3"))
+CALENDAR_SNAPSHOT_ROOT = os.getenv(
+    "CALENDAR_SNAPSHOT_ROOT", str(BASE_DIR / "calendar_snapshots")
+)
+
+# Calendar changes API (see core.changes): changes returned per request, seconds
+# the newest changes are held back so concurrent transactions can commit, and
+# days changes are kept for (older sync tokens must resync)
+CALENDAR_CHANGES_PAGE_SIZE = int(os.getenv("CALENDAR_CHANGES_PAGE_SIZE", "500"))
+CALENDAR_CHANGES_SETTLE_SECONDS = int(os.getenv("CALENDAR_CHANGES_SETTLE_SECONDS", "5"))
+CALENDAR_CHANGE_RETENTION_DAYS = int(os.getenv("CALENDAR_CHANGE_RETENTION_DAYS", "90"))
+
+# compact_calendar command (see core.compaction): days of past exceptions and
+# events kept in the live tables, and most rows changed per transaction
+CALENDAR_ARCHIVE_RETENTION_DAYS = int(
+    os.getenv("CALENDAR_ARCHIVE_RETENTION_DAYS", "365")
+)
+CALENDAR_COMPACTION_BATCH_SIZE = int(os.getenv("CALENDAR_COMPACTION_BATCH_SIZE", "500"))